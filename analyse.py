@@ -0,0 +1,202 @@
+"""Module d'analyse des positions en lot
+
+Évalue d'un coup un grand nombre d'états de partie sans construire d'objet
+`Quoridor`. Les états sont d'abord empaquetés dans un tableau structuré NumPy
+(pions, murs restants et murs posés en deux masques de 64 bits, comme `État`),
+puis les distances au but sont calculées par un seul parcours en largeur
+vectorisé sur tout le lot.
+
+Les distances ne tiennent compte que des murs, comme `cartes_distances`; la
+mobilité compte les déplacements légaux du pion, sauts compris.
+
+Attributes:
+    ÉTAT (np.dtype): Type d'un état empaqueté.
+    CARACTÉRISTIQUES (np.dtype): Type des caractéristiques d'un état.
+
+Functions:
+    * empaqueter - Convertir des états en tableau structuré.
+    * évaluer_lot - Calculer les caractéristiques d'un lot d'états.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from damier import BLOQUE_EST, BLOQUE_NORD, Damier
+
+from distances import INATTEIGNABLE, propager
+
+from etat import État
+
+ÉTAT = np.dtype([
+    ("pions", np.uint8, (2,)),
+    ("murs", np.uint8, (2,)),
+    ("horizontaux", np.uint64),
+    ("verticaux", np.uint64),
+])
+
+CARACTÉRISTIQUES = np.dtype([
+    ("distance1", np.int16),
+    ("distance2", np.int16),
+    ("murs1", np.uint8),
+    ("murs2", np.uint8),
+    ("mobilité1", np.uint8),
+    ("mobilité2", np.uint8),
+    ("avance", np.int16),
+    ("gagnant", np.uint8),
+    ("favori", np.uint8),
+])
+
+
+def empaqueter(états):
+    """Convertir des états en tableau structuré.
+
+    Args:
+        états (Iterable): des états au format dictionnaire de `Quoridor.état_courant`
+            ou des `État`.
+
+    Returns:
+        ndarray: un tableau de type `ÉTAT`, un élément par état.
+    """
+    compacts = [état if isinstance(état, État) else État.from_dict(état) for état in états]
+    paquet = np.zeros(len(compacts), dtype=ÉTAT)
+    paquet["pions"] = [état.pions for état in compacts]
+    paquet["murs"] = [état.restants for état in compacts]
+    paquet["horizontaux"] = [état.horizontaux for état in compacts]
+    paquet["verticaux"] = [état.verticaux for état in compacts]
+    return paquet
+
+
+def _bits(masques):
+    """Déplier des masques de 64 bits en grilles 8x8 de booléens.
+
+    Args:
+        masques (ndarray): des masques uint64, de forme (N,).
+
+    Returns:
+        ndarray: un tableau (N, 8, 8) indexé par [n, rangée, colonne] d'emplacement.
+    """
+    octets = masques.astype("<u8").view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(octets, axis=1, bitorder="little").reshape(-1, 8, 8).astype(bool)
+
+
+def _arcs_ouverts(paquet):
+    """Grilles des arcs ouverts de chaque état.
+
+    Args:
+        paquet (ndarray): un tableau de type `ÉTAT`.
+
+    Returns:
+        Tuple[ndarray, ndarray]: les grilles (N, 9, 9) des arcs ouverts vers le nord
+            et vers l'est, indexées par [n, x - 1, y - 1].
+    """
+    #emplacement horizontal [rangée y - 2, colonne x - 1]: arcs nord de (x, y-1) et (x+1, y-1)
+    horizontaux = _bits(paquet["horizontaux"]).transpose(0, 2, 1)
+    bloq_n = np.zeros((len(paquet), 9, 9), dtype=bool)
+    bloq_n[:, :8, :8] |= horizontaux
+    bloq_n[:, 1:, :8] |= horizontaux
+    #emplacement vertical [rangée y - 1, colonne x - 2]: arcs est de (x-1, y) et (x-1, y+1)
+    verticaux = _bits(paquet["verticaux"]).transpose(0, 2, 1)
+    bloq_e = np.zeros((len(paquet), 9, 9), dtype=bool)
+    bloq_e[:, :8, :8] |= verticaux
+    bloq_e[:, :8, 1:] |= verticaux
+    return ~bloq_n, ~bloq_e
+
+
+def _mobilités(paquet):
+    """Nombre de déplacements légaux des deux pions de chaque état.
+
+    Args:
+        paquet (ndarray): un tableau de type `ÉTAT`.
+
+    Returns:
+        ndarray: un tableau (N, 2) du nombre de cases d'arrivée de chaque pion.
+    """
+    mobilités = np.zeros((len(paquet), 2), dtype=np.uint8)
+    damier = Damier.__new__(Damier)
+    for rang, (pions, horizontaux, verticaux) in enumerate(
+            zip(paquet["pions"].tolist(), paquet["horizontaux"].tolist(),
+                paquet["verticaux"].tolist())):
+        damier.pions = pions
+        damier.bloq_n = damier.bloq_e = 0
+        murs = horizontaux | verticaux << 64
+        while murs:
+            bit = murs & -murs
+            murs ^= bit
+            mur = bit.bit_length() - 1
+            damier.bloq_n |= BLOQUE_NORD[mur]
+            damier.bloq_e |= BLOQUE_EST[mur]
+        mobilités[rang] = (bin(damier.successeurs(pions[0])).count("1"),
+                           bin(damier.successeurs(pions[1])).count("1"))
+    return mobilités
+
+
+def _évaluer_paquet(paquet):
+    """Calculer les caractéristiques d'un tableau d'états empaquetés.
+
+    Args:
+        paquet (ndarray): un tableau de type `ÉTAT`.
+
+    Returns:
+        ndarray: un tableau de type `CARACTÉRISTIQUES`.
+    """
+    taille = len(paquet)
+    ouvert_n, ouvert_e = _arcs_ouverts(paquet)
+    sources = np.zeros((taille, 2, 9, 9), dtype=bool)
+    sources[:, 0, :, 8] = True
+    sources[:, 1, :, 0] = True
+    cartes = propager(ouvert_n[:, None], ouvert_e[:, None], sources)
+
+    pions = paquet["pions"].astype(np.intp)
+    rangs = np.arange(taille)
+    distance1 = cartes[rangs, 0, pions[:, 0] % 9, pions[:, 0] // 9]
+    distance2 = cartes[rangs, 1, pions[:, 1] % 9, pions[:, 1] // 9]
+
+    résultats = np.zeros(taille, dtype=CARACTÉRISTIQUES)
+    résultats["distance1"] = distance1
+    résultats["distance2"] = distance2
+    résultats["murs1"] = paquet["murs"][:, 0]
+    résultats["murs2"] = paquet["murs"][:, 1]
+    mobilités = _mobilités(paquet)
+    résultats["mobilité1"] = mobilités[:, 0]
+    résultats["mobilité2"] = mobilités[:, 1]
+    atteignables = (distance1 != INATTEIGNABLE) & (distance2 != INATTEIGNABLE)
+    avance = np.where(atteignables, distance2 - distance1, 0)
+    résultats["avance"] = avance
+    résultats["gagnant"] = np.where(distance1 == 0, 1, np.where(distance2 == 0, 2, 0))
+    résultats["favori"] = np.where(avance > 0, 1, np.where(avance < 0, 2, 0))
+    return résultats
+
+
+def évaluer_lot(états, processus=1, morceau=4096):
+    """Calculer les caractéristiques d'un lot d'états.
+
+    Pour chaque état: la distance au but de chaque pion (INATTEIGNABLE si le but
+    est coupé), les murs restants, le nombre de déplacements légaux de chaque
+    pion, l'avance du joueur 1 en nombre de pas, le gagnant (1 ou 2 si un pion
+    est sur sa rangée but, sinon 0) et le favori (le joueur le plus proche de
+    son but, 0 à égalité).
+
+    Args:
+        états (Iterable | ndarray): des états au format dictionnaire, des `État`,
+            ou un tableau de type `ÉTAT` tel que retourné par `empaqueter`.
+        processus (int, optionnel): le nombre de processus entre lesquels répartir
+            les morceaux; 0 pour un par cœur.
+        morceau (int, optionnel): le nombre d'états traités ensemble.
+
+    Returns:
+        ndarray: un tableau de type `CARACTÉRISTIQUES`, dans l'ordre des états.
+    """
+    paquet = états if isinstance(états, np.ndarray) else empaqueter(états)
+    morceaux = [paquet[début:début + morceau] for début in range(0, len(paquet), morceau)]
+    if not morceaux:
+        return np.zeros(0, dtype=CARACTÉRISTIQUES)
+
+    processus = processus or os.cpu_count() or 1
+    if processus == 1 or len(morceaux) == 1:
+        résultats = [_évaluer_paquet(morceau) for morceau in morceaux]
+    else:
+        with ProcessPoolExecutor(max_workers=processus) as exécuteur:
+            résultats = list(exécuteur.map(_évaluer_paquet, morceaux))
+    return np.concatenate(résultats)
@@ -0,0 +1,168 @@
+"""Module de l'anticipation
+
+Réflexion sur le temps de l'adversaire: pendant que le serveur calcule sa
+réponse, un fil d'exécution en arrière-plan prévoit ses réponses les plus
+probables et cherche déjà notre coup contre chacune. Quand l'état réel arrive,
+le coup préparé pour cette position est joué sans attendre; sinon la recherche
+repart avec une table de transposition déjà remplie.
+
+    anticipation = Anticipation(temps=1.0)
+    coup = anticipation.coup(partie, 1) or partie.jouer_le_coup(1)
+    partie.jouer(1, coup)
+    anticipation.lancer(partie, 1)
+    ...  #attendre la réponse du serveur
+
+Classes:
+    * Anticipation - Préparer nos coups pendant que l'adversaire réfléchit.
+"""
+
+import threading
+from itertools import islice
+
+from damier import PREMIER_MUR, case, indice_mur
+
+from quoridor import Quoridor
+
+from recherche import décoder_coup, meilleur_coup
+
+from transposition import clé_position
+
+
+class Anticipation():
+    """Préparer nos coups pendant que l'adversaire réfléchit.
+
+    Attributes:
+        réponses (int): le nombre de réponses de l'adversaire prévues à chaque coup.
+        réglages (dict): les réglages de `Quoridor.jouer_le_coup` pour nos coups.
+        succès (int): le nombre de coups joués depuis une réponse prévue.
+        échecs (int): le nombre de réponses de l'adversaire qui n'étaient pas prévues.
+    """
+
+    def __init__(self, réponses=3, **réglages):
+        """Constructeur de la classe Anticipation.
+
+        Args:
+            réponses (int, optionnel): le nombre de réponses de l'adversaire prévues.
+            **réglages: les réglages de `Quoridor.jouer_le_coup`, par exemple
+                `temps` et `profondeur`.
+        """
+        self.réponses = réponses
+        self.réglages = réglages
+        self.succès = 0
+        self.échecs = 0
+        self._coups = {}
+        self._arrêt = threading.Event()
+        self._verrou = threading.Lock()
+        #clés de la position cherchée par le fil et de celle reçue du serveur
+        self._en_cours = None
+        self._voulue = None
+        self._fil = None
+
+    def lancer(self, partie, joueur):
+        """Commencer à réfléchir sur le temps de l'adversaire.
+
+        La partie est copiée: elle peut être remplacée dès le retour de l'appel.
+
+        Args:
+            partie (Quoridor): la partie après notre coup, l'adversaire au trait.
+            joueur (int): notre numéro de joueur (1 ou 2).
+        """
+        self.arrêter()
+        self._coups = {}
+        if partie.est_terminée():
+            return
+        copie = Quoridor.depuis_serveur(partie.état_courant())
+        self._arrêt.clear()
+        self._en_cours = self._voulue = None
+        self._fil = threading.Thread(target=self._réfléchir, args=(copie, joueur), daemon=True)
+        self._fil.start()
+
+    def arrêter(self):
+        """Arrêter la réflexion, en interrompant la recherche en cours."""
+        if self._fil is not None:
+            self._arrêt.set()
+            self._fil.join()
+            self._fil = None
+
+    def coup(self, partie, joueur):
+        """Coup préparé pour la position réelle.
+
+        Si la recherche en cours porte sur cette position, elle est terminée avant
+        de répondre; sinon elle est interrompue et la réponse est immédiate.
+
+        Args:
+            partie (Quoridor): la partie dans l'état reçu du serveur.
+            joueur (int): notre numéro de joueur (1 ou 2).
+
+        Returns:
+            Tuple[str, List[int, int]]: le coup préparé, au format de `jouer_le_coup`,
+                ou None si la réponse de l'adversaire n'avait pas été prévue. Le
+                rapport de la recherche est alors placé dans `partie.rapport`.
+        """
+        murs = [joueur['murs'] for joueur in partie.état['joueurs']]
+        clé = clé_position(partie.damier, murs, joueur)
+        if self._fil is not None:
+            with self._verrou:
+                self._voulue = clé
+                if self._en_cours != clé:
+                    self._arrêt.set()
+            self._fil.join()
+            self._fil = None
+        préparé = self._coups.get(clé)
+        #le coup n'est joué que s'il est légal, au cas où deux clés se confondraient
+        if préparé is None or next(partie.coups_légaux(
+                joueur, premiers=(préparé[0],)), None) != préparé[0]:
+            self.échecs += 1
+            return None
+        self.succès += 1
+        partie.rapport = dict(préparé[1], anticipation=True)
+        return décoder_coup(préparé[0])
+
+    def _prévoir(self, partie, adversaire):
+        """Réponses les plus probables de l'adversaire.
+
+        Celle d'une recherche courte d'abord, puis ses meilleurs déplacements et
+        les murs qui coupent notre chemin.
+
+        Args:
+            partie (Quoridor): la partie, l'adversaire au trait.
+            adversaire (int): le numéro de l'adversaire.
+
+        Returns:
+            List[int]: les codes des réponses, de la plus probable à la moins probable.
+        """
+        murs = [joueur['murs'] for joueur in partie.état['joueurs']]
+        prévue, _ = meilleur_coup(partie.damier, adversaire, murs,
+                                  temps=self.réglages.get("temps", 1.0) / 4,
+                                  profondeur=self.réglages.get("profondeur", 8),
+                                  arrêt=self._arrêt)
+        return list(islice(partie.coups_légaux(adversaire, trier=True, premiers=(prévue,)),
+                           self.réponses))
+
+    def _réfléchir(self, partie, joueur):
+        """Chercher notre coup contre chaque réponse prévue, jusqu'à l'arrêt.
+
+        Args:
+            partie (Quoridor): une copie de la partie, l'adversaire au trait.
+            joueur (int): notre numéro de joueur.
+        """
+        for réponse in self._prévoir(partie, 3 - joueur):
+            partie.jouer(3 - joueur, réponse)
+            if not partie.est_terminée():
+                murs = [joueur['murs'] for joueur in partie.état['joueurs']]
+                clé = clé_position(partie.damier, murs, joueur)
+                with self._verrou:
+                    if self._arrêt.is_set() or self._voulue is not None:
+                        break
+                    self._en_cours = clé
+                type_coup, position = partie.jouer_le_coup(joueur, arrêt=self._arrêt,
+                                                           **self.réglages)
+                with self._verrou:
+                    self._en_cours = None
+                    if self._arrêt.is_set():
+                        #recherche interrompue: son coup n'est pas fiable
+                        break
+                    coup = case(position) if type_coup == "D" \
+                        else PREMIER_MUR + indice_mur(type_coup, position)
+                    self._coups[clé] = (coup, partie.rapport)
+            partie.annuler()
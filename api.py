@@ -1,26 +1,39 @@
 """Module d'API du jeu Quoridor
 
+Les requêtes passent par un `ClientPax`, qui garde ses connexions ouvertes d'un
+appel à l'autre, borne l'attente du serveur et réessaie les échecs passagers.
+Les fonctions du module utilisent le client partagé.
+
 Attributes:
     URL (str): Constante représentant le début de l'url du serveur de jeu.
 
+Classes:
+    * ClientPax - Client du serveur de jeu avec connexions persistantes.
+
 Functions:
+    * client_partagé - Client utilisé par les fonctions du module.
     * lister_parties - Récupérer la liste des parties reçus du serveur.
     * débuter_partie - Créer une nouvelle partie et retourne l'état de cette dernière.
     * récupérer_partie - Retrouver l'état d'une partie spécifique.
     * jouer_coup - Exécute un coup et retourne le nouvel état de jeu.
 """
 
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
 
 URL = "https://pax.ulaval.ca/quoridor/api/v2/"
 
+_CLIENT = None
 
-def lister_parties(idul, secret):
-    """Lister les parties
+
+def _décoder(rep):
+    """Décoder la réponse du serveur selon son code.
 
     Args:
-        idul (str): idul du joueur
-        secret (str): secret récupérer depuis le site de PAX
+        rep (Response): la réponse du serveur.
 
     Raises:
         PermissionError: Erreur levée lorsque le serveur retourne un code 401.
@@ -28,29 +41,207 @@ def lister_parties(idul, secret):
         ConnectionError: Erreur levée lorsque le serveur retourne un code autre que 200, 401 ou 406
 
     Returns:
-        list: Liste des parties reçues du serveur,
-             après avoir décodé le json de sa réponse.
+        dict: Le JSON décodé de la réponse.
     """
-    rep = requests.get(URL + 'parties', auth=(idul, secret))
-
     if rep.status_code == 200:
         # the request was carried out normally;
-        # decode the JSON and display the game list
-        rep = rep.json()
-    elif rep.status_code == 401:
+        # decode the JSON
+        return rep.json()
+    if rep.status_code == 401:
         # Your request is invalid;
         # decode the JSON and display the error message
         rep = rep.json()
         raise Exception(PermissionError(f"Website message: {rep['message']}"))
-    elif rep.status_code == 406:
+    if rep.status_code == 406:
         # Your request is invalid;
         # decode the JSON and display the error message
         rep = rep.json()
         raise Exception(RuntimeError(f"Website message: {rep['message']}"))
-    else:
-        # An unexpected error occurred
-        raise ConnectionError()
-    return rep["parties"]
+    # An unexpected error occurred
+    raise ConnectionError()
+
+
+def _non_connecté(erreur):
+    """Déterminer si une erreur réseau est survenue avant l'envoi de la requête.
+
+    Args:
+        erreur (RequestException): l'erreur levée par `requests`.
+
+    Returns:
+        bool: True si la connexion au serveur n'a pas pu être établie.
+    """
+    if isinstance(erreur, requests.ConnectTimeout):
+        return True
+    raison = getattr(erreur.args[0], "reason", None) if erreur.args else None
+    return isinstance(raison, ConnectTimeoutError)
+
+
+class ClientPax():
+    """Client du serveur de jeu avec connexions persistantes.
+
+    Les connexions de la session sont gardées ouvertes et réutilisées, ce qui
+    évite une poignée de main TCP et TLS à chaque coup. Les lectures (GET) sont
+    réessayées après une erreur réseau ou un code 5xx; les écritures (POST, PUT)
+    seulement si la connexion n'a pas pu être établie, pour ne jamais envoyer
+    deux fois un coup. L'attente double à chaque essai.
+
+    Un coup est envoyé directement, sans relire la partie: le client retient les
+    parties dont le serveur a annoncé le gagnant et ne relit une partie qu'après
+    un coup refusé, ou avant chaque coup si `vérifier` est True.
+
+    Attributes:
+        url (str): le début de l'url du serveur.
+        délais (Tuple[float, float]): les délais de connexion et de lecture, en secondes.
+        essais (int): le nombre de nouveaux essais après un échec passager.
+        attente (float): l'attente avant le premier nouvel essai, en secondes.
+        vérifier (bool): True pour relire la partie avant chaque coup.
+        session (Session): la session qui garde les connexions.
+    """
+
+    def __init__(self, url=URL, délai_connexion=3.05, délai_lecture=30.0, essais=3,
+                 attente=0.5, connexions=4, vérifier=False):
+        """Constructeur de la classe ClientPax.
+
+        Args:
+            url (str, optionnel): le début de l'url du serveur.
+            délai_connexion (float, optionnel): l'attente maximale de la connexion.
+            délai_lecture (float, optionnel): l'attente maximale de la réponse.
+            essais (int, optionnel): le nombre de nouveaux essais après un échec passager.
+            attente (float, optionnel): l'attente avant le premier nouvel essai.
+            connexions (int, optionnel): le nombre de connexions gardées ouvertes.
+            vérifier (bool, optionnel): True pour relire la partie avant chaque coup.
+        """
+        self.url = url
+        self.délais = (délai_connexion, délai_lecture)
+        self.essais = essais
+        self.attente = attente
+        self.vérifier = vérifier
+        self._terminées = set()
+        self.session = requests.Session()
+        adaptateur = HTTPAdapter(pool_connections=1, pool_maxsize=connexions)
+        self.session.mount("https://", adaptateur)
+        self.session.mount("http://", adaptateur)
+
+    def requête(self, méthode, chemin, idul, secret, **options):
+        """Envoyer une requête au serveur, en réessayant les échecs passagers.
+
+        Args:
+            méthode (str): la méthode HTTP.
+            chemin (str): le chemin après `url`.
+            idul (str): idul du joueur
+            secret (str): secret récupérer depuis le site de PAX
+            **options: les options de `Session.request`, par exemple `json`.
+
+        Raises:
+            requests.RequestException: Le serveur reste injoignable après tous les essais.
+
+        Returns:
+            Response: la réponse du serveur.
+        """
+        lecture = méthode == "GET"
+        for essai in range(self.essais + 1):
+            dernier = essai == self.essais
+            try:
+                rep = self.session.request(méthode, self.url + chemin, auth=(idul, secret),
+                                           timeout=self.délais, **options)
+            except (requests.ConnectionError, requests.Timeout) as erreur:
+                #si la connexion a été établie, la requête a peut-être été reçue:
+                #seule une lecture est alors renvoyée
+                if dernier or not (lecture or _non_connecté(erreur)):
+                    raise
+            else:
+                if rep.status_code < 500 or dernier or not lecture:
+                    return rep
+            time.sleep(self.attente * 2 ** essai)
+        return rep
+
+    def lister_parties(self, idul, secret):
+        """Lister les parties, voir `lister_parties`."""
+        return _décoder(self.requête("GET", "parties", idul, secret))["parties"]
+
+    def débuter_partie(self, idul, secret):
+        """Débuter une partie, voir `débuter_partie`."""
+        rep = _décoder(self.requête("POST", "partie", idul, secret))
+        return (rep["id"], rep["état"])
+
+    def récupérer_partie(self, id_partie, idul, secret):
+        """Récupérer une partie, voir `récupérer_partie`."""
+        rep = _décoder(self.requête("GET", "partie/" + id_partie, idul, secret))
+        return (rep["id"], rep["état"])
+
+    def jouer_coup(self, id_partie, type_coup, position, idul, secret, vérifier=None):
+        """Jouer un coup, voir `jouer_coup`."""
+        if id_partie in self._terminées:
+            raise Exception(StopIteration("The game is over!"))
+        if self.vérifier if vérifier is None else vérifier:
+            self._vérifier_partie(id_partie, idul, secret)
+        rep = self.requête(
+            "PUT",
+            "jouer",
+            idul,
+            secret,
+            json={
+                "id": id_partie,
+                "type": type_coup,
+                "pos": position,
+            }
+        )
+        if rep.status_code == 406:
+            #le coup est refusé: la partie est peut-être terminée
+            self._vérifier_partie(id_partie, idul, secret)
+        fin = _décoder(rep)
+        if fin.get('gagnant'):
+            self._terminées.add(id_partie)
+        return (id_partie, fin)
+
+    def _vérifier_partie(self, id_partie, idul, secret):
+        """Vérifier auprès du serveur que la partie n'est pas terminée.
+
+        Args:
+            id_partie (str): Identifiant de la partie.
+            idul (str): idul du joueur
+            secret (str): secret récupérer depuis le site de PAX
+
+        Raises:
+            StopIteration: Erreur levée lorsqu'il y a un gagnant dans la réponse du serveur.
+        """
+        rep = _décoder(self.requête("GET", "partie/" + id_partie, idul, secret))
+        if rep['gagnant']:
+            self._terminées.add(id_partie)
+            raise Exception(StopIteration("The game is over!"))
+
+
+def client_partagé():
+    """Client utilisé par les fonctions du module.
+
+    Il est créé au premier appel avec les réglages par défaut de `ClientPax`.
+
+    Returns:
+        ClientPax: le client partagé.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = ClientPax()
+    return _CLIENT
+
+
+def lister_parties(idul, secret):
+    """Lister les parties
+
+    Args:
+        idul (str): idul du joueur
+        secret (str): secret récupérer depuis le site de PAX
+
+    Raises:
+        PermissionError: Erreur levée lorsque le serveur retourne un code 401.
+        RuntimeError: Erreur levée lorsque le serveur retourne un code 406.
+        ConnectionError: Erreur levée lorsque le serveur retourne un code autre que 200, 401 ou 406
+
+    Returns:
+        list: Liste des parties reçues du serveur,
+             après avoir décodé le json de sa réponse.
+    """
+    return client_partagé().lister_parties(idul, secret)
 
 
 def débuter_partie(idul, secret):
@@ -70,27 +261,7 @@ def débuter_partie(idul, secret):
             et de l'état courant du jeu, après avoir décodé
             le JSON de sa réponse.
     """
-    rep = requests.post(URL + "partie", auth=(idul, secret))
-
-    if rep.status_code == 200:
-        # the request was carried out normally;
-        # decode the JSON and display the game list
-        rep = rep.json()
-    elif rep.status_code == 401:
-        # Your request is invalid;
-        # decode the JSON and display the error message
-        rep = rep.json()
-        raise Exception(PermissionError(f"Website message: {rep['message']}"))
-    elif rep.status_code == 406:
-        # Your request is invalid;
-        # decode the JSON and display the error message
-        rep = rep.json()
-        raise Exception(RuntimeError(f"Website message: {rep['message']}"))
-    else:
-        # An unexpected error occurred
-        raise ConnectionError()
-
-    return (rep["id"], rep["état"])
+    return client_partagé().débuter_partie(idul, secret)
 
 
 def récupérer_partie(id_partie, idul, secret):
@@ -111,32 +282,15 @@ def récupérer_partie(id_partie, idul, secret):
             et de l'état courant du jeu, après avoir décodé
             le JSON de sa réponse.
     """
-    rep = requests.get(URL + 'partie/' + id_partie, auth=(idul, secret))
-
-    if rep.status_code == 200:
-        # the request was carried out normally;
-        # decode the JSON and display the game list
-        rep = rep.json()
-    elif rep.status_code == 401:
-        # Your request is invalid;
-        # decode the JSON and display the error message
-        rep = rep.json()
-        raise Exception(PermissionError(f"Website message: {rep['message']}"))
-    elif rep.status_code == 406:
-        # Your request is invalid;
-        # decode the JSON and display the error message
-        rep = rep.json()
-        raise Exception(RuntimeError(f"Website message: {rep['message']}"))
-    else:
-        # An unexpected error occurred
-        raise ConnectionError()
+    return client_partagé().récupérer_partie(id_partie, idul, secret)
 
-    return (rep["id"], rep["état"])
 
-
-def jouer_coup(id_partie, type_coup, position, idul, secret):
+def jouer_coup(id_partie, type_coup, position, idul, secret, vérifier=None):
     """Jouer un coup
 
+    Le coup est envoyé sans relire d'abord la partie: qu'elle soit terminée est
+    connu par la réponse à un coup précédent, ou par une lecture après un refus.
+
     Args:
         id_partie (str): Identifiant de la partie.
         type_coup (str): Type de coup du joueur :
@@ -146,6 +300,8 @@ def jouer_coup(id_partie, type_coup, position, idul, secret):
         position (list): La position [x, y] du coup.
         idul (str): idul du joueur
         secret (str): secret récupérer depuis le site de PAX
+        vérifier (bool, optionnel): True pour relire la partie avant de jouer;
+            par défaut le réglage du client partagé.
 
     Raises:
         StopIteration: Erreur levée lorsqu'il y a un gagnant dans la réponse du serveur.
@@ -158,33 +314,4 @@ def jouer_coup(id_partie, type_coup, position, idul, secret):
             et de l'état courant du jeu, après avoir décodé
             le JSON de sa réponse.
     """
-    rep = requests.get(URL + 'partie/' + id_partie, auth=(idul, secret))
-
-    if rep.status_code == 200:
-        rep = rep.json()
-        if rep['gagnant']:
-            raise Exception(StopIteration("The game is over!"))
-        rep = requests.put(
-        URL+ 'jouer',
-        auth=(idul, secret),
-        json={
-            "id": id_partie,
-            "type": type_coup,
-            "pos": position,
-             }
-         )
-        fin = rep.json()
-        return (id_partie, fin)
-
-    if rep.status_code == 401:
-        # Your request is invalid;
-        # decode the JSON and display the error message
-        rep = rep.json()
-        raise Exception(PermissionError(f"Website message: {rep['message']}"))
-    if rep.status_code == 406:
-        # Your request is invalid;
-        # decode the JSON and display the error message
-        rep = rep.json()
-        raise Exception(RuntimeError(f"Website message: {rep['message']}"))
-    # An unexpected error occurred
-    raise ConnectionError()
+    return client_partagé().jouer_coup(id_partie, type_coup, position, idul, secret, vérifier)
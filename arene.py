@@ -0,0 +1,213 @@
+"""Module de l'arène
+
+Fait jouer deux moteurs l'un contre l'autre, en local et sans réseau, sur un
+pool de processus. Un moteur est soit un dictionnaire de réglages passés à
+`Quoridor.jouer_le_coup` (par exemple ``{"moteur": "mcts", "temps": 0.5}``),
+soit une fonction de module ``f(partie, joueur)`` qui retourne un coup au même
+format. Les couleurs alternent d'une partie à l'autre et chaque partie commence
+par quelques demi-coups tirés au hasard pour que les parties diffèrent.
+
+Un moteur qui lève une erreur ou joue un coup illégal perd la partie par
+forfait. Un forfait n'est compté ni comme une victoire ni comme une nulle: il
+est rapporté à part avec son erreur, qui est aussi affichée sur la sortie
+d'erreur par la ligne de commande.
+
+Les résultats sont produits au fur et à mesure que les parties se terminent:
+
+    python arene.py --parties 20 --a '{"temps": 0.2}' --b '{"moteur": "mcts", "temps": 0.2}'
+
+Functions:
+    * jouer_partie - Jouer une partie complète entre deux moteurs.
+    * arène - Jouer une série de parties et produire les résultats au fil de l'eau.
+    * résumer - Bilan d'une série de parties du point de vue du moteur A.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from quoridor import Quoridor
+
+from quoridor_error import QuoridorError
+
+from damier import PREMIER_MUR
+
+
+def _coup(moteur, partie, joueur):
+    """Demander un coup à un moteur.
+
+    Args:
+        moteur (dict | Callable): les réglages de `jouer_le_coup` ou une fonction.
+        partie (Quoridor): la partie en cours.
+        joueur (int): le joueur au trait.
+
+    Returns:
+        Tuple[Tuple[str, List[int, int]], dict]: le coup et le rapport du moteur.
+    """
+    if callable(moteur):
+        return moteur(partie, joueur), {}
+    coup = partie.jouer_le_coup(joueur, **moteur)
+    return coup, partie.rapport
+
+
+def jouer_partie(moteur_a, moteur_b, a_commence=True, limite=200, ouverture=2, graine=None):
+    """Jouer une partie complète entre deux moteurs.
+
+    Args:
+        moteur_a (dict | Callable): le moteur A.
+        moteur_b (dict | Callable): le moteur B.
+        a_commence (bool, optionnel): True si A joue le joueur 1.
+        limite (int, optionnel): le nombre de demi-coups au-delà duquel la partie est nulle.
+        ouverture (int, optionnel): le nombre de demi-coups joués au hasard au début.
+        graine (int, optionnel): la graine des coups d'ouverture.
+
+    Returns:
+        dict: le gagnant ('A', 'B' ou None pour une nulle ou un forfait), le moteur
+            qui a perdu par forfait s'il y a lieu et l'erreur qui l'a causé, le nombre
+            de demi-coups, et pour chaque moteur le nombre de coups, le temps et les
+            nœuds cumulés.
+    """
+    générateur = random.Random(graine)
+    moteurs = {1: ("A", moteur_a), 2: ("B", moteur_b)} if a_commence \
+        else {1: ("B", moteur_b), 2: ("A", moteur_a)}
+    bilan = {nom: {"coups": 0, "temps": 0.0, "nœuds": 0} for nom in ("A", "B")}
+    partie = Quoridor(["A", "B"] if a_commence else ["B", "A"])
+
+    joueur = 1
+    demi_coups = 0
+    forfait = erreur = None
+    while not partie.est_terminée() and demi_coups < limite:
+        if demi_coups < ouverture:
+            #seuls des déplacements pour ne pas gaspiller de murs
+            coup = générateur.choice([coup for coup in partie.coups_légaux(joueur)
+                                      if coup < PREMIER_MUR])
+        else:
+            nom, moteur = moteurs[joueur]
+            début = time.perf_counter()
+            try:
+                coup, rapport = _coup(moteur, partie, joueur)
+            except Exception as exception:
+                #un moteur qui plante perd par forfait, rapporté avec son erreur
+                forfait = nom
+                erreur = f"{type(exception).__name__}: {exception}"
+                break
+            bilan[nom]["temps"] += time.perf_counter() - début
+            bilan[nom]["coups"] += 1
+            bilan[nom]["nœuds"] += rapport.get("nœuds", rapport.get("simulations", 0))
+        try:
+            partie.jouer(joueur, coup)
+        except QuoridorError as exception:
+            #un coup illégal aussi
+            forfait = moteurs[joueur][0]
+            erreur = f"coup illégal {coup} du joueur {joueur} au demi-coup {demi_coups}: " \
+                     f"{exception}"
+            break
+        joueur = 3 - joueur
+        demi_coups += 1
+
+    return {
+        "gagnant": None if forfait else partie.est_terminée() or None,
+        "forfait": forfait,
+        "erreur": erreur,
+        "a_commence": a_commence,
+        "demi_coups": demi_coups,
+        "A": bilan["A"],
+        "B": bilan["B"],
+    }
+
+
+def résumer(résultats):
+    """Bilan d'une série de parties du point de vue du moteur A.
+
+    Args:
+        résultats (List[dict]): les résultats de `jouer_partie`.
+
+    Returns:
+        dict: les victoires, nulles et défaites de A, les forfaits de chaque moteur,
+            le nombre moyen de demi-coups, et pour chaque moteur le temps moyen par
+            coup et les nœuds par seconde.
+    """
+    parties = len(résultats)
+    bilan = {
+        "parties": parties,
+        "victoires": sum(résultat["gagnant"] == "A" for résultat in résultats),
+        "nulles": sum(résultat["gagnant"] is None and not résultat["forfait"]
+                      for résultat in résultats),
+        "défaites": sum(résultat["gagnant"] == "B" for résultat in résultats),
+        "forfaits": {nom: sum(résultat["forfait"] == nom for résultat in résultats)
+                     for nom in ("A", "B")},
+        "demi_coups_moyens": sum(résultat["demi_coups"] for résultat in résultats)
+                             / parties if parties else 0.0,
+    }
+    for nom in ("A", "B"):
+        coups = sum(résultat[nom]["coups"] for résultat in résultats)
+        temps = sum(résultat[nom]["temps"] for résultat in résultats)
+        nœuds = sum(résultat[nom]["nœuds"] for résultat in résultats)
+        bilan[nom] = {
+            "temps_par_coup": temps / coups if coups else 0.0,
+            "nœuds_par_seconde": nœuds / temps if temps else 0.0,
+        }
+    return bilan
+
+
+def arène(moteur_a, moteur_b, parties=10, processus=0, limite=200, ouverture=2, graine=0):
+    """Jouer une série de parties et produire les résultats au fil de l'eau.
+
+    A joue le joueur 1 dans les parties paires et le joueur 2 dans les impaires.
+
+    Args:
+        moteur_a (dict | Callable): le moteur A.
+        moteur_b (dict | Callable): le moteur B.
+        parties (int, optionnel): le nombre de parties.
+        processus (int, optionnel): le nombre de processus; 0 pour un par cœur.
+        limite (int, optionnel): le nombre de demi-coups au-delà duquel une partie est nulle.
+        ouverture (int, optionnel): le nombre de demi-coups joués au hasard au début.
+        graine (int, optionnel): la graine de la série; la partie i utilise graine + i.
+
+    Returns:
+        Iterator[Tuple[dict, dict]]: pour chaque partie terminée, son résultat et
+            le bilan de toutes les parties terminées jusque-là.
+    """
+    processus = processus or os.cpu_count() or 1
+    terminées = []
+    with ProcessPoolExecutor(max_workers=processus) as exécuteur:
+        tâches = [exécuteur.submit(jouer_partie, moteur_a, moteur_b, rang % 2 == 0,
+                                   limite, ouverture, graine + rang)
+                  for rang in range(parties)]
+        for tâche in as_completed(tâches):
+            résultat = tâche.result()
+            terminées.append(résultat)
+            yield résultat, résumer(terminées)
+
+
+if __name__ == "__main__":
+    ANALYSEUR = argparse.ArgumentParser(description="Arène Quoridor")
+    ANALYSEUR.add_argument("--a", type=json.loads, default={},
+                           help="Réglages JSON de jouer_le_coup pour le moteur A.")
+    ANALYSEUR.add_argument("--b", type=json.loads, default={"temps": 0.1, "profondeur": 2},
+                           help="Réglages JSON de jouer_le_coup pour le moteur B.")
+    ANALYSEUR.add_argument("--parties", type=int, default=10, help="Nombre de parties.")
+    ANALYSEUR.add_argument("--processus", type=int, default=0,
+                           help="Nombre de processus, 0 pour un par cœur.")
+    ANALYSEUR.add_argument("--limite", type=int, default=200,
+                           help="Demi-coups avant de déclarer la partie nulle.")
+    ARGUMENTS = ANALYSEUR.parse_args()
+
+    for RÉSULTAT, BILAN in arène(ARGUMENTS.a, ARGUMENTS.b, ARGUMENTS.parties,
+                                 ARGUMENTS.processus, ARGUMENTS.limite):
+        if RÉSULTAT["forfait"]:
+            print(f"partie {BILAN['parties']}: forfait de {RÉSULTAT['forfait']} "
+                  f"({RÉSULTAT['erreur']})", file=sys.stderr, flush=True)
+        print(f"partie {BILAN['parties']}: gagnant {RÉSULTAT['gagnant']} "
+              f"en {RÉSULTAT['demi_coups']} demi-coups | "
+              f"A {BILAN['victoires']}-{BILAN['nulles']}-{BILAN['défaites']} | "
+              f"forfaits A {BILAN['forfaits']['A']} B {BILAN['forfaits']['B']} | "
+              f"{BILAN['demi_coups_moyens']:.1f} demi-coups en moyenne | "
+              f"A {BILAN['A']['temps_par_coup']:.3f} s/coup "
+              f"{BILAN['A']['nœuds_par_seconde']:.0f} nœuds/s | "
+              f"B {BILAN['B']['temps_par_coup']:.3f} s/coup "
+              f"{BILAN['B']['nœuds_par_seconde']:.0f} nœuds/s", flush=True)
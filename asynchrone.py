@@ -0,0 +1,243 @@
+"""Module des parties simultanées
+
+Variante asyncio des fonctions de `api` et ordonnanceur qui mène plusieurs
+parties contre le serveur depuis un seul processus. Les requêtes bloquantes du
+`ClientPax` attendent dans des fils dédiés, si bien que les attentes réseau des
+parties se chevauchent; les recherches de `jouer_le_coup` sont confiées à un
+pool de processus pour ne pas bloquer la boucle d'événements.
+
+    python asynchrone.py idul --secret ... --parties 20 --concurrence 5 --réglages '{"temps": 1}'
+
+Classes:
+    * ClientAsynchrone - Client du serveur de jeu utilisable avec asyncio.
+
+Functions:
+    * lister_parties - Variante asyncio de `api.lister_parties`.
+    * débuter_partie - Variante asyncio de `api.débuter_partie`.
+    * récupérer_partie - Variante asyncio de `api.récupérer_partie`.
+    * jouer_coup - Variante asyncio de `api.jouer_coup`.
+    * jouer_partie - Mener une partie complète contre le serveur.
+    * jouer_parties - Mener plusieurs parties à la fois et produire les résultats au fil de l'eau.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from api import ClientPax
+
+from quoridor import Quoridor
+
+_CLIENT = None
+
+
+class ClientAsynchrone():
+    """Client du serveur de jeu utilisable avec asyncio.
+
+    Attributes:
+        client (ClientPax): le client qui envoie les requêtes.
+    """
+
+    def __init__(self, client=None, fils=16):
+        """Constructeur de la classe ClientAsynchrone.
+
+        Args:
+            client (ClientPax, optionnel): le client à utiliser; par défaut un
+                nouveau client qui garde `fils` connexions ouvertes.
+            fils (int, optionnel): le nombre de requêtes en cours à la fois.
+        """
+        self.client = client or ClientPax(connexions=fils)
+        self._fils = ThreadPoolExecutor(max_workers=fils)
+
+    async def _appeler(self, méthode, *args):
+        """Exécuter une méthode bloquante du client dans un fil dédié."""
+        boucle = asyncio.get_running_loop()
+        return await boucle.run_in_executor(self._fils, functools.partial(méthode, *args))
+
+    async def lister_parties(self, idul, secret):
+        """Lister les parties, voir `api.lister_parties`."""
+        return await self._appeler(self.client.lister_parties, idul, secret)
+
+    async def débuter_partie(self, idul, secret):
+        """Débuter une partie, voir `api.débuter_partie`."""
+        return await self._appeler(self.client.débuter_partie, idul, secret)
+
+    async def récupérer_partie(self, id_partie, idul, secret):
+        """Récupérer une partie, voir `api.récupérer_partie`."""
+        return await self._appeler(self.client.récupérer_partie, id_partie, idul, secret)
+
+    async def jouer_coup(self, id_partie, type_coup, position, idul, secret, vérifier=None):
+        """Jouer un coup, voir `api.jouer_coup`."""
+        return await self._appeler(self.client.jouer_coup, id_partie, type_coup, position,
+                                   idul, secret, vérifier)
+
+    def fermer(self):
+        """Attendre les requêtes en cours et fermer les connexions."""
+        self._fils.shutdown()
+        self.client.session.close()
+
+
+def _client_partagé():
+    """Client asynchrone utilisé par les fonctions du module."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = ClientAsynchrone()
+    return _CLIENT
+
+
+async def lister_parties(idul, secret):
+    """Variante asyncio de `api.lister_parties`."""
+    return await _client_partagé().lister_parties(idul, secret)
+
+
+async def débuter_partie(idul, secret):
+    """Variante asyncio de `api.débuter_partie`."""
+    return await _client_partagé().débuter_partie(idul, secret)
+
+
+async def récupérer_partie(id_partie, idul, secret):
+    """Variante asyncio de `api.récupérer_partie`."""
+    return await _client_partagé().récupérer_partie(id_partie, idul, secret)
+
+
+async def jouer_coup(id_partie, type_coup, position, idul, secret, vérifier=None):
+    """Variante asyncio de `api.jouer_coup`."""
+    return await _client_partagé().jouer_coup(id_partie, type_coup, position, idul, secret,
+                                              vérifier)
+
+
+def _choisir_coup(état, réglages):
+    """Chercher le coup du joueur 1 dans un processus du pool.
+
+    Args:
+        état (dict): l'état du jeu reçu du serveur.
+        réglages (dict): les réglages de `Quoridor.jouer_le_coup`.
+
+    Returns:
+        Tuple[Tuple[str, List[int, int]], dict]: le coup et le rapport du moteur.
+    """
+    partie = Quoridor.depuis_serveur(état)
+    coup = partie.jouer_le_coup(1, **réglages)
+    return coup, partie.rapport
+
+
+async def jouer_partie(client, idul, secret, exécuteur, réglages=None):
+    """Mener une partie complète contre le serveur.
+
+    Comme dans `main.py`, notre joueur est le joueur 1.
+
+    Args:
+        client (ClientAsynchrone): le client du serveur.
+        idul (str): idul du joueur
+        secret (str): secret récupérer depuis le site de PAX
+        exécuteur (Executor): le pool où chercher les coups.
+        réglages (dict, optionnel): les réglages de `Quoridor.jouer_le_coup`.
+
+    Returns:
+        dict: l'identifiant de la partie, le nom du gagnant (None si la partie a été
+            interrompue), le nombre de coups joués, le temps passé à chercher et à
+            attendre le serveur, et le message de l'erreur qui a interrompu la
+            partie s'il y a lieu.
+    """
+    boucle = asyncio.get_running_loop()
+    résultat = {"id": None, "gagnant": None, "coups": 0, "calcul": 0.0, "réseau": 0.0,
+                "erreur": None}
+    try:
+        début = time.perf_counter()
+        résultat["id"], état = await client.débuter_partie(idul, secret)
+        résultat["réseau"] += time.perf_counter() - début
+        while not Quoridor.depuis_serveur(état).est_terminée():
+            début = time.perf_counter()
+            (type_coup, position), _ = await boucle.run_in_executor(
+                exécuteur, _choisir_coup, état, réglages or {})
+            résultat["calcul"] += time.perf_counter() - début
+
+            début = time.perf_counter()
+            _, réponse = await client.jouer_coup(résultat["id"], type_coup, position,
+                                                 idul, secret)
+            résultat["réseau"] += time.perf_counter() - début
+            résultat["coups"] += 1
+            état = réponse["état"]
+            if réponse.get("gagnant"):
+                break
+        résultat["gagnant"] = Quoridor.depuis_serveur(état).est_terminée() or None
+    except Exception as erreur:
+        #les erreurs de `api` enveloppent l'erreur réelle
+        cause = erreur.args[0] if erreur.args and isinstance(erreur.args[0], Exception) \
+            else erreur
+        résultat["erreur"] = f"{type(cause).__name__}: {cause}"
+    return résultat
+
+
+async def jouer_parties(idul, secret, parties=10, concurrence=4, processus=0, réglages=None,
+                        client=None):
+    """Mener plusieurs parties à la fois et produire les résultats au fil de l'eau.
+
+    Args:
+        idul (str): idul du joueur
+        secret (str): secret récupérer depuis le site de PAX
+        parties (int | List[dict], optionnel): le nombre de parties, ou les réglages
+            de `Quoridor.jouer_le_coup` de chaque partie.
+        concurrence (int, optionnel): le nombre maximal de parties en cours à la fois.
+        processus (int, optionnel): le nombre de processus qui cherchent les coups;
+            0 pour un par cœur.
+        réglages (dict, optionnel): les réglages de `Quoridor.jouer_le_coup` des
+            parties données par leur nombre.
+        client (ClientAsynchrone, optionnel): le client à utiliser; par défaut un
+            client avec une connexion par partie simultanée.
+
+    Returns:
+        AsyncIterator[dict]: le résultat de `jouer_partie` de chaque partie terminée.
+    """
+    if isinstance(parties, int):
+        parties = [réglages or {}] * parties
+    propre = client is None
+    client = client or ClientAsynchrone(fils=concurrence)
+    limite = asyncio.Semaphore(concurrence)
+
+    async def jouer(exécuteur, réglages_partie):
+        async with limite:
+            return await jouer_partie(client, idul, secret, exécuteur, réglages_partie)
+
+    try:
+        with ProcessPoolExecutor(max_workers=processus or os.cpu_count() or 1) as exécuteur:
+            tâches = [asyncio.ensure_future(jouer(exécuteur, réglages_partie))
+                      for réglages_partie in parties]
+            for tâche in asyncio.as_completed(tâches):
+                yield await tâche
+    finally:
+        if propre:
+            client.fermer()
+
+
+async def _principal(arguments):
+    """Mener les parties de la ligne de commande et afficher leurs résultats."""
+    victoires = terminées = 0
+    async for résultat in jouer_parties(arguments.idul, arguments.secret, arguments.parties,
+                                        arguments.concurrence, arguments.processus,
+                                        arguments.réglages):
+        terminées += 1
+        victoires += résultat["gagnant"] == arguments.idul
+        print(f"partie {terminées}/{arguments.parties} {résultat['id']}: "
+              f"gagnant {résultat['gagnant']} en {résultat['coups']} coups | "
+              f"calcul {résultat['calcul']:.1f} s, réseau {résultat['réseau']:.1f} s"
+              + (f" | {résultat['erreur']}" if résultat["erreur"] else "")
+              + f" | {victoires} victoires", flush=True)
+
+
+if __name__ == "__main__":
+    ANALYSEUR = argparse.ArgumentParser(description="Parties simultanées contre le serveur")
+    ANALYSEUR.add_argument("idul", help="IDUL du joueur")
+    ANALYSEUR.add_argument("--secret", required=True, help="Secret récupéré depuis le site de PAX.")
+    ANALYSEUR.add_argument("--parties", type=int, default=10, help="Nombre de parties.")
+    ANALYSEUR.add_argument("--concurrence", type=int, default=4,
+                           help="Nombre de parties en cours à la fois.")
+    ANALYSEUR.add_argument("--processus", type=int, default=0,
+                           help="Nombre de processus de recherche, 0 pour un par cœur.")
+    ANALYSEUR.add_argument("--réglages", type=json.loads, default={},
+                           help="Réglages JSON de jouer_le_coup.")
+    asyncio.run(_principal(ANALYSEUR.parse_args()))
@@ -0,0 +1,665 @@
+"""Module du damier en bitboard
+
+Représentation du damier sans networkX. Chaque case (x, y) correspond au bit
+``(x - 1) + 9 * (y - 1)`` d'un entier de 81 bits et chaque emplacement de mur
+à un bit d'un entier de 128 bits: les 64 premiers pour les murs horizontaux,
+les 64 suivants pour les murs verticaux. La table `CONFLITS` donne, pour chaque
+emplacement, le masque des emplacements qu'il exclut: vérifier qu'un mur
+chevauche ou croise un mur posé se fait en un seul ET avec le masque des murs.
+
+Classes:
+    * Damier - Damier en bitboard équivalent au graphe de `construire_graphe`.
+
+Functions:
+    * case - Convertir une position [x, y] en indice de case.
+    * position - Convertir un indice de case en position [x, y].
+    * indice_mur - Convertir une position de mur en indice d'emplacement.
+    * position_mur - Convertir un indice d'emplacement en type et position de mur.
+    * murs_légaux - Masque de tous les emplacements où un mur peut être posé dans un état.
+"""
+
+import random
+
+TOUT = (1 << 81) - 1
+RANGÉE_1 = (1 << 9) - 1
+RANGÉE_9 = RANGÉE_1 << 72
+COLONNE_1 = sum(1 << 9 * rangée for rangée in range(9))
+COLONNE_9 = COLONNE_1 << 8
+
+#Rangées à atteindre pour le joueur 1 et le joueur 2
+BUTS = (RANGÉE_9, RANGÉE_1)
+
+#Code du premier coup de mur: 0 à 80 pour un déplacement, puis les 128 emplacements
+PREMIER_MUR = 81
+
+#Masques des emplacements de murs d'une orientation, puis des deux
+_MURS_64 = (1 << 64) - 1
+_MURS_128 = (1 << 128) - 1
+
+#Masques des cases qui ont un voisin dans chaque direction
+_A_EST = TOUT ^ COLONNE_9
+_A_OUEST = TOUT ^ COLONNE_1
+_A_NORD = TOUT ^ RANGÉE_9
+_A_SUD = TOUT ^ RANGÉE_1
+
+
+def case(pos):
+    """Convertir une position [x, y] en indice de case.
+
+    Args:
+        pos (List[int, int]): la position [x, y] (1<=x<=9 et 1<=y<=9).
+
+    Returns:
+        int: l'indice de la case, entre 0 et 80.
+    """
+    return (pos[0] - 1) + 9 * (pos[1] - 1)
+
+
+def position(indice):
+    """Convertir un indice de case en position [x, y].
+
+    Args:
+        indice (int): l'indice de la case, entre 0 et 80.
+
+    Returns:
+        List[int, int]: la position [x, y] de la case.
+    """
+    return [indice % 9 + 1, indice // 9 + 1]
+
+
+def indice_mur(orientation, pos):
+    """Convertir une position de mur en indice d'emplacement.
+
+    Args:
+        orientation (str): 'MH' pour un mur horizontal, 'MV' pour un mur vertical.
+        pos (List[int, int]): la position [x, y] du mur.
+
+    Returns:
+        int: l'indice de l'emplacement (0 à 63 pour 'MH', 64 à 127 pour 'MV'),
+            ou None si la position est invalide pour cette orientation.
+    """
+    x, y = pos[0], pos[1]
+    if orientation == "MH":
+        if 1 <= x <= 8 and 2 <= y <= 9:
+            return (x - 1) + 8 * (y - 2)
+    elif orientation == "MV":
+        if 2 <= x <= 9 and 1 <= y <= 8:
+            return 64 + (x - 2) + 8 * (y - 1)
+    return None
+
+
+def position_mur(indice):
+    """Convertir un indice d'emplacement en type et position de mur.
+
+    Args:
+        indice (int): l'indice de l'emplacement, entre 0 et 127.
+
+    Returns:
+        Tuple[str, List[int, int]]: le type ('MH' ou 'MV') et la position [x, y] du mur.
+    """
+    if indice < 64:
+        return "MH", [indice % 8 + 1, indice // 8 + 2]
+    indice -= 64
+    return "MV", [indice % 8 + 2, indice // 8 + 1]
+
+
+def _construire_blocages():
+    """Calculer les arcs coupés par chacun des 128 emplacements de mur.
+
+    Returns:
+        Tuple[List, List]: pour chaque emplacement, le masque des cases dont l'arc
+            vers le nord est coupé et celui des cases dont l'arc vers l'est est coupé.
+    """
+    nord = [0] * 128
+    est = [0] * 128
+    for indice in range(128):
+        orientation, (x, y) = position_mur(indice)
+        if orientation == "MH":
+            #Coupe (x, y-1)-(x, y) et (x+1, y-1)-(x+1, y)
+            nord[indice] = 0b11 << case([x, y - 1])
+        else:
+            #Coupe (x-1, y)-(x, y) et (x-1, y+1)-(x, y+1)
+            est[indice] = (1 | 1 << 9) << case([x - 1, y])
+    return nord, est
+
+
+BLOQUE_NORD, BLOQUE_EST = _construire_blocages()
+
+
+def _construire_conflits():
+    """Calculer les emplacements exclus par chacun des 128 emplacements de mur.
+
+    Un mur exclut son propre emplacement, les murs de même orientation qui le
+    chevauchent à moitié et le mur d'orientation opposée qui le croise en son
+    milieu. Un mur horizontal et le mur vertical qui le croise ont le même
+    indice modulo 64.
+
+    Returns:
+        List[int]: pour chaque emplacement, le masque de 128 bits des emplacements exclus.
+    """
+    conflits = [0] * 128
+    for indice in range(64):
+        #horizontal: voisins à l'ouest et à l'est sur la même rangée
+        conflits[indice] = 1 << indice | 1 << (64 + indice)
+        if indice % 8 > 0:
+            conflits[indice] |= 1 << (indice - 1)
+        if indice % 8 < 7:
+            conflits[indice] |= 1 << (indice + 1)
+        #vertical: voisins au sud et au nord sur la même colonne
+        conflits[64 + indice] = 1 << (64 + indice) | 1 << indice
+        if indice >= 8:
+            conflits[64 + indice] |= 1 << (64 + indice - 8)
+        if indice < 56:
+            conflits[64 + indice] |= 1 << (64 + indice + 8)
+    return conflits
+
+
+CONFLITS = _construire_conflits()
+
+
+def _construire_zobrist():
+    """Tirer les clés de Zobrist des pions et des emplacements de murs.
+
+    Le germe est fixe pour que les clés soient les mêmes d'un processus à l'autre.
+
+    Returns:
+        Tuple[List, List]: les clés des pions par joueur et par case, puis celles
+            des 128 emplacements de murs.
+    """
+    générateur = random.Random(20200415)
+    pions = [[générateur.getrandbits(64) for _ in range(81)] for _ in range(2)]
+    murs = [générateur.getrandbits(64) for _ in range(128)]
+    return pions, murs
+
+
+ZOBRIST_PIONS, ZOBRIST_MURS = _construire_zobrist()
+
+
+class Damier():
+    """Damier en bitboard équivalent au graphe de `construire_graphe`.
+
+    Les arcs coupés par les murs sont conservés dans deux masques de 81 bits:
+    `bloq_n` pour les arcs (x, y)-(x, y+1) et `bloq_e` pour les arcs (x, y)-(x+1, y).
+    Les sauts par-dessus un pion adjacent sont calculés à la demande.
+
+    Attributes:
+        pions (List[int, int]): les indices des cases des joueurs 1 et 2.
+        murs (int): le masque des emplacements de murs occupés.
+        bloq_n (int): le masque des cases dont l'arc vers le nord est coupé.
+        bloq_e (int): le masque des cases dont l'arc vers l'est est coupé.
+        clé (int): le hachage de Zobrist des pions et des murs, tenu à jour
+            par les opérations incrémentales.
+    """
+
+    __slots__ = ("pions", "murs", "bloq_n", "bloq_e", "clé")
+
+    def __init__(self, joueurs, murs_horizontaux, murs_verticaux):
+        """Constructeur de la classe Damier.
+
+        Args:
+            joueurs (List): une liste des positions [x,y] des joueurs.
+            murs_horizontaux (List): une liste des positions [x,y] des murs horizontaux.
+            murs_verticaux (List): une liste des positions [x,y] des murs verticaux.
+        """
+        self.pions = [case(joueurs[0]), case(joueurs[1])]
+        self.murs = 0
+        self.bloq_n = 0
+        self.bloq_e = 0
+        self.clé = ZOBRIST_PIONS[0][self.pions[0]] ^ ZOBRIST_PIONS[1][self.pions[1]]
+        for pos in murs_horizontaux:
+            self.ajouter_mur(indice_mur("MH", pos))
+        for pos in murs_verticaux:
+            self.ajouter_mur(indice_mur("MV", pos))
+
+    def copie(self):
+        """Copier le damier sans repasser par les listes de positions.
+
+        Returns:
+            Damier: un damier indépendant identique à celui-ci.
+        """
+        copie = Damier.__new__(Damier)
+        copie.pions = list(self.pions)
+        copie.murs = self.murs
+        copie.bloq_n = self.bloq_n
+        copie.bloq_e = self.bloq_e
+        copie.clé = self.clé
+        return copie
+
+    def ajouter_mur(self, mur):
+        """Ajouter un mur en coupant ses deux arcs.
+
+        Seuls les bits de l'emplacement et des 4 arcs touchés changent; les sauts
+        autour des pions sont recalculés à la demande par `successeurs`.
+
+        Args:
+            mur (int): l'indice de l'emplacement, qui ne doit pas déjà être occupé.
+        """
+        self.murs |= 1 << mur
+        self.bloq_n |= BLOQUE_NORD[mur]
+        self.bloq_e |= BLOQUE_EST[mur]
+        self.clé ^= ZOBRIST_MURS[mur]
+
+    def retirer_mur(self, mur):
+        """Retirer un mur ajouté par `ajouter_mur` et rétablir ses deux arcs.
+
+        Args:
+            mur (int): l'indice de l'emplacement.
+        """
+        self.murs &= ~(1 << mur)
+        self.bloq_n &= ~BLOQUE_NORD[mur]
+        self.bloq_e &= ~BLOQUE_EST[mur]
+        self.clé ^= ZOBRIST_MURS[mur]
+
+    def déplacer_pion(self, joueur, indice):
+        """Déplacer un pion sans validation.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+            indice (int): l'indice de la case d'arrivée.
+
+        Returns:
+            int: l'indice de la case de départ, à passer à `annuler_déplacement`.
+        """
+        départ = self.pions[joueur - 1]
+        self.pions[joueur - 1] = indice
+        self.clé ^= ZOBRIST_PIONS[joueur - 1][départ] ^ ZOBRIST_PIONS[joueur - 1][indice]
+        return départ
+
+    def annuler_déplacement(self, joueur, départ):
+        """Ramener un pion sur la case qu'il occupait avant `déplacer_pion`.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+            départ (int): l'indice retourné par `déplacer_pion`.
+        """
+        zobrist = ZOBRIST_PIONS[joueur - 1]
+        self.clé ^= zobrist[self.pions[joueur - 1]] ^ zobrist[départ]
+        self.pions[joueur - 1] = départ
+
+    def voisins(self, cases):
+        """Masque des cases atteignables en un pas depuis un ensemble de cases.
+
+        Ne tient compte que des murs; les pions sont ignorés.
+
+        Args:
+            cases (int): le masque des cases de départ.
+
+        Returns:
+            int: le masque des cases voisines.
+        """
+        bloq_n, bloq_e = self.bloq_n, self.bloq_e
+        return (((cases & _A_EST & ~bloq_e) << 1)
+                | (((cases & _A_OUEST) >> 1) & ~bloq_e)
+                | ((cases & _A_NORD & ~bloq_n) << 9)
+                | (((cases & _A_SUD) >> 9) & ~bloq_n))
+
+    def successeurs(self, indice):
+        """Masque des déplacements admissibles depuis une case.
+
+        Reproduit exactement les arcs sortants de `construire_graphe`, y compris
+        les sauts en ligne droite ou en diagonale lorsque les pions sont adjacents.
+
+        Args:
+            indice (int): l'indice de la case de départ.
+
+        Returns:
+            int: le masque des cases d'arrivée.
+        """
+        bit = 1 << indice
+        voisins = self.voisins(bit)
+        j1, j2 = self.pions
+        if indice == j1:
+            autre = j2
+        elif indice == j2:
+            autre = j1
+        else:
+            return voisins
+
+        bit_autre = 1 << autre
+        if not voisins & bit_autre:
+            return voisins
+
+        #retirer le lien entre les joueurs et sauter par-dessus l'autre pion
+        voisins ^= bit_autre
+        voisins_autre = self.voisins(bit_autre) & ~bit
+        saut = 2 * autre - indice
+        if 0 <= saut < 81 and voisins_autre >> saut & 1:
+            return voisins | 1 << saut
+        return voisins | voisins_autre
+
+    def _expansion(self, frontière):
+        """Masque des cases atteignables en un pas depuis la frontière.
+
+        Args:
+            frontière (int): le masque des cases de départ.
+
+        Returns:
+            int: le masque des cases d'arrivée.
+        """
+        j1, j2 = self.pions
+        pions = (1 << j1) | (1 << j2)
+        suivante = self.voisins(frontière & ~pions)
+        if frontière >> j1 & 1:
+            suivante |= self.successeurs(j1)
+        if frontière >> j2 & 1:
+            suivante |= self.successeurs(j2)
+        return suivante
+
+    def _couches(self, joueur):
+        """Couches du parcours en largeur depuis le pion jusqu'à son but.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Returns:
+            List[int]: les masques des cases à chaque distance, la dernière couche
+                touchant la rangée but; None si le but est inatteignable.
+        """
+        but = BUTS[joueur - 1]
+        vus = frontière = 1 << self.pions[joueur - 1]
+        couches = []
+        while frontière:
+            couches.append(frontière)
+            if frontière & but:
+                return couches
+            frontière = self._expansion(frontière) & ~vus
+            vus |= frontière
+        return None
+
+    def distance(self, joueur):
+        """Nombre de déplacements du pion jusqu'à sa rangée but.
+
+        Le plus court chemin networkX vers 'B1' ou 'B2' compte deux nœuds de plus.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Returns:
+            int: le nombre de déplacements, ou None si le but est inatteignable.
+        """
+        but = BUTS[joueur - 1]
+        vus = frontière = 1 << self.pions[joueur - 1]
+        pas = 0
+        while frontière:
+            if frontière & but:
+                return pas
+            frontière = self._expansion(frontière) & ~vus
+            vus |= frontière
+            pas += 1
+        return None
+
+    def chemin_existe(self, joueur):
+        """Déterminer si le pion peut encore atteindre sa rangée but.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Returns:
+            bool: True si un chemin existe.
+        """
+        but = BUTS[joueur - 1]
+        vus = frontière = 1 << self.pions[joueur - 1]
+        while frontière:
+            if frontière & but:
+                return True
+            frontière = self._expansion(frontière) & ~vus
+            vus |= frontière
+        return False
+
+    def chemin_indices(self, joueur):
+        """Un plus court chemin du pion jusqu'à sa rangée but, en indices de cases.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Returns:
+            List[int]: les indices des cases du chemin, la case du pion incluse,
+                ou None si le but est inatteignable.
+        """
+        couches = self._couches(joueur)
+        if couches is None:
+            return None
+
+        cible = couches[-1] & BUTS[joueur - 1]
+        courant = (cible & -cible).bit_length() - 1
+        chemin = [courant]
+        for couche in reversed(couches[:-1]):
+            while couche:
+                bit = couche & -couche
+                précédent = bit.bit_length() - 1
+                if self.successeurs(précédent) >> courant & 1:
+                    break
+                couche ^= bit
+            courant = précédent
+            chemin.append(courant)
+        chemin.reverse()
+        return chemin
+
+    def chemin(self, joueur):
+        """Un plus court chemin du pion jusqu'à sa rangée but.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Returns:
+            List[List[int, int]]: les positions [x, y] du chemin, la case du pion incluse,
+                ou None si le but est inatteignable.
+        """
+        chemin = self.chemin_indices(joueur)
+        if chemin is None:
+            return None
+        return [position(indice) for indice in chemin]
+
+    def arcs_du_chemin(self, chemin):
+        """Arcs du damier empruntés par un chemin.
+
+        Un saut emprunte les deux arcs qui passent par la case de l'autre pion.
+
+        Args:
+            chemin (List[int]): les indices des cases du chemin.
+
+        Returns:
+            Tuple[int, int]: les masques des arcs vers le nord et vers l'est empruntés,
+                repérés par leur case la plus au sud ou la plus à l'ouest.
+        """
+        arcs_n = arcs_e = 0
+        for départ, arrivée in zip(chemin, chemin[1:]):
+            écart = abs(arrivée - départ)
+            if écart in (1, 9):
+                étapes = ((départ, arrivée),)
+            else:
+                milieu = self.pions[1] if départ == self.pions[0] else self.pions[0]
+                étapes = ((départ, milieu), (milieu, arrivée))
+            for case_a, case_b in étapes:
+                if abs(case_b - case_a) == 9:
+                    arcs_n |= 1 << min(case_a, case_b)
+                else:
+                    arcs_e |= 1 << min(case_a, case_b)
+        return arcs_n, arcs_e
+
+    def en_conflit(self, mur):
+        """Vérifier si un emplacement chevauche ou croise un mur posé.
+
+        Args:
+            mur (int): l'indice de l'emplacement.
+
+        Returns:
+            bool: True si l'emplacement est exclu par `CONFLITS`.
+        """
+        return bool(CONFLITS[mur] & self.murs)
+
+    def murs_libres(self):
+        """Masque des emplacements qui ne chevauchent ni ne croisent aucun mur posé.
+
+        Returns:
+            int: le masque de 128 bits des emplacements libres.
+        """
+        exclus = 0
+        murs = self.murs
+        while murs:
+            bit = murs & -murs
+            murs ^= bit
+            exclus |= CONFLITS[bit.bit_length() - 1]
+        return ~exclus & _MURS_128
+
+    def murs_légaux(self):
+        """Masque de tous les emplacements où un mur peut être posé.
+
+        Un emplacement est légal s'il est libre et s'il laisse un chemin aux deux
+        joueurs. Un mur qui ne coupe aucun arc des plus courts chemins actuels
+        les laisse intacts: seuls les emplacements qui en coupent un sont vérifiés
+        par un parcours.
+
+        Returns:
+            int: le masque de 128 bits des emplacements légaux.
+        """
+        libres = self.murs_libres()
+        arcs_n = arcs_e = 0
+        for joueur in (1, 2):
+            chemin = self.chemin_indices(joueur)
+            if chemin is None:
+                return 0
+            chemin_n, chemin_e = self.arcs_du_chemin(chemin)
+            arcs_n |= chemin_n
+            arcs_e |= chemin_e
+
+        candidats = libres
+        while candidats:
+            bit = candidats & -candidats
+            candidats ^= bit
+            mur = bit.bit_length() - 1
+            if not (BLOQUE_NORD[mur] & arcs_n or BLOQUE_EST[mur] & arcs_e):
+                continue
+            self.ajouter_mur(mur)
+            if not (self.chemin_existe(1) and self.chemin_existe(2)):
+                libres ^= bit
+            self.retirer_mur(mur)
+        return libres
+
+    def _laisse_passer(self, mur, joueurs):
+        """Vérifier qu'un mur libre laisse un chemin à des joueurs.
+
+        Args:
+            mur (int): l'indice de l'emplacement, qui doit être libre.
+            joueurs (Tuple[int]): les numéros des joueurs à vérifier.
+
+        Returns:
+            bool: True si chacun de ces joueurs peut encore atteindre son but.
+        """
+        self.ajouter_mur(mur)
+        passe = all(self.chemin_existe(joueur) for joueur in joueurs)
+        self.retirer_mur(mur)
+        return passe
+
+    def coups_légaux(self, joueur, murs=True, trier=False, premiers=()):
+        """Générer les codes de tous les coups légaux d'un joueur.
+
+        Les coups sont codés comme dans `recherche`: l'indice de la case d'arrivée
+        pour un déplacement, `PREMIER_MUR` + l'indice de l'emplacement pour un mur.
+        La légalité d'un mur n'est vérifiée par un parcours qu'au moment où il est
+        généré, et seulement s'il coupe le plus court chemin d'un joueur. Le damier
+        doit être remis dans son état avant de reprendre le générateur.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+            murs (bool, optionnel): False si le joueur n'a plus de murs.
+            trier (bool, optionnel): True pour générer d'abord les déplacements qui
+                rapprochent le plus du but, puis les murs qui coupent le chemin de
+                l'adversaire, puis les autres.
+            premiers (Iterable[int], optionnel): des codes à générer en premier
+                s'ils sont légaux, par exemple le meilleur coup d'une recherche
+                précédente.
+
+        Returns:
+            Iterator[int]: les codes des coups légaux, chacun une seule fois.
+        """
+        départ = self.pions[joueur - 1]
+        destinations = self.successeurs(départ)
+        libres = self.murs_libres() if murs else 0
+        adversaire = 3 - joueur
+        chemins = {}
+
+        def arcs(numéro):
+            #arcs du plus court chemin d'un joueur, calculés au premier besoin
+            if numéro not in chemins:
+                chemins[numéro] = self.arcs_du_chemin(self.chemin_indices(numéro))
+            return chemins[numéro]
+
+        def coupe(mur):
+            #les joueurs dont le plus court chemin est coupé par le mur
+            return tuple(numéro for numéro in (joueur, adversaire)
+                         if BLOQUE_NORD[mur] & arcs(numéro)[0]
+                         or BLOQUE_EST[mur] & arcs(numéro)[1])
+
+        générés = 0
+        for coup in premiers:
+            if générés >> coup & 1:
+                continue
+            if coup < PREMIER_MUR:
+                if not destinations >> coup & 1:
+                    continue
+            elif not libres >> (coup - PREMIER_MUR) & 1 \
+                    or not self._laisse_passer(coup - PREMIER_MUR, coupe(coup - PREMIER_MUR)):
+                continue
+            générés |= 1 << coup
+            yield coup
+
+        arrivées = []
+        while destinations:
+            bit = destinations & -destinations
+            destinations ^= bit
+            arrivées.append(bit.bit_length() - 1)
+        if trier and len(arrivées) > 1:
+            distances = {}
+            for arrivée in arrivées:
+                self.pions[joueur - 1] = arrivée
+                distance = self.distance(joueur)
+                distances[arrivée] = 81 if distance is None else distance
+            self.pions[joueur - 1] = départ
+            arrivées.sort(key=distances.get)
+        for arrivée in arrivées:
+            if not générés >> arrivée & 1:
+                yield arrivée
+
+        libres &= ~(générés >> PREMIER_MUR)
+        if not libres:
+            return
+        if trier:
+            arcs_n, arcs_e = arcs(adversaire)
+            devant = 0
+            reste = libres
+            while reste:
+                bit = reste & -reste
+                reste ^= bit
+                mur = bit.bit_length() - 1
+                if BLOQUE_NORD[mur] & arcs_n or BLOQUE_EST[mur] & arcs_e:
+                    devant |= bit
+            groupes = (devant, libres ^ devant)
+        else:
+            groupes = (libres,)
+        for groupe in groupes:
+            while groupe:
+                bit = groupe & -groupe
+                groupe ^= bit
+                mur = bit.bit_length() - 1
+                joueurs = coupe(mur)
+                if not joueurs or self._laisse_passer(mur, joueurs):
+                    yield PREMIER_MUR + mur
+
+
+def murs_légaux(état):
+    """Masque de tous les emplacements où un mur peut être posé dans un état.
+
+    Args:
+        état (dict): l'état du jeu, tel que retourné par `Quoridor.état_courant`.
+
+    Returns:
+        int: le masque de 128 bits des emplacements légaux; le bit `indice_mur(...)`
+            est à 1 si le mur correspondant peut être posé.
+    """
+    damier = Damier(
+        [joueur['pos'] for joueur in état['joueurs']],
+        état['murs']['horizontaux'],
+        état['murs']['verticaux']
+    )
+    return damier.murs_légaux()
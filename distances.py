@@ -0,0 +1,301 @@
+"""Module des cartes de distances
+
+Calcule d'un seul coup, avec NumPy, la distance de chaque case du damier
+jusqu'à la rangée but de chaque joueur. Les grilles sont indexées par
+``[x - 1, y - 1]`` comme les positions [x, y] du jeu. Seuls les murs sont
+pris en compte: les pions et leurs sauts sont ignorés.
+
+La classe `CarteDistances` tient à jour, sans NumPy, la carte d'un joueur
+lorsque des murs sont ajoutés: seule la région touchée est recalculée.
+
+Attributes:
+    INATTEIGNABLE (int): Distance donnée aux cases d'où le but est inatteignable.
+
+Classes:
+    * CarteDistances - Distances au but d'un joueur, réparées localement à l'ajout d'un mur.
+
+Functions:
+    * grille - Convertir un masque de 81 bits en grille booléenne 9x9.
+    * propager - Parcours en largeur multi-sources sur des grilles d'arcs ouverts.
+    * cartes_distances - Distances au but de chaque case pour les deux joueurs.
+"""
+
+import heapq
+
+import numpy as np
+
+from damier import BLOQUE_EST, BLOQUE_NORD
+
+INATTEIGNABLE = -1
+
+
+def grille(masque):
+    """Convertir un masque de 81 bits en grille booléenne 9x9.
+
+    Args:
+        masque (int): un masque de cases tel qu'utilisé par `Damier`.
+
+    Returns:
+        ndarray: la grille booléenne indexée par [x - 1, y - 1].
+    """
+    octets = np.frombuffer(masque.to_bytes(11, "little"), dtype=np.uint8)
+    bits = np.unpackbits(octets, bitorder="little")[:81]
+    #Les bits sont rangés par y puis par x
+    return bits.reshape(9, 9).T.astype(bool)
+
+
+def propager(ouvert_n, ouvert_e, sources):
+    """Parcours en largeur multi-sources sur des grilles d'arcs ouverts.
+
+    Les grilles peuvent avoir des dimensions supplémentaires en tête pour
+    traiter plusieurs damiers à la fois.
+
+    Args:
+        ouvert_n (ndarray): True en [x, y] si l'arc (x, y)-(x, y+1) est ouvert.
+        ouvert_e (ndarray): True en [x, y] si l'arc (x, y)-(x+1, y) est ouvert.
+        sources (ndarray): True pour les cases à distance 0.
+
+    Returns:
+        ndarray: la distance (int16) de chaque case à la source la plus proche,
+            ou INATTEIGNABLE.
+    """
+    distances = np.full(sources.shape, INATTEIGNABLE, dtype=np.int16)
+    distances[sources] = 0
+    vus = sources.copy()
+    frontière = sources.copy()
+    pas = 0
+    while frontière.any():
+        pas += 1
+        suivante = np.zeros_like(frontière)
+        #vers l'est et vers l'ouest
+        suivante[..., 1:, :] |= frontière[..., :-1, :] & ouvert_e[..., :-1, :]
+        suivante[..., :-1, :] |= frontière[..., 1:, :] & ouvert_e[..., :-1, :]
+        #vers le nord et vers le sud
+        suivante[..., :, 1:] |= frontière[..., :, :-1] & ouvert_n[..., :, :-1]
+        suivante[..., :, :-1] |= frontière[..., :, 1:] & ouvert_n[..., :, :-1]
+        suivante &= ~vus
+        distances[suivante] = pas
+        vus |= suivante
+        frontière = suivante
+    return distances
+
+
+def cartes_distances(damier):
+    """Distances au but de chaque case pour les deux joueurs.
+
+    Args:
+        damier (Damier): le damier dont on lit les murs.
+
+    Returns:
+        ndarray: un tableau (2, 9, 9) où ``cartes[joueur - 1][x - 1, y - 1]`` est le
+            nombre de pas de (x, y) jusqu'à la rangée but du joueur.
+    """
+    ouvert_n = ~grille(damier.bloq_n)
+    ouvert_e = ~grille(damier.bloq_e)
+    sources = np.zeros((2, 9, 9), dtype=bool)
+    sources[0, :, 8] = True
+    sources[1, :, 0] = True
+    return propager(ouvert_n, ouvert_e, sources)
+
+
+#Distance interne des cases d'où le but est inatteignable, plus grande que toute autre
+_INFINI = 1000
+
+
+class CarteDistances():
+    """Distances au but d'un joueur, réparées localement à l'ajout d'un mur.
+
+    Seuls les murs sont pris en compte, comme pour `cartes_distances`: les pions
+    et leurs sauts sont ignorés. La distance d'un pion diffère donc de
+    `Damier.distance` lorsque les deux pions sont face à face. Un mur coupe au
+    plus deux arcs: seules les cases dont tous les plus courts chemins passaient
+    par ces arcs sont recalculées.
+
+    Attributes:
+        joueur (int): le numéro du joueur (1 ou 2).
+        distances (List[int]): la distance de chaque case, par indice de case.
+        bloq_n (int): le masque des arcs coupés vers le nord, comme `Damier.bloq_n`.
+        bloq_e (int): le masque des arcs coupés vers l'est, comme `Damier.bloq_e`.
+    """
+
+    __slots__ = ("joueur", "distances", "bloq_n", "bloq_e")
+
+    def __init__(self, damier, joueur):
+        """Constructeur de la classe CarteDistances.
+
+        Args:
+            damier (Damier): le damier dont on lit les murs.
+            joueur (int): le numéro du joueur (1 ou 2).
+        """
+        self.joueur = joueur
+        self.bloq_n = damier.bloq_n
+        self.bloq_e = damier.bloq_e
+        but = range(72, 81) if joueur == 1 else range(9)
+        distances = [_INFINI] * 81
+        frontière = list(but)
+        for indice in frontière:
+            distances[indice] = 0
+        while frontière:
+            suivante = []
+            for indice in frontière:
+                for voisin in self._voisins(indice, self.bloq_n, self.bloq_e):
+                    if distances[voisin] == _INFINI:
+                        distances[voisin] = distances[indice] + 1
+                        suivante.append(voisin)
+            frontière = suivante
+        self.distances = distances
+
+    @staticmethod
+    def _voisins(indice, bloq_n, bloq_e):
+        """Cases reliées à une case par un arc ouvert.
+
+        Args:
+            indice (int): l'indice de la case.
+            bloq_n (int): le masque des arcs coupés vers le nord.
+            bloq_e (int): le masque des arcs coupés vers l'est.
+
+        Returns:
+            List[int]: les indices des cases voisines.
+        """
+        voisins = []
+        if indice < 72 and not bloq_n >> indice & 1:
+            voisins.append(indice + 9)
+        if indice >= 9 and not bloq_n >> (indice - 9) & 1:
+            voisins.append(indice - 9)
+        colonne = indice % 9
+        if colonne < 8 and not bloq_e >> indice & 1:
+            voisins.append(indice + 1)
+        if colonne > 0 and not bloq_e >> (indice - 1) & 1:
+            voisins.append(indice - 1)
+        return voisins
+
+    def distance(self, indice):
+        """Distance d'une case jusqu'au but.
+
+        Args:
+            indice (int): l'indice de la case.
+
+        Returns:
+            int: le nombre de pas, ou INATTEIGNABLE.
+        """
+        distance = self.distances[indice]
+        return INATTEIGNABLE if distance == _INFINI else distance
+
+    def arcs_plus_courts(self, indice):
+        """Arcs empruntés par au moins un plus court chemin d'une case jusqu'au but.
+
+        Args:
+            indice (int): l'indice de la case de départ.
+
+        Returns:
+            Tuple[int, int]: les masques des arcs vers le nord et vers l'est, repérés
+                par leur case la plus au sud ou la plus à l'ouest comme dans
+                `Damier.arcs_du_chemin`.
+        """
+        distances = self.distances
+        arcs_n = arcs_e = 0
+        frontière = {indice} if distances[indice] < _INFINI else set()
+        while frontière:
+            suivante = set()
+            for case_a in frontière:
+                for case_b in self._voisins(case_a, self.bloq_n, self.bloq_e):
+                    if distances[case_b] != distances[case_a] - 1:
+                        continue
+                    if abs(case_b - case_a) == 9:
+                        arcs_n |= 1 << min(case_a, case_b)
+                    else:
+                        arcs_e |= 1 << min(case_a, case_b)
+                    suivante.add(case_b)
+            frontière = suivante
+        return arcs_n, arcs_e
+
+    def réparer(self, mur):
+        """Calculer les distances qui changeraient si un mur était ajouté.
+
+        Les cases qui perdent tous leurs appuis (voisins plus proches d'un pas)
+        sont trouvées par distance croissante à partir des arcs coupés, puis
+        leurs distances sont recalculées par un parcours limité à ces cases.
+
+        Args:
+            mur (int): l'indice d'un emplacement libre.
+
+        Returns:
+            dict: la nouvelle distance de chaque case qui change, par indice de case.
+        """
+        distances = self.distances
+        bloq_n = self.bloq_n | BLOQUE_NORD[mur]
+        bloq_e = self.bloq_e | BLOQUE_EST[mur]
+        voisins = self._voisins
+
+        #cases qui s'appuyaient sur un arc coupé
+        tas = []
+        for masque, écart in ((BLOQUE_NORD[mur] & ~self.bloq_n, 9),
+                              (BLOQUE_EST[mur] & ~self.bloq_e, 1)):
+            while masque:
+                bit = masque & -masque
+                masque ^= bit
+                case_a = bit.bit_length() - 1
+                case_b = case_a + écart
+                if distances[case_a] == distances[case_b] + 1 < _INFINI:
+                    heapq.heappush(tas, (distances[case_a], case_a))
+                elif distances[case_b] == distances[case_a] + 1 < _INFINI:
+                    heapq.heappush(tas, (distances[case_b], case_b))
+
+        touchées = set()
+        while tas:
+            distance, indice = heapq.heappop(tas)
+            if indice in touchées:
+                continue
+            autour = voisins(indice, bloq_n, bloq_e)
+            if any(distances[voisin] == distance - 1 and voisin not in touchées
+                   for voisin in autour):
+                continue
+            touchées.add(indice)
+            for voisin in autour:
+                if distances[voisin] == distance + 1 and voisin not in touchées:
+                    heapq.heappush(tas, (distance + 1, voisin))
+
+        #nouvelles distances des cases touchées, à partir de leur bordure
+        nouvelles = {}
+        for indice in touchées:
+            meilleure = _INFINI
+            for voisin in voisins(indice, bloq_n, bloq_e):
+                if voisin not in touchées and distances[voisin] + 1 < meilleure:
+                    meilleure = distances[voisin] + 1
+            nouvelles[indice] = meilleure
+            if meilleure < _INFINI:
+                tas.append((meilleure, indice))
+        heapq.heapify(tas)
+        while tas:
+            distance, indice = heapq.heappop(tas)
+            if distance > nouvelles[indice]:
+                continue
+            for voisin in voisins(indice, bloq_n, bloq_e):
+                if voisin in touchées and distance + 1 < nouvelles[voisin]:
+                    nouvelles[voisin] = distance + 1
+                    heapq.heappush(tas, (distance + 1, voisin))
+        return nouvelles
+
+    def essayer(self, mur, indice):
+        """Distance d'une case jusqu'au but si un mur était ajouté.
+
+        Args:
+            mur (int): l'indice d'un emplacement libre.
+            indice (int): l'indice de la case.
+
+        Returns:
+            int: le nombre de pas, ou INATTEIGNABLE.
+        """
+        distance = self.réparer(mur).get(indice, self.distances[indice])
+        return INATTEIGNABLE if distance == _INFINI else distance
+
+    def ajouter_mur(self, mur):
+        """Ajouter un mur et réparer les distances.
+
+        Args:
+            mur (int): l'indice d'un emplacement libre.
+        """
+        for indice, distance in self.réparer(mur).items():
+            self.distances[indice] = distance
+        self.bloq_n |= BLOQUE_NORD[mur]
+        self.bloq_e |= BLOQUE_EST[mur]
@@ -0,0 +1,192 @@
+"""Module de l'état compact
+
+Représentation compacte d'un état de partie: les pions sont des indices de
+case, les murs restants des entiers et les murs posés deux masques de 64 bits,
+un par orientation, dont les bits sont ceux de `indice_mur` (moins 64 pour les
+murs verticaux). Un état occupe quelques dizaines d'octets au lieu des
+kilooctets du dictionnaire, se copie en temps constant et peut servir de clé
+de dictionnaire.
+
+Classes:
+    * État - État de partie compact, convertible depuis et vers le format `état`.
+"""
+
+from quoridor_error import QuoridorError
+
+from damier import ZOBRIST_MURS, ZOBRIST_PIONS, Damier, case, indice_mur, position, position_mur
+
+
+#Noms des joueurs déjà rencontrés, pour que les états d'une même partie les partagent
+_NOMS = {}
+
+
+def _bits(masque):
+    """Énumérer les indices des bits à 1 d'un masque, du plus faible au plus fort.
+
+    Args:
+        masque (int): le masque.
+
+    Returns:
+        Iterator[int]: les indices des bits à 1.
+    """
+    while masque:
+        bit = masque & -masque
+        yield bit.bit_length() - 1
+        masque ^= bit
+
+
+class État():
+    """État de partie compact, convertible depuis et vers le format `état`.
+
+    Deux états sont égaux lorsque les pions, les murs restants et les murs posés
+    sont les mêmes; les noms des joueurs ne comptent pas.
+
+    Attributes:
+        noms (Tuple[str, str]): les noms des joueurs 1 et 2, partagés entre les
+            états des mêmes joueurs.
+        pion1 (int): l'indice de la case du joueur 1.
+        pion2 (int): l'indice de la case du joueur 2.
+        restants1 (int): les murs restants du joueur 1.
+        restants2 (int): les murs restants du joueur 2.
+        horizontaux (int): le masque de 64 bits des murs horizontaux posés.
+        verticaux (int): le masque de 64 bits des murs verticaux posés.
+    """
+
+    __slots__ = ("noms", "pion1", "pion2", "restants1", "restants2",
+                 "horizontaux", "verticaux")
+
+    def __init__(self, noms, pions, restants, horizontaux=0, verticaux=0):
+        """Constructeur de la classe État.
+
+        Args:
+            noms (Tuple[str, str]): les noms des joueurs 1 et 2.
+            pions (Tuple[int, int]): les indices des cases des joueurs 1 et 2.
+            restants (Tuple[int, int]): les murs restants des joueurs 1 et 2.
+            horizontaux (int, optionnel): le masque des murs horizontaux posés.
+            verticaux (int, optionnel): le masque des murs verticaux posés.
+        """
+        noms = tuple(noms)
+        self.noms = _NOMS.setdefault(noms, noms)
+        self.pion1, self.pion2 = pions
+        self.restants1, self.restants2 = restants
+        self.horizontaux = horizontaux
+        self.verticaux = verticaux
+
+    @property
+    def pions(self):
+        """Tuple[int, int]: les indices des cases des joueurs 1 et 2."""
+        return self.pion1, self.pion2
+
+    @property
+    def restants(self):
+        """Tuple[int, int]: les murs restants des joueurs 1 et 2."""
+        return self.restants1, self.restants2
+
+    @classmethod
+    def from_dict(cls, état):
+        """Convertir un état au format dictionnaire.
+
+        Args:
+            état (dict): l'état du jeu, tel que retourné par `Quoridor.état_courant`
+                ou par le serveur.
+
+        Raises:
+            QuoridorError: La position d'un mur est invalide.
+
+        Returns:
+            État: l'état compact équivalent.
+        """
+        joueurs = état["joueurs"]
+        masques = []
+        for orientation, clé in (("MH", "horizontaux"), ("MV", "verticaux")):
+            masque = 0
+            for pos in état["murs"][clé]:
+                mur = indice_mur(orientation, pos)
+                if mur is None:
+                    QuoridorError.invalid_wall_placement()
+                masque |= 1 << (mur & 63)
+            masques.append(masque)
+        return cls(
+            (joueurs[0]["nom"], joueurs[1]["nom"]),
+            (case(joueurs[0]["pos"]), case(joueurs[1]["pos"])),
+            (joueurs[0]["murs"], joueurs[1]["murs"]),
+            *masques
+        )
+
+    def to_dict(self):
+        """Convertir l'état au format dictionnaire.
+
+        Les murs de chaque orientation sont listés dans l'ordre de leurs indices,
+        qui n'est pas forcément l'ordre dans lequel ils ont été posés.
+
+        Returns:
+            dict: l'état au format de `Quoridor.état_courant`.
+        """
+        return {
+            "joueurs": [
+                {"nom": self.noms[0], "murs": self.restants1, "pos": position(self.pion1)},
+                {"nom": self.noms[1], "murs": self.restants2, "pos": position(self.pion2)},
+            ],
+            "murs": {
+                "horizontaux": [position_mur(mur)[1] for mur in _bits(self.horizontaux)],
+                "verticaux": [position_mur(64 + mur)[1] for mur in _bits(self.verticaux)],
+            },
+        }
+
+    @classmethod
+    def depuis_damier(cls, damier, noms, restants):
+        """Construire l'état compact d'un damier en bitboard.
+
+        Args:
+            damier (Damier): le damier.
+            noms (Tuple[str, str]): les noms des joueurs 1 et 2.
+            restants (Tuple[int, int]): les murs restants des joueurs 1 et 2.
+
+        Returns:
+            État: l'état compact équivalent.
+        """
+        return cls(noms, damier.pions, restants,
+                   damier.murs & (1 << 64) - 1, damier.murs >> 64)
+
+    def damier(self):
+        """Construire le damier en bitboard de l'état.
+
+        Returns:
+            Damier: un damier indépendant avec les pions et les murs de l'état.
+        """
+        damier = Damier.__new__(Damier)
+        damier.pions = [self.pion1, self.pion2]
+        damier.murs = 0
+        damier.bloq_n = 0
+        damier.bloq_e = 0
+        damier.clé = ZOBRIST_PIONS[0][self.pion1] ^ ZOBRIST_PIONS[1][self.pion2]
+        for mur in _bits(self.horizontaux | self.verticaux << 64):
+            damier.ajouter_mur(mur)
+        return damier
+
+    def clé(self):
+        """Hachage de Zobrist des pions et des murs, comme `Damier.clé`.
+
+        Returns:
+            int: la clé de 64 bits.
+        """
+        clé = ZOBRIST_PIONS[0][self.pion1] ^ ZOBRIST_PIONS[1][self.pion2]
+        for mur in _bits(self.horizontaux | self.verticaux << 64):
+            clé ^= ZOBRIST_MURS[mur]
+        return clé
+
+    def _contenu(self):
+        return (self.pion1, self.pion2, self.restants1, self.restants2,
+                self.horizontaux, self.verticaux)
+
+    def __eq__(self, autre):
+        if not isinstance(autre, État):
+            return NotImplemented
+        return self._contenu() == autre._contenu()
+
+    def __hash__(self):
+        return hash(self._contenu())
+
+    def __repr__(self):
+        return (f"État({self.noms!r}, {self.pions!r}, {self.restants!r}, "
+                f"{self.horizontaux:#x}, {self.verticaux:#x})")
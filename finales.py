@@ -0,0 +1,257 @@
+"""Module des tables de finales
+
+Lorsque plus aucun mur ne peut être posé, la partie est une course de pions
+entièrement déterminée par les deux cases des pions, les murs déjà posés et le
+joueur au trait. Ce module la résout exactement par analyse rétrograde: les
+positions gagnées sont propagées à partir des positions terminales en
+remontant les coups, et celles qui ne sont jamais atteintes sont nulles (les
+deux joueurs peuvent tourner en rond sans fin).
+
+Une table couvre les 81 x 81 x 2 positions d'une configuration de murs; les
+dernières tables construites sont conservées en mémoire.
+
+Attributes:
+    GAGNÉE (int): Le joueur au trait gagne.
+    PERDUE (int): Le joueur au trait perd.
+    NULLE (int): Aucun joueur ne peut forcer la victoire.
+    TABLES_CONSERVÉES (int): Nombre de configurations de murs gardées en mémoire.
+
+Classes:
+    * TableFinale - Résultat exact de chaque course de pions pour une configuration de murs.
+
+Functions:
+    * table_finale - Table d'une configuration de murs, construite au premier besoin.
+    * coup_final - Coup parfait d'une course de pions, s'il est prouvé que les murs
+        restants n'y changent rien.
+"""
+
+import threading
+from array import array
+from collections import OrderedDict
+
+from damier import BUTS
+
+import profilage
+
+GAGNÉE = 1
+PERDUE = -1
+NULLE = 0
+TABLES_CONSERVÉES = 32
+
+_TABLES = OrderedDict()
+_VERROU = threading.Lock()
+
+
+def _indice(pion1, pion2, joueur):
+    """Indice d'une position dans les tableaux d'une table.
+
+    Args:
+        pion1 (int): la case du joueur 1.
+        pion2 (int): la case du joueur 2.
+        joueur (int): le joueur au trait.
+
+    Returns:
+        int: l'indice de la position.
+    """
+    return (pion1 * 81 + pion2) * 2 + joueur - 1
+
+
+class TableFinale():
+    """Résultat exact de chaque course de pions pour une configuration de murs.
+
+    Attributes:
+        murs (int): le masque des emplacements de murs occupés.
+        résultats (array): GAGNÉE, PERDUE ou NULLE pour le joueur au trait, par position.
+        distances (array): le nombre de demi-coups avant la fin de la partie en
+            jeu parfait, par position; 0 pour une position nulle.
+    """
+
+    def __init__(self, damier):
+        """Constructeur de la classe TableFinale.
+
+        Args:
+            damier (Damier): un damier avec la configuration de murs à résoudre;
+                les pions ne comptent pas et il n'est pas modifié.
+        """
+        self.murs = damier.murs
+        self._damier = damier.copie()
+        taille = 81 * 81 * 2
+        self.résultats = array("b", bytes(taille))
+        self.distances = array("H", bytes(2 * taille))
+        self._résoudre()
+
+    def successeurs(self, pion1, pion2, joueur):
+        """Positions atteintes en un coup par le joueur au trait.
+
+        Args:
+            pion1 (int): la case du joueur 1.
+            pion2 (int): la case du joueur 2.
+            joueur (int): le joueur au trait.
+
+        Returns:
+            List[int]: les cases d'arrivée du pion du joueur au trait.
+        """
+        damier = self._damier
+        damier.pions[0], damier.pions[1] = pion1, pion2
+        destinations = damier.successeurs(pion1 if joueur == 1 else pion2)
+        arrivées = []
+        while destinations:
+            bit = destinations & -destinations
+            destinations ^= bit
+            arrivées.append(bit.bit_length() - 1)
+        return arrivées
+
+    def _résoudre(self):
+        """Remplir les tableaux par analyse rétrograde."""
+        résultats, distances = self.résultats, self.distances
+        prédécesseurs = [[] for _ in range(81 * 81 * 2)]
+        restants = array("B", bytes(81 * 81 * 2))
+        file = []
+
+        for pion1 in range(81):
+            for pion2 in range(81):
+                if pion1 == pion2:
+                    continue
+                #la partie est finie dès qu'un pion est sur sa rangée but
+                gagnant = 1 if BUTS[0] >> pion1 & 1 else 2 if BUTS[1] >> pion2 & 1 else 0
+                for joueur in (1, 2):
+                    indice = _indice(pion1, pion2, joueur)
+                    if gagnant:
+                        résultats[indice] = GAGNÉE if gagnant == joueur else PERDUE
+                        file.append(indice)
+                        continue
+                    arrivées = self.successeurs(pion1, pion2, joueur)
+                    restants[indice] = len(arrivées)
+                    for arrivée in arrivées:
+                        if joueur == 1:
+                            suivante = _indice(arrivée, pion2, 2)
+                        else:
+                            suivante = _indice(pion1, arrivée, 1)
+                        prédécesseurs[suivante].append(indice)
+
+        #une position est gagnée si un coup mène à une position perdue pour l'adversaire,
+        #perdue si tous ses coups mènent à des positions gagnées pour l'adversaire
+        for indice in file:
+            distance = distances[indice] + 1
+            if résultats[indice] == PERDUE:
+                for précédente in prédécesseurs[indice]:
+                    if résultats[précédente] == NULLE:
+                        résultats[précédente] = GAGNÉE
+                        distances[précédente] = distance
+                        file.append(précédente)
+            else:
+                for précédente in prédécesseurs[indice]:
+                    if résultats[précédente] == NULLE:
+                        restants[précédente] -= 1
+                        if restants[précédente] == 0:
+                            résultats[précédente] = PERDUE
+                            distances[précédente] = distance
+                            file.append(précédente)
+
+    def sonder(self, pion1, pion2, joueur):
+        """Résultat d'une position.
+
+        Args:
+            pion1 (int): la case du joueur 1.
+            pion2 (int): la case du joueur 2.
+            joueur (int): le joueur au trait.
+
+        Returns:
+            Tuple[int, int]: le résultat pour le joueur au trait et le nombre de
+                demi-coups avant la fin en jeu parfait.
+        """
+        indice = _indice(pion1, pion2, joueur)
+        return self.résultats[indice], self.distances[indice]
+
+    def meilleur_coup(self, pion1, pion2, joueur):
+        """Coup parfait du joueur au trait.
+
+        Une position gagnée est gagnée au plus vite, une position perdue perdue le
+        plus tard possible et une position nulle reste nulle.
+
+        Args:
+            pion1 (int): la case du joueur 1.
+            pion2 (int): la case du joueur 2.
+            joueur (int): le joueur au trait.
+
+        Returns:
+            Tuple[int, int, int]: la case d'arrivée, ou None si le pion est enfermé,
+                puis le résultat et la distance de la position de départ.
+        """
+        résultat, distance = self.sonder(pion1, pion2, joueur)
+
+        def valeur(arrivée):
+            #valeur du coup du point de vue du joueur au trait, à maximiser
+            if joueur == 1:
+                adverse, reste = self.sonder(arrivée, pion2, 2)
+            else:
+                adverse, reste = self.sonder(pion1, arrivée, 1)
+            if adverse == PERDUE:
+                return 2, -reste
+            if adverse == NULLE:
+                return 1, 0
+            return 0, reste
+
+        arrivée = max(self.successeurs(pion1, pion2, joueur), key=valeur, default=None)
+        return arrivée, résultat, distance
+
+
+def table_finale(damier):
+    """Table d'une configuration de murs, construite au premier besoin.
+
+    Args:
+        damier (Damier): un damier avec la configuration de murs voulue.
+
+    Returns:
+        TableFinale: la table de cette configuration.
+    """
+    #le cache est partagé par les fils qui cherchent en même temps
+    with _VERROU:
+        table = _TABLES.get(damier.murs)
+        if table is None:
+            table = _TABLES[damier.murs] = TableFinale(damier)
+            if len(_TABLES) > TABLES_CONSERVÉES:
+                _TABLES.popitem(last=False)
+            if profilage.ACTIF:
+                profilage.compter("finales.constructions")
+        else:
+            _TABLES.move_to_end(damier.murs)
+            if profilage.ACTIF:
+                profilage.compter("finales.succès")
+    return table
+
+
+def coup_final(damier, joueur, murs):
+    """Coup parfait d'une course de pions, s'il est prouvé que les murs restants
+    n'y changent rien.
+
+    C'est le cas lorsque personne n'a de murs, ou lorsque seul l'adversaire en a
+    et que la course est déjà perdue pour le joueur: des coups de plus pour
+    l'adversaire ne peuvent pas améliorer le résultat du joueur. Une course
+    gagnée dès ce coup-ci l'est aussi, quels que soient les murs. Une course
+    nulle ne l'est pas: le coup de la table ne garde la nulle que contre un
+    adversaire sans murs.
+
+    Args:
+        damier (Damier): le damier de la position.
+        joueur (int): le joueur au trait.
+        murs (List[int, int]): les murs restants des joueurs 1 et 2.
+
+    Returns:
+        Tuple[int, dict]: la case d'arrivée et un rapport contenant le résultat et
+            la distance, ou None si la table ne s'applique pas.
+    """
+    if murs[joueur - 1]:
+        return None
+    table = table_finale(damier)
+    arrivée, résultat, distance = table.meilleur_coup(damier.pions[0], damier.pions[1], joueur)
+    if arrivée is None:
+        #pion enfermé: la table n'a pas de coup à proposer
+        return None
+    if murs[2 - joueur] and not (résultat == PERDUE
+                                 or résultat == GAGNÉE and distance == 1):
+        return None
+    return arrivée, {"moteur": "finale", "résultat": résultat, "distance": distance}
+
+
+profilage.instrumenter(TableFinale, "_résoudre", "finales.résolution")
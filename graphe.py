@@ -4,8 +4,12 @@ Functions:
     * construire_graphe - Construire un graphe de la grille.
 """
 
+import sys
+
 import networkx as nx
 
+import profilage
+
 
 def construire_graphe(joueurs, murs_horizontaux, murs_verticaux):
     """Construire un graphe de la grille.
@@ -84,5 +88,11 @@ def construire_graphe(joueurs, murs_horizontaux, murs_verticaux):
         graphe.add_edge((x, 9), "B1")
         graphe.add_edge((x, 1), "B2")
 
+    if profilage.ACTIF:
+        profilage.compter("graphe.arcs", graphe.number_of_edges())
+
     return graphe
+
+
+profilage.instrumenter(sys.modules[__name__], "construire_graphe", "graphe.construction")
     
\ No newline at end of file
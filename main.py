@@ -4,6 +4,7 @@ Ce programme permet de joueur au jeu Quoridor.
 """
 import turtle
 from api import débuter_partie, jouer_coup
+from anticipation import Anticipation
 from quoridor import Quoridor
 from utilitaire import analyser_commande
 from quoridorx import QuoridorX
@@ -13,6 +14,8 @@ SECRET = "87877acb-c834-4725-a127-61634c821053"
 
 if __name__ == "__main__":
     args = analyser_commande()
+    #Think on the opponent's time in the automatic modes
+    anticipation = Anticipation() if args.anticipation and args.automatique else None
 
     if args.automatique and args.graphique:
 
@@ -29,7 +32,13 @@ if __name__ == "__main__":
 
         while not game.est_terminée():
 
-            choice, position = game.jouer_le_coup(1) #Make manual decision
+            #Use the move prepared on the opponent's time when it was predicted
+            coup = anticipation and anticipation.coup(game, 1)
+            choice, position = coup or game.jouer_le_coup(1)
+
+            if anticipation:
+                game.jouer(1, (choice, position))
+                anticipation.lancer(game, 1)
 
             id_partie, new_state = jouer_coup(
                 id_partie,
@@ -39,7 +48,7 @@ if __name__ == "__main__":
                 SECRET,
                 )
 
-            game = QuoridorX(new_state['état']['joueurs'], new_state['état']['murs'])
+            game = QuoridorX.depuis_serveur(new_state['état'])
 
 
         print(f"Congrats to {game.est_terminée()} for your incredible victory")
@@ -72,7 +81,7 @@ if __name__ == "__main__":
                 SECRET,
                 )
 
-            game = QuoridorX(new_state['état']['joueurs'], new_state['état']['murs'])
+            game = QuoridorX.depuis_serveur(new_state['état'])
 
         print(f"Congrats to {game.est_terminée()} for your incredible victory")
         game.gui()
@@ -90,9 +99,15 @@ if __name__ == "__main__":
 
         while not game.est_terminée():
             print(game)
-            choice, position = Quoridor.jouer_le_coup(game, 1) #Auto play my move
+            #Use the move prepared on the opponent's time when it was predicted
+            coup = anticipation and anticipation.coup(game, 1)
+            choice, position = coup or Quoridor.jouer_le_coup(game, 1) #Auto play my move
             # choice, position = game.récupérer_le_coup(1)
 
+            if anticipation:
+                game.jouer(1, (choice, position))
+                anticipation.lancer(game, 1)
+
             id_partie, new_state = jouer_coup(
                 id_partie,
                 choice,
@@ -101,7 +116,7 @@ if __name__ == "__main__":
                 SECRET,
              )
             print(new_state)
-            game = Quoridor(new_state['état']['joueurs'], new_state['état']['murs'])
+            game = Quoridor.depuis_serveur(new_state['état'])
 
         print(game)
         print(f"Congrats to {game.est_terminée()} for your incredible victory")
@@ -130,7 +145,7 @@ if __name__ == "__main__":
                 SECRET,
              )
 
-            game = Quoridor(new_state['état']['joueurs'], new_state['état']['murs'] )
+            game = Quoridor.depuis_serveur(new_state['état'])
 
         print(game)
         print(f"Congrats to {game.est_terminée()} for your incredible victory")
@@ -0,0 +1,331 @@
+"""Module de recherche Monte-Carlo
+
+Moteur de recherche arborescente Monte-Carlo (MCTS) avec sélection UCT et
+parties simulées rapides. Les simulations peuvent être réparties sur plusieurs
+processus: chaque processus construit son propre arbre à partir de la racine
+et les statistiques des coups de la racine sont additionnées (parallélisme
+à la racine).
+
+Attributes:
+    EXPLORATION (float): Constante d'exploration de la formule UCT.
+    LIMITE_SIMULATION (int): Nombre maximal de demi-coups d'une partie simulée.
+
+Functions:
+    * explorer - Construire un arbre MCTS et retourner les statistiques de la racine.
+    * meilleur_coup - Chercher le meilleur coup d'un joueur par MCTS.
+    * fermer - Arrêter les processus de simulation.
+"""
+
+import atexit
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from damier import BLOQUE_EST, BLOQUE_NORD, BUTS
+
+from recherche import Recherche
+
+EXPLORATION = 1.4
+LIMITE_SIMULATION = 200
+
+#Probabilités de la politique gloutonne: poser un mur, faire un pas au hasard
+_PROBABILITÉ_MUR = 0.15
+_PROBABILITÉ_HASARD = 0.1
+
+_EXÉCUTEUR = None
+_PROCESSUS = 0
+#le pool peut être demandé par plusieurs fils à la fois
+_VERROU = threading.Lock()
+
+
+class _Nœud():
+    """Nœud de l'arbre MCTS.
+
+    Attributes:
+        coup (int): le code du coup qui mène à ce nœud.
+        joueur (int): le joueur qui a joué ce coup.
+        parent (_Nœud): le nœud parent, ou None pour la racine.
+        enfants (List[_Nœud]): les nœuds déjà développés.
+        à_essayer (List[int]): les coups pas encore développés, ou None s'ils
+            n'ont pas encore été générés.
+        visites (int): le nombre de simulations passées par ce nœud.
+        gains (int): le nombre de ces simulations gagnées par `joueur`.
+    """
+
+    __slots__ = ("coup", "joueur", "parent", "enfants", "à_essayer", "visites", "gains")
+
+    def __init__(self, coup, joueur, parent):
+        self.coup = coup
+        self.joueur = joueur
+        self.parent = parent
+        self.enfants = []
+        self.à_essayer = None
+        self.visites = 0
+        self.gains = 0
+
+    def sélectionner(self):
+        """Choisir l'enfant qui maximise la borne UCT.
+
+        Returns:
+            _Nœud: l'enfant choisi.
+        """
+        logarithme = math.log(self.visites)
+        return max(self.enfants, key=lambda enfant: enfant.gains / enfant.visites
+                   + EXPLORATION * math.sqrt(logarithme / enfant.visites))
+
+
+def _gagnant(damier):
+    """Numéro du joueur qui a atteint sa rangée but, ou None.
+
+    Args:
+        damier (Damier): le damier de la position.
+
+    Returns:
+        int: 1, 2 ou None.
+    """
+    if BUTS[0] >> damier.pions[0] & 1:
+        return 1
+    if BUTS[1] >> damier.pions[1] & 1:
+        return 2
+    return None
+
+
+def _mur_au_hasard(damier, joueur, générateur):
+    """Tirer un mur légal qui coupe le plus court chemin de l'adversaire.
+
+    Args:
+        damier (Damier): le damier de la position.
+        joueur (int): le joueur qui pose le mur.
+        générateur (Random): le générateur aléatoire.
+
+    Returns:
+        int: l'indice de l'emplacement, ou None si aucun n'a été trouvé.
+    """
+    chemin = damier.chemin_indices(3 - joueur)
+    if chemin is None:
+        return None
+    arcs_n, arcs_e = damier.arcs_du_chemin(chemin)
+    libres = damier.murs_libres()
+    candidats = [mur for mur in range(128) if libres >> mur & 1
+                 and (BLOQUE_NORD[mur] & arcs_n or BLOQUE_EST[mur] & arcs_e)]
+    générateur.shuffle(candidats)
+    for mur in candidats[:4]:
+        damier.ajouter_mur(mur)
+        if damier.chemin_existe(1) and damier.chemin_existe(2):
+            return mur
+        damier.retirer_mur(mur)
+    return None
+
+
+def _simuler(damier, murs, joueur, politique, générateur):
+    """Jouer une partie simulée jusqu'au bout à partir d'une position.
+
+    Args:
+        damier (Damier): le damier de la position; il est modifié.
+        murs (List[int, int]): les murs restants; la liste est modifiée.
+        joueur (int): le joueur au trait.
+        politique (str): 'glouton' pour avancer surtout sur le plus court chemin,
+            'aléatoire' pour des déplacements uniformément au hasard.
+        générateur (Random): le générateur aléatoire.
+
+    Returns:
+        int: le numéro du gagnant. Si la limite est atteinte, le joueur le plus
+            proche de son but, à égalité celui qui a le trait.
+    """
+    for _ in range(LIMITE_SIMULATION):
+        gagnant = _gagnant(damier)
+        if gagnant:
+            return gagnant
+
+        if politique == "glouton" and murs[joueur - 1] \
+                and générateur.random() < _PROBABILITÉ_MUR \
+                and _mur_au_hasard(damier, joueur, générateur) is not None:
+            murs[joueur - 1] -= 1
+        elif not damier.successeurs(damier.pions[joueur - 1]):
+            #pion enfermé: le joueur passe son tour
+            pass
+        elif politique == "glouton" and générateur.random() >= _PROBABILITÉ_HASARD:
+            damier.déplacer_pion(joueur, damier.chemin_indices(joueur)[1])
+        else:
+            destinations = damier.successeurs(damier.pions[joueur - 1])
+            choix = [case for case in range(81) if destinations >> case & 1]
+            damier.déplacer_pion(joueur, générateur.choice(choix))
+        joueur = 3 - joueur
+
+    gagnant = _gagnant(damier)
+    if gagnant:
+        return gagnant
+    #un pion enfermé est considéré comme le plus loin de son but
+    distances = [81 if distance is None else distance
+                 for distance in (damier.distance(1), damier.distance(2))]
+    if distances[0] == distances[1]:
+        return joueur
+    return 1 if distances[0] < distances[1] else 2
+
+
+def explorer(damier, joueur, murs, simulations, échéance, politique="glouton", graine=None,
+             arrêt=None):
+    """Construire un arbre MCTS et retourner les statistiques de la racine.
+
+    Args:
+        damier (Damier): le damier de la position; il n'est pas modifié.
+        joueur (int): le joueur au trait.
+        murs (List[int, int]): les murs restants des joueurs 1 et 2.
+        simulations (int): le nombre maximal de simulations, ou None.
+        échéance (float): l'instant `time.time` où s'arrêter, ou None.
+        politique (str, optionnel): la politique des parties simulées.
+        graine (int, optionnel): la graine du générateur aléatoire.
+        arrêt (threading.Event, optionnel): un événement qui arrête l'exploration
+            une fois levé.
+
+    Returns:
+        Tuple[dict, int]: les visites et gains de chaque coup de la racine,
+            et le nombre de simulations effectuées.
+    """
+    générateur = random.Random(graine)
+    état = Recherche(damier, murs, math.inf, None)
+    racine = _Nœud(None, 3 - joueur, None)
+    faites = 0
+
+    while (simulations is None or faites < simulations) \
+            and (échéance is None or time.time() < échéance) \
+            and (arrêt is None or not arrêt.is_set()):
+        nœud = racine
+        pile = []
+
+        #sélection et développement
+        while _gagnant(état.damier) is None:
+            if nœud.à_essayer is None:
+                nœud.à_essayer = état.coups(3 - nœud.joueur)
+            if nœud.à_essayer:
+                coup = nœud.à_essayer.pop(générateur.randrange(len(nœud.à_essayer)))
+                enfant = _Nœud(coup, 3 - nœud.joueur, nœud)
+                nœud.enfants.append(enfant)
+                nœud = enfant
+                pile.append((nœud.joueur, coup, état.jouer(nœud.joueur, coup)))
+                break
+            if not nœud.enfants:
+                #aucun coup à essayer: la partie simulée part de ce nœud
+                break
+            nœud = nœud.sélectionner()
+            pile.append((nœud.joueur, nœud.coup, état.jouer(nœud.joueur, nœud.coup)))
+
+        #simulation sur une copie, puis retour à la racine
+        gagnant = _simuler(état.damier.copie(), list(état.murs), 3 - nœud.joueur,
+                           politique, générateur)
+        for joueur_coup, coup, annulation in reversed(pile):
+            état.annuler(joueur_coup, coup, annulation)
+
+        #rétropropagation
+        while nœud is not None:
+            nœud.visites += 1
+            if nœud.joueur == gagnant:
+                nœud.gains += 1
+            nœud = nœud.parent
+        faites += 1
+
+    return {enfant.coup: (enfant.visites, enfant.gains) for enfant in racine.enfants}, faites
+
+
+def _exécuteur(processus):
+    """Pool de processus de simulation, créé au premier besoin.
+
+    Args:
+        processus (int): le nombre de processus voulu.
+
+    Returns:
+        ProcessPoolExecutor: le pool.
+    """
+    global _EXÉCUTEUR, _PROCESSUS
+    with _VERROU:
+        if _EXÉCUTEUR is None or _PROCESSUS != processus:
+            fermer()
+            _EXÉCUTEUR = ProcessPoolExecutor(max_workers=processus)
+            _PROCESSUS = processus
+        return _EXÉCUTEUR
+
+
+def fermer():
+    """Arrêter les processus de simulation."""
+    global _EXÉCUTEUR
+    if _EXÉCUTEUR is not None:
+        _EXÉCUTEUR.shutdown()
+        _EXÉCUTEUR = None
+
+
+atexit.register(fermer)
+
+
+def meilleur_coup(damier, joueur, murs, simulations=None, temps=1.0, processus=1,
+                  politique="glouton", graine=None, arrêt=None):
+    """Chercher le meilleur coup d'un joueur par MCTS.
+
+    Args:
+        damier (Damier): le damier de la position; il n'est pas modifié.
+        joueur (int): le numéro du joueur au trait (1 ou 2).
+        murs (List[int, int]): les murs restants des joueurs 1 et 2.
+        simulations (int, optionnel): le nombre total de simulations; sans limite
+            si None.
+        temps (float, optionnel): le budget de temps en secondes; sans limite si None.
+        processus (int, optionnel): le nombre de processus; 0 pour un par cœur.
+        politique (str, optionnel): 'glouton' ou 'aléatoire'.
+        graine (int, optionnel): la graine des générateurs aléatoires.
+        arrêt (threading.Event, optionnel): un événement qui, une fois levé, arrête
+            les simulations; seulement avec un seul processus, un événement ne
+            pouvant pas être transmis aux autres.
+
+    Raises:
+        QuoridorError: Le joueur n'a aucun coup légal.
+
+    Returns:
+        Tuple[int, dict]: le code du coup le plus visité et un rapport contenant
+            le nombre de simulations, la durée et les simulations par seconde.
+    """
+    if simulations is None and temps is None:
+        raise ValueError("Il faut un nombre de simulations ou un budget de temps.")
+
+    début = time.time()
+    échéance = None if temps is None else début + temps
+    processus = processus or os.cpu_count() or 1
+    if graine is None:
+        graine = random.randrange(2 ** 32)
+
+    if processus == 1:
+        résultats = [explorer(damier, joueur, murs, simulations, échéance, politique, graine,
+                              arrêt)]
+    else:
+        parts = None if simulations is None else -(-simulations // processus)
+        tâches = [_exécuteur(processus).submit(explorer, damier, joueur, murs, parts,
+                                               échéance, politique, graine + rang)
+                  for rang in range(processus)]
+        résultats = [tâche.result() for tâche in tâches]
+
+    statistiques = {}
+    total = 0
+    for racine, faites in résultats:
+        total += faites
+        for coup, (visites, gains) in racine.items():
+            cumul = statistiques.get(coup, (0, 0))
+            statistiques[coup] = (cumul[0] + visites, cumul[1] + gains)
+
+    if statistiques:
+        coup = max(statistiques, key=lambda code: statistiques[code][0])
+        visites, gains = statistiques[coup]
+    else:
+        #aucune simulation n'a pu être faite dans le temps imparti
+        coup = Recherche(damier, murs, math.inf, None).coups_racine(joueur)[0]
+        visites, gains = 0, 0
+
+    durée = time.time() - début
+    return coup, {
+        "moteur": "mcts",
+        "simulations": total,
+        "processus": processus,
+        "durée": durée,
+        "simulations_par_seconde": total / durée if durée else 0.0,
+        "visites": visites,
+        "taux_gain": gains / visites if visites else 0.0,
+    }
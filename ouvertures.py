@@ -0,0 +1,215 @@
+"""Module du livre d'ouvertures
+
+Livre d'ouvertures conservé dans un fichier binaire projeté en mémoire. Le
+fichier commence par un en-tête de 16 octets (signature, version, nombre
+d'entrées) suivi d'entrées de 16 octets triées par clé: la clé de Zobrist de
+la position (`clé_position`), le code du coup, son score et la profondeur de
+la recherche qui l'a trouvé. Une recherche est une dichotomie directement dans
+la projection: rien n'est lu ni décodé au chargement, et les pages du fichier
+sont partagées par tous les processus qui l'ouvrent.
+
+Le livre est rempli hors ligne par `construire_livre`, qui part de la position
+initiale et cherche en profondeur chaque position atteinte par les coups du
+livre et les réponses les plus prometteuses de l'adversaire:
+
+    python ouvertures.py --demi-coups 8 --temps 20
+
+Attributes:
+    FICHIER (str): Chemin du livre utilisé par défaut, à côté de ce module.
+
+Classes:
+    * LivreOuvertures - Livre d'ouvertures en lecture seule, projeté en mémoire.
+
+Functions:
+    * livre_partagé - Livre par défaut, ouvert au premier appel.
+    * construire_livre - Remplir un livre en cherchant chaque position en profondeur.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+
+from damier import PREMIER_MUR, Damier
+
+from recherche import Recherche, meilleur_coup
+
+from transposition import TableTransposition, clé_position
+
+FICHIER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ouvertures.livre")
+
+_SIGNATURE = b"QLIV"
+_VERSION = 1
+_EN_TÊTE = struct.Struct("<4sII4x")
+#clé, coup, score, profondeur
+_ENTRÉE = struct.Struct("<QHhB3x")
+
+_LIVRE = None
+_LIVRE_CHARGÉ = False
+
+
+class LivreOuvertures():
+    """Livre d'ouvertures en lecture seule, projeté en mémoire.
+
+    Attributes:
+        chemin (str): le chemin du fichier.
+    """
+
+    def __init__(self, chemin):
+        """Constructeur de la classe LivreOuvertures.
+
+        Args:
+            chemin (str): le chemin du fichier du livre.
+
+        Raises:
+            ValueError: Le fichier n'est pas un livre d'ouvertures.
+        """
+        self.chemin = chemin
+        with open(chemin, "rb") as fichier:
+            self._projection = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        signature, version, taille = _EN_TÊTE.unpack_from(self._projection, 0)
+        if signature != _SIGNATURE or version != _VERSION \
+                or len(self._projection) != _EN_TÊTE.size + taille * _ENTRÉE.size:
+            self._projection.close()
+            raise ValueError(f"{chemin} n'est pas un livre d'ouvertures valide.")
+        self._taille = taille
+
+    def __len__(self):
+        return self._taille
+
+    def chercher(self, clé):
+        """Chercher une position dans le livre par dichotomie.
+
+        Args:
+            clé (int): la clé de la position, telle que retournée par `clé_position`.
+
+        Returns:
+            Tuple[int, int, int]: le code du coup, son score et la profondeur de la
+                recherche, ou None si la position n'est pas dans le livre.
+        """
+        projection = self._projection
+        bas, haut = 0, self._taille
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            décalage = _EN_TÊTE.size + milieu * _ENTRÉE.size
+            clé_milieu = _ENTRÉE.unpack_from(projection, décalage)[0]
+            if clé_milieu < clé:
+                bas = milieu + 1
+            elif clé_milieu > clé:
+                haut = milieu
+            else:
+                return _ENTRÉE.unpack_from(projection, décalage)[1:]
+        return None
+
+    def fermer(self):
+        """Fermer la projection du fichier."""
+        self._projection.close()
+
+
+def livre_partagé():
+    """Livre par défaut, ouvert au premier appel.
+
+    Returns:
+        LivreOuvertures: le livre du fichier `FICHIER`, ou None s'il n'existe pas.
+    """
+    global _LIVRE, _LIVRE_CHARGÉ
+    if not _LIVRE_CHARGÉ:
+        _LIVRE_CHARGÉ = True
+        if os.path.exists(FICHIER):
+            _LIVRE = LivreOuvertures(FICHIER)
+    return _LIVRE
+
+
+def _écrire(chemin, entrées):
+    """Écrire un livre trié, en remplaçant le fichier d'un coup.
+
+    Args:
+        chemin (str): le chemin du fichier.
+        entrées (dict): le coup, le score et la profondeur de chaque clé.
+    """
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as fichier:
+        fichier.write(_EN_TÊTE.pack(_SIGNATURE, _VERSION, len(entrées)))
+        for clé in sorted(entrées):
+            fichier.write(_ENTRÉE.pack(clé, *entrées[clé]))
+    os.replace(temporaire, chemin)
+
+
+def construire_livre(chemin=FICHIER, demi_coups=8, temps=10.0, profondeur=12,
+                     réponses=3, camp=1, afficher=False):
+    """Remplir un livre en cherchant chaque position en profondeur.
+
+    Les positions où `camp` a le trait sont cherchées et le livre suit le coup
+    trouvé. Aux positions où l'adversaire a le trait, il suit ses `réponses`
+    coups les plus prometteurs: celui d'une recherche plus courte, son meilleur
+    déplacement, puis les autres dans l'ordre de la recherche.
+
+    Args:
+        chemin (str, optionnel): le chemin du fichier à écrire.
+        demi_coups (int, optionnel): le nombre de demi-coups couverts depuis le début.
+        temps (float, optionnel): le budget de recherche par position, en secondes.
+        profondeur (int, optionnel): la profondeur maximale de chaque recherche.
+        réponses (int, optionnel): le nombre de réponses de l'adversaire suivies.
+        camp (int, optionnel): le joueur (1 ou 2) dont les coups sont cherchés.
+        afficher (bool, optionnel): True pour afficher chaque position cherchée.
+
+    Returns:
+        int: le nombre d'entrées écrites.
+    """
+    entrées = {}
+    vues = set()
+    table = TableTransposition()
+    file = [(Damier([[5, 1], [5, 9]], [], []), [10, 10], 1, 0)]
+    while file:
+        damier, murs, joueur, ply = file.pop(0)
+        clé = clé_position(damier, murs, joueur)
+        if clé in vues or ply >= demi_coups:
+            continue
+        vues.add(clé)
+
+        recherche = Recherche(damier, murs, float("inf"), None)
+        if joueur == camp:
+            coup, rapport = meilleur_coup(damier, joueur, murs, temps=temps,
+                                          profondeur=profondeur, table=table)
+            entrées[clé] = (coup, rapport["score"], rapport["profondeur"])
+            if afficher:
+                print(f"{len(entrées)}: demi-coup {ply}, coup {coup}, "
+                      f"profondeur {rapport['profondeur']}, score {rapport['score']}")
+            suivis = [coup]
+        else:
+            #la réponse trouvée par une recherche courte, le meilleur déplacement,
+            #puis les murs les plus gênants
+            réponse, _ = meilleur_coup(damier, joueur, murs, temps=temps / 4,
+                                       profondeur=profondeur, table=table)
+            coups = recherche.coups(joueur)
+            déplacement = next(coup for coup in coups if coup < PREMIER_MUR)
+            suivis = []
+            for coup in [réponse, déplacement] + coups:
+                if coup not in suivis:
+                    suivis.append(coup)
+            suivis = suivis[:réponses]
+
+        for suivi in suivis:
+            annulation = recherche.jouer(joueur, suivi)
+            file.append((recherche.damier.copie(), list(recherche.murs), 3 - joueur, ply + 1))
+            recherche.annuler(joueur, suivi, annulation)
+
+    _écrire(chemin, entrées)
+    return len(entrées)
+
+
+if __name__ == "__main__":
+    ANALYSEUR = argparse.ArgumentParser(description="Construire le livre d'ouvertures")
+    ANALYSEUR.add_argument("--chemin", default=FICHIER, help="Fichier du livre.")
+    ANALYSEUR.add_argument("--demi-coups", type=int, default=8,
+                           help="Nombre de demi-coups couverts.")
+    ANALYSEUR.add_argument("--temps", type=float, default=10.0,
+                           help="Secondes de recherche par position.")
+    ANALYSEUR.add_argument("--réponses", type=int, default=3,
+                           help="Réponses de l'adversaire suivies par position.")
+    ANALYSEUR.add_argument("--camp", type=int, default=1, choices=(1, 2),
+                           help="Joueur dont les coups sont cherchés.")
+    ARGUMENTS = ANALYSEUR.parse_args()
+    print(construire_livre(ARGUMENTS.chemin, ARGUMENTS.demi_coups, ARGUMENTS.temps,
+                           réponses=ARGUMENTS.réponses, camp=ARGUMENTS.camp,
+                           afficher=True), "entrées")
@@ -0,0 +1,326 @@
+"""Module du banc d'essai
+
+Mesure la vitesse des opérations principales du jeu sur des positions de
+milieu de partie tirées au hasard avec une graine fixe, pour que deux mesures
+portent toujours sur les mêmes positions. Chaque essai exécute une opération
+par position, plusieurs fois de suite: le résultat est le nombre moyen
+d'opérations par seconde, avec l'écart type et les extrêmes des répétitions.
+
+L'affichage de `QuoridorX.gui` est mesuré sans écran: la tortue est remplacée
+par une plume muette qui accepte les mêmes appels sans rien dessiner, ce qui
+mesure le coût du code de l'interface lui-même.
+
+    python performances.py mesurer --sortie base.json
+    python performances.py comparer base.json nouveau.json --seuil 0.1
+
+Functions:
+    * positions - Tirer des positions de milieu de partie reproductibles.
+    * mesurer - Exécuter les essais et retourner leurs résultats.
+    * comparer - Repérer les essais plus lents qu'une mesure de référence.
+"""
+
+import argparse
+import copy
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+from damier import PREMIER_MUR, case, indice_mur
+from quoridor import Quoridor
+from recherche import décoder_coup
+
+import graphe
+
+import quoridorx
+
+
+def positions(nombre=50, graine=2020):
+    """Tirer des positions de milieu de partie reproductibles.
+
+    Chaque position est atteinte par 10 à 40 demi-coups légaux tirés au hasard,
+    dont environ un tiers de murs, et la partie n'y est pas terminée.
+
+    Args:
+        nombre (int, optionnel): le nombre de positions.
+        graine (int, optionnel): la graine du tirage.
+
+    Returns:
+        List[Tuple[dict, int]]: l'état de chaque position et le joueur au trait.
+    """
+    générateur = random.Random(graine)
+    tirées = []
+    while len(tirées) < nombre:
+        partie = Quoridor(["joueur1", "joueur2"])
+        joueur = 1
+        for _ in range(générateur.randrange(10, 41)):
+            coups = list(partie.coups_légaux(joueur))
+            murs = [coup for coup in coups if coup >= PREMIER_MUR]
+            if murs and générateur.random() < 0.35:
+                partie.jouer(joueur, générateur.choice(murs))
+            else:
+                partie.jouer(joueur, générateur.choice([coup for coup in coups
+                                                        if coup < PREMIER_MUR]))
+            joueur = 3 - joueur
+            if partie.est_terminée():
+                break
+        if not partie.est_terminée():
+            tirées.append((partie.état_courant(), joueur))
+    return tirées
+
+
+def _partie(état):
+    """Construire une partie à partir d'un état sans partager ses listes."""
+    état = copy.deepcopy(état)
+    return Quoridor(état["joueurs"], état["murs"])
+
+
+def _premier_coup(partie, joueur, murs):
+    """Premier coup légal d'un joueur, mur ou déplacement."""
+    for coup in partie.coups_légaux(joueur):
+        if (coup >= PREMIER_MUR) == murs:
+            return décoder_coup(coup)
+    return None
+
+
+def _essai_construire_graphe(tirées):
+    opérations = []
+    for état, _ in tirées:
+        joueurs = [joueur["pos"] for joueur in état["joueurs"]]
+        murs = état["murs"]
+        #la fonction est lue dans le module à chaque appel, pour que `profilage` la voie
+        opérations.append(lambda joueurs=joueurs, murs=murs: graphe.construire_graphe(
+            joueurs, murs["horizontaux"], murs["verticaux"]))
+    return opérations
+
+
+def _essai_initialiser(tirées):
+    return [lambda état=état: Quoridor(état["joueurs"], état["murs"]) for état, _ in tirées]
+
+
+def _essai_déplacer_jeton(tirées):
+    opérations = []
+    for état, joueur in tirées:
+        partie = _partie(état)
+        _, arrivée = _premier_coup(partie, joueur, False)
+
+        def opération(partie=partie, joueur=joueur, arrivée=arrivée):
+            départ = partie.état["joueurs"][joueur - 1]["pos"]
+            partie.déplacer_jeton(joueur, arrivée)
+            #remettre le pion en place pour la prochaine répétition
+            partie.état["joueurs"][joueur - 1]["pos"] = départ
+            partie.damier.annuler_déplacement(joueur, case(départ))
+        opérations.append(opération)
+    return opérations
+
+
+def _essai_placer_un_mur(tirées):
+    opérations = []
+    for état, joueur in tirées:
+        partie = _partie(état)
+        if not partie.état["joueurs"][joueur - 1]["murs"]:
+            continue
+        coup = _premier_coup(partie, joueur, True)
+        if coup is None:
+            continue
+
+        def opération(partie=partie, joueur=joueur, coup=coup):
+            orientation, position = coup
+            partie.placer_un_mur(joueur, position, orientation)
+            #retirer le mur pour la prochaine répétition
+            partie.état["murs"]["horizontaux" if orientation == "MH" else "verticaux"].pop()
+            partie.état["joueurs"][joueur - 1]["murs"] += 1
+            partie.damier.retirer_mur(indice_mur(orientation, position))
+        opérations.append(opération)
+    return opérations
+
+
+def _essai_jouer_le_coup(réglages):
+    def essai(tirées):
+        opérations = []
+        for état, joueur in tirées:
+            if réglages.get("moteur") == "heuristique":
+                #l'heuristique ne joue que pour le joueur 1
+                joueur = 1
+            partie = _partie(état)
+            partie.livre = None
+            opérations.append(lambda partie=partie, joueur=joueur:
+                              partie.jouer_le_coup(joueur, **réglages))
+        return opérations
+    return essai
+
+
+def _essai_formater_damier(tirées):
+    return [lambda partie=_partie(état): partie.formater_damier() for état, _ in tirées]
+
+
+class _PlumeMuette():
+    """Tortue qui accepte les appels de `QuoridorX` sans rien dessiner."""
+
+    def __getattr__(self, nom):
+        return self._rien
+
+    def _rien(self, *args, **kwargs):
+        pass
+
+
+@contextmanager
+def _tortue_muette():
+    """Remplacer la tortue de `quoridorx` par une plume muette."""
+    tortue = quoridorx.turtle
+
+    class Tortue():
+        Turtle = _PlumeMuette
+
+        @staticmethod
+        def tracer(*args, **kwargs):
+            pass
+
+    quoridorx.turtle = Tortue
+    try:
+        yield
+    finally:
+        quoridorx.turtle = tortue
+
+
+def _essai_gui(tirées):
+    with _tortue_muette():
+        parties = []
+        for état, _ in tirées:
+            état = copy.deepcopy(état)
+            parties.append(quoridorx.QuoridorX(état["joueurs"], état["murs"]))
+
+    def opération(partie):
+        with _tortue_muette():
+            partie.gui()
+    return [lambda partie=partie: opération(partie) for partie in parties]
+
+
+ESSAIS = {
+    "construire_graphe": _essai_construire_graphe,
+    "Quoridor.__init__": _essai_initialiser,
+    "Quoridor.déplacer_jeton": _essai_déplacer_jeton,
+    "Quoridor.placer_un_mur": _essai_placer_un_mur,
+    "Quoridor.jouer_le_coup[heuristique]": _essai_jouer_le_coup({"moteur": "heuristique"}),
+    "Quoridor.jouer_le_coup[alphabeta-2]": _essai_jouer_le_coup(
+        {"moteur": "alphabeta", "profondeur": 2, "temps": 60.0}),
+    "Quoridor.formater_damier": _essai_formater_damier,
+    "QuoridorX.gui": _essai_gui,
+}
+
+
+def mesurer(noms=None, nombre=50, graine=2020, répétitions=5, afficher=False):
+    """Exécuter les essais et retourner leurs résultats.
+
+    Args:
+        noms (List[str], optionnel): les essais à exécuter; tous par défaut.
+        nombre (int, optionnel): le nombre de positions.
+        graine (int, optionnel): la graine des positions.
+        répétitions (int, optionnel): le nombre de passages sur toutes les positions.
+        afficher (bool, optionnel): True pour afficher chaque résultat.
+
+    Returns:
+        dict: les réglages de la mesure et, pour chaque essai, les opérations par
+            seconde moyennes, leur écart type, leur minimum et leur maximum.
+    """
+    tirées = positions(nombre, graine)
+    résultats = {
+        "graine": graine,
+        "positions": nombre,
+        "répétitions": répétitions,
+        "python": platform.python_version(),
+        "essais": {},
+    }
+    for nom in noms or ESSAIS:
+        opérations = ESSAIS[nom](tirées)
+        for opération in opérations:
+            opération()
+        vitesses = []
+        for _ in range(répétitions):
+            début = time.perf_counter()
+            for opération in opérations:
+                opération()
+            vitesses.append(len(opérations) / (time.perf_counter() - début))
+        résultats["essais"][nom] = {
+            "ops_par_seconde": statistics.mean(vitesses),
+            "écart_type": statistics.stdev(vitesses) if len(vitesses) > 1 else 0.0,
+            "min": min(vitesses),
+            "max": max(vitesses),
+            "opérations": len(opérations),
+        }
+        if afficher:
+            essai = résultats["essais"][nom]
+            print(f"{nom:40} {essai['ops_par_seconde']:12.1f} ops/s "
+                  f"± {essai['écart_type']:.1f}", flush=True)
+    return résultats
+
+
+def comparer(référence, nouvelle, seuil=0.1):
+    """Repérer les essais plus lents qu'une mesure de référence.
+
+    Un essai régresse si sa vitesse moyenne baisse de plus de `seuil` et si la
+    baisse dépasse deux écarts types combinés, pour ne pas signaler le bruit.
+
+    Args:
+        référence (dict): les résultats de référence de `mesurer`.
+        nouvelle (dict): les nouveaux résultats.
+        seuil (float, optionnel): la baisse relative tolérée.
+
+    Returns:
+        List[Tuple[str, float, float, float, bool]]: pour chaque essai commun, son
+            nom, les deux vitesses, le rapport nouvelle/référence et s'il régresse.
+    """
+    comparaisons = []
+    for nom, avant in référence["essais"].items():
+        après = nouvelle["essais"].get(nom)
+        if après is None:
+            continue
+        rapport = après["ops_par_seconde"] / avant["ops_par_seconde"]
+        bruit = 2 * (avant["écart_type"] ** 2 + après["écart_type"] ** 2) ** 0.5
+        régresse = rapport < 1 - seuil \
+            and avant["ops_par_seconde"] - après["ops_par_seconde"] > bruit
+        comparaisons.append((nom, avant["ops_par_seconde"], après["ops_par_seconde"],
+                             rapport, régresse))
+    return comparaisons
+
+
+if __name__ == "__main__":
+    ANALYSEUR = argparse.ArgumentParser(description="Banc d'essai Quoridor")
+    COMMANDES = ANALYSEUR.add_subparsers(dest="commande", required=True)
+
+    MESURE = COMMANDES.add_parser("mesurer", help="Exécuter les essais.")
+    MESURE.add_argument("--sortie", help="Fichier JSON où écrire les résultats.")
+    MESURE.add_argument("--essai", action="append", choices=list(ESSAIS),
+                        help="Essai à exécuter (répétable); tous par défaut.")
+    MESURE.add_argument("--positions", type=int, default=50)
+    MESURE.add_argument("--graine", type=int, default=2020)
+    MESURE.add_argument("--répétitions", type=int, default=5)
+
+    COMPARAISON = COMMANDES.add_parser("comparer", help="Comparer deux mesures.")
+    COMPARAISON.add_argument("référence", help="Fichier JSON de référence.")
+    COMPARAISON.add_argument("nouvelle", help="Fichier JSON à comparer.")
+    COMPARAISON.add_argument("--seuil", type=float, default=0.1,
+                             help="Baisse relative tolérée avant de signaler une régression.")
+
+    ARGUMENTS = ANALYSEUR.parse_args()
+    if ARGUMENTS.commande == "mesurer":
+        RÉSULTATS = mesurer(ARGUMENTS.essai, ARGUMENTS.positions, ARGUMENTS.graine,
+                            ARGUMENTS.répétitions, afficher=True)
+        if ARGUMENTS.sortie:
+            with open(ARGUMENTS.sortie, "w", encoding="utf-8") as FICHIER:
+                json.dump(RÉSULTATS, FICHIER, indent=2, ensure_ascii=False)
+    else:
+        with open(ARGUMENTS.référence, encoding="utf-8") as FICHIER:
+            RÉFÉRENCE = json.load(FICHIER)
+        with open(ARGUMENTS.nouvelle, encoding="utf-8") as FICHIER:
+            NOUVELLE = json.load(FICHIER)
+        RÉGRESSIONS = 0
+        for NOM, AVANT, APRÈS, RAPPORT, RÉGRESSE in comparer(RÉFÉRENCE, NOUVELLE,
+                                                             ARGUMENTS.seuil):
+            RÉGRESSIONS += RÉGRESSE
+            print(f"{NOM:40} {AVANT:12.1f} -> {APRÈS:12.1f} ops/s  x{RAPPORT:.2f}"
+                  + ("  RÉGRESSION" if RÉGRESSE else ""))
+        sys.exit(1 if RÉGRESSIONS else 0)
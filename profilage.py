@@ -0,0 +1,138 @@
+"""Module de profilage
+
+Compteurs et chronomètres des phases coûteuses du moteur (construction du
+graphe, recherches de chemins, essais de murs, caches), activés à la demande.
+
+Les modules déclarent leurs fonctions à chronométrer avec `instrumenter`; elles
+ne sont remplacées par une version chronométrée que pendant `profiler`, si bien
+que le profilage désactivé ne coûte rien. Les compteurs placés dans le code
+sont protégés par un test de `ACTIF`:
+
+    if profilage.ACTIF:
+        profilage.compter("murs.candidats", len(candidats))
+
+    with profilage.profiler():
+        partie.jouer_le_coup(1)
+    print(profilage.stats())
+
+Attributes:
+    ACTIF (bool): True pendant le profilage.
+
+Functions:
+    * instrumenter - Déclarer une fonction ou une méthode à chronométrer.
+    * compter - Ajouter une quantité à un compteur.
+    * profiler - Gestionnaire de contexte qui active le profilage.
+    * stats - Compteurs et chronomètres accumulés.
+    * réinitialiser - Remettre les compteurs et les chronomètres à zéro.
+"""
+
+import functools
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+ACTIF = False
+
+_COMPTEURS = defaultdict(int)
+#appels, erreurs et durée cumulée de chaque phase
+_PHASES = defaultdict(lambda: [0, 0, 0.0])
+_POINTS = []
+
+
+def instrumenter(propriétaire, attribut, phase):
+    """Déclarer une fonction ou une méthode à chronométrer.
+
+    Args:
+        propriétaire (object): la classe ou le module qui porte la fonction.
+        attribut (str): le nom de la fonction.
+        phase (str): le nom sous lequel ses appels sont comptés.
+    """
+    _POINTS.append((propriétaire, attribut, phase))
+
+
+def _chronométrée(fonction, phase):
+    """Version chronométrée d'une fonction.
+
+    Args:
+        fonction (Callable): la fonction d'origine.
+        phase (str): le nom de la phase.
+
+    Returns:
+        Callable: la fonction qui compte ses appels, ses erreurs et sa durée.
+    """
+    mesures = _PHASES[phase]
+
+    @functools.wraps(fonction)
+    def chronométrée(*args, **kwargs):
+        début = time.perf_counter()
+        try:
+            return fonction(*args, **kwargs)
+        except Exception:
+            mesures[1] += 1
+            raise
+        finally:
+            mesures[0] += 1
+            mesures[2] += time.perf_counter() - début
+    return chronométrée
+
+
+def compter(nom, quantité=1):
+    """Ajouter une quantité à un compteur.
+
+    Args:
+        nom (str): le nom du compteur.
+        quantité (int, optionnel): la quantité à ajouter.
+    """
+    _COMPTEURS[nom] += quantité
+
+
+@contextmanager
+def profiler(remettre_à_zéro=True):
+    """Gestionnaire de contexte qui active le profilage.
+
+    Args:
+        remettre_à_zéro (bool, optionnel): False pour cumuler avec les mesures
+            précédentes.
+    """
+    global ACTIF
+    if ACTIF:
+        #déjà actif: le contexte englobant s'occupe de tout
+        yield
+        return
+    if remettre_à_zéro:
+        réinitialiser()
+    originales = []
+    for propriétaire, attribut, phase in _POINTS:
+        fonction = getattr(propriétaire, attribut)
+        originales.append((propriétaire, attribut, propriétaire.__dict__[attribut]
+                           if isinstance(propriétaire, type) else fonction))
+        setattr(propriétaire, attribut, _chronométrée(fonction, phase))
+    ACTIF = True
+    try:
+        yield
+    finally:
+        ACTIF = False
+        for propriétaire, attribut, fonction in reversed(originales):
+            setattr(propriétaire, attribut, fonction)
+
+
+def stats():
+    """Compteurs et chronomètres accumulés.
+
+    Returns:
+        dict: les compteurs par nom, et pour chaque phase le nombre d'appels,
+            le nombre d'appels terminés par une exception et la durée cumulée
+            en secondes.
+    """
+    return {
+        "compteurs": dict(_COMPTEURS),
+        "phases": {phase: {"appels": appels, "erreurs": erreurs, "durée": durée}
+                   for phase, (appels, erreurs, durée) in _PHASES.items() if appels},
+    }
+
+
+def réinitialiser():
+    """Remettre les compteurs et les chronomètres à zéro."""
+    _COMPTEURS.clear()
+    for mesures in _PHASES.values():
+        mesures[:] = [0, 0, 0.0]
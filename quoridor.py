@@ -3,20 +3,58 @@
 Classes:
     * Quoridor - Classe pour encapsuler le jeu Quoridor.
 """
+import sys
 from copy import deepcopy
+from itertools import chain
 
 from quoridor_error import QuoridorError
 
-from graphe import construire_graphe
+from damier import BLOQUE_EST, BLOQUE_NORD, CONFLITS, Damier, case, indice_mur, position_mur
 
-import networkx as nx
+from etat import État
+
+from distances import CarteDistances, INATTEIGNABLE
+
+from recherche import décoder_coup, meilleur_coup
+
+from transposition import clé_position
+
+from ouvertures import livre_partagé
+
+from finales import coup_final
+
+import mcts
+
+import profilage
+
+#Damier vide de `formater_damier`, une ligne par élément
+_LIGNES_DAMIER = ["   " + "-" * 35]
+for _rangée in range(9, 0, -1):
+    _LIGNES_DAMIER.append(str(_rangée) + " | " + ".   " * 8 + ". |")
+    _LIGNES_DAMIER.append("  |" + " " * 34 + " |")
+_LIGNES_DAMIER[-1] = "--|" + "-" * 35
+_LIGNES_DAMIER.append("  | " + "   ".join("123456789"))
+_DAMIER_VIDE = ("\n".join(_LIGNES_DAMIER) + "\n").encode("ascii")
+#Indice du premier caractère de chaque ligne dans `_DAMIER_VIDE`
+_DÉBUTS_LIGNES = [sum(len(ligne) + 1 for ligne in _LIGNES_DAMIER[:rang])
+                  for rang in range(len(_LIGNES_DAMIER))]
+
+#Affichages de `__str__` déjà produits, par position, murs restants et noms; le
+#cache est au niveau du module pour servir aussi les parties recréées à chaque coup
+_AFFICHAGES = {}
+_AFFICHAGES_CONSERVÉS = 256
 
 class Quoridor():
     """Classe pour encapsuler le jeu Quoridor.
-    Vous ne devez pas créer d'autre attributs pour votre classe.
+    Vous ne devez pas créer d'autre attributs pour votre classe que ceux listés
+    ci-dessous: `damier` et `historique` sont construits au premier accès et
+    `rapport` n'existe qu'après un coup automatique.
 
     Attributes:
         état (dict): état du jeu tenu à jour.
+        damier (Damier): damier en bitboard tenu à jour avec `état`.
+        historique (list): pile des coups joués par `jouer`, pour `annuler`.
+        rapport (dict): rapport du moteur du dernier appel à `jouer_le_coup`.
     """
 
     def __init__(self, joueurs, murs=None):#DONT TOUCH
@@ -117,15 +155,85 @@ class Quoridor():
                 QuoridorError.invalid_wall_count()
 
             #Last error check to make sure that the walls are in valid places
-            for wall in state["murs"]["horizontaux"]:
-                if wall[0] < 1 or wall[0] > 8 or wall[1] < 2 or wall[1] > 9:
-                    QuoridorError.invalid_wall_placement()
-            for wall in state["murs"]["verticaux"]:
-                if wall[0] < 2 or wall[0] > 9 or wall[1] < 1 or wall[1] > 8:
-                    QuoridorError.invalid_wall_placement()
+            #and that none of them overlaps or crosses another
+            occupied = 0
+            for orientation, key in (("MH", "horizontaux"), ("MV", "verticaux")):
+                for wall in state["murs"][key]:
+                    mur = indice_mur(orientation, wall)
+                    if mur is None or CONFLITS[mur] & occupied:
+                        QuoridorError.invalid_wall_placement()
+                    occupied |= 1 << mur
 
         return state
 
+    #True pour que `depuis_serveur` refasse toutes les vérifications du constructeur
+    vérifier_serveur = False
+
+    @classmethod
+    def depuis_serveur(cls, état):
+        """Créer une partie à partir d'un état reçu du serveur.
+
+        Le serveur a déjà validé l'état: les vérifications et la copie profonde du
+        constructeur sont sautées, les joueurs et les murs du JSON décodé sont
+        adoptés tels quels et le damier est construit directement à partir d'eux.
+        Avec `vérifier_serveur` à True, la partie est créée par le constructeur.
+
+        Args:
+            état (dict): l'état du jeu décodé de la réponse du serveur, avec les
+                clés 'joueurs' et 'murs'. Il ne doit plus être modifié ailleurs.
+
+        Raises:
+            QuoridorError: L'état est invalide, seulement avec `vérifier_serveur`.
+
+        Returns:
+            Quoridor: la partie dans l'état reçu.
+        """
+        if cls.vérifier_serveur:
+            return cls(état["joueurs"], état["murs"])
+        partie = cls.__new__(cls)
+        joueurs, murs = état["joueurs"], état["murs"]
+        partie.état = {"joueurs": joueurs, "murs": murs}
+        partie._damier = Damier([joueurs[0]["pos"], joueurs[1]["pos"]],
+                                murs["horizontaux"], murs["verticaux"])
+        return partie
+
+    @property
+    def damier(self):
+        """Damier en bitboard de la partie, construit au premier accès.
+
+        Il est ensuite tenu à jour par `déplacer_jeton` et `placer_un_mur`
+        plutôt que d'être reconstruit à chaque coup.
+
+        Returns:
+            Damier: le damier correspondant à `état`.
+        """
+        damier = self.__dict__.get("_damier")
+        if damier is None:
+            damier = Damier(
+                [joueur['pos'] for joueur in self.état['joueurs']],
+                self.état['murs']['horizontaux'],
+                self.état['murs']['verticaux']
+            )
+            self._damier = damier
+            if profilage.ACTIF:
+                profilage.compter("damier.constructions")
+        return damier
+
+    @property
+    def historique(self):
+        """Pile des coups joués par `jouer`, du plus ancien au plus récent.
+
+        Chaque enregistrement est un tuple (joueur, annulation) où annulation est
+        la position [x, y] de départ d'un déplacement, ou 'MH' / 'MV' pour un mur.
+
+        Returns:
+            List[Tuple]: la pile des enregistrements.
+        """
+        historique = self.__dict__.get("_historique")
+        if historique is None:
+            historique = self._historique = []
+        return historique
+
     def formater_légende(self):
         """Formater la représentation graphique de la légende.
 
@@ -163,123 +271,59 @@ class Quoridor():
         Returns:
             str: Chaîne de caractères représentant le damier.
         """
-        #Affiche le tableau de jeu vide
         joueurs = self.état['joueurs']
         murs = self.état['murs']
-        board = [["   " + "-" * 35],
-                ["9 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["8 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["7 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["6 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["5 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["4 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["3 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["2 " + "| " + ".   " * 8 + ". |"],
-                ["  " + "|" + " "* 34 + " |"],
-                ["1 " + "| " + ".   " * 8 + ". |"],
-                ["--" + "|" + "-"* 35],
-                ["  " + "| "+"1   "+"2   "+"3   "+"4   "+"5   "+"6   "+"7   "+"8   "+"9"]
-                ]
+        #On part du damier vide et on écrit chaque caractère à son indice
+        board = bytearray(_DAMIER_VIDE)
 
         pos_player1 = joueurs[0]['pos']
         pos_player2 = joueurs[1]['pos']
-        #on determine la constante qui nous permettra de traduire
-        #le numéro de position indiqué sur le display
-        #vers la ligne réelle du board: y=ax+b
-        #où a correspond a la pente, i.e à chaque fois qu'on descend d'un numéro d'afficher,
-        #et b correspond au offset, i.e quel numéro de ligne on cherche à traduire
-        #x correspond à l'élément de board[i] auquel on cherche à accéder
-        #Pour l'équation en colonne: y = 4x
-
-        #Determine la position pour chaque joueur
-        corresp_row_p1 = int((-2 * pos_player1[1]) + 19)
-        corresp_row_p2 = int((-2 * pos_player2[1]) + 19)
-
-        corresp_col_p1 = int(4 * pos_player1[0])
-        corresp_col_p2 = int(4 * pos_player2[0])
-
-        #Dans le cas où 2 joueurs sont sur la même ligne
-        if pos_player1[1] == pos_player2[1]:
-            if pos_player1[0] == pos_player2[0]:
-                raise Exception("Un joueur est déjà présent à cet emplacement!")
-            modif_row1 = [list(str(pos_player1[1]) + " |" + 8 * " .  " + " . " + "|")]
-            modif_row1[0][corresp_col_p1] = "1"
-            modif_row1[0][corresp_col_p2] = "2"
-            final_row1 = [''.join([str(elem) for elem in modif_row1[0]])]
-            board[corresp_row_p1] = final_row1
-
-        #Dans le cas où les 2 joueurs sont sur différentes lignes
-        else:
-            modif_row1 = [list(str(pos_player1[1]) + " |" + 8 * " .  " + " . " + "|")]
-            modif_row1[0][corresp_col_p1] = "1"
-            modif_row2 = [list(str(pos_player2[1]) + " |" + 8 * " .  " + " . " + "|")]
-            modif_row2[0][corresp_col_p2] = "2"
-
-            final_row1 = [''.join([str(elem) for elem in modif_row1[0]])]
-            final_row2 = [''.join([str(elem) for elem in modif_row2[0]])]
-
-            board[corresp_row_p1] = final_row1
-            board[corresp_row_p2] = final_row2
-
-        #Maintenant, on affiche les murs.
-        #1- les murs horizontaux
-        murs_horiz = murs["horizontaux"]
-        for mur in murs_horiz:
-            if 0 > mur[0] > 9 or 1 > mur[1] > 10:
-                raise Exception("Coordonnées invalides pour placer le mur")
-            mur_coord = mur
-            mur_row = int(-2* mur_coord[1] + 20)
-            mur_col = 4 * mur_coord[0] - 1
-
-            if "-" in board[mur_row][0][mur_col:mur_col+7]:
+        if pos_player1[0] == pos_player2[0] and pos_player1[1] == pos_player2[1]:
+            raise Exception("Un joueur est déjà présent à cet emplacement!")
+
+        #La case [x, y] est sur la ligne 19 - 2y, à la colonne 4x
+        board[_DÉBUTS_LIGNES[19 - 2 * pos_player1[1]] + 4 * pos_player1[0]] = ord("1")
+        board[_DÉBUTS_LIGNES[19 - 2 * pos_player2[1]] + 4 * pos_player2[0]] = ord("2")
+
+        #1- les murs horizontaux, sur la ligne 20 - 2y, des colonnes 4x - 1 à 4x + 5
+        for mur in murs["horizontaux"]:
+            début = _DÉBUTS_LIGNES[20 - 2 * mur[1]] + 4 * mur[0] - 1
+            if ord("-") in board[début:début + 7]:
                 raise Exception("Il y a déjà un mur ici!")
+            board[début:début + 7] = b"-------"
+
+        #2- les murs verticaux, sur les 3 lignes à partir de 19 - 2y, à la colonne 4x - 2
+        for mur in murs["verticaux"]:
+            ligne = 19 - 2 * mur[1]
+            colonne = 4 * mur[0] - 2
+            board[_DÉBUTS_LIGNES[ligne] + colonne] = ord("|")
+            board[_DÉBUTS_LIGNES[ligne - 1] + colonne] = ord("|")
+            board[_DÉBUTS_LIGNES[ligne - 2] + colonne] = ord("|")
 
-        #Réecris la ligne si pas déjà affichée avant
-            if "-" not in board[mur_row][0][mur_col:mur_col+7]:
-                new_row_mur1 = [list(board[mur_row][0])]
-                new_row_mur1[0][mur_col:mur_col+7] = "-------"
-                new_row_mur1 = [''.join([str(elem) for elem in new_row_mur1[0]])]
-                board[mur_row] = new_row_mur1
-
-        #2- les murs verticaux
-        murs_verti = murs["verticaux"]
-        for mur in murs_verti:
-            if 0 > mur[0] > 9 or 1 > mur[1] > 10:
-                raise Exception("Coordonnées invalides pour placer le mur")
-            mur_coord = mur
-
-            mur_row1 = int(-2* mur_coord[1] + 19)
-            #3 lignes que prend le mur vertical
-            murs_verti_coord = [mur_row1, mur_row1 - 1, mur_row1 - 2]
-            mur_col = 4 * mur_coord[0] - 2
-
-            for mur2 in murs_verti_coord:
-                final_row = list(board[mur2][0])
-                final_row[mur_col] = "|"
-                final_row = [''.join([str(elem) for elem in final_row])]
-                board[mur2] = final_row
-
-        #This line pour enlever les crochets autour des éléments
-        new_board = '\n'.join(' '.join(sub) for sub in board)
-        return new_board + '\n'
+        return board.decode("ascii")
 
     def __str__(self):
         """Représentation en art ascii de l'état actuel de la partie.
         Cette représentation est la même que celle du projet précédent.
+        Elle est gardée tant que l'état ne change pas.
         Returns:
             str: La chaîne de caractères de la représentation.
         """
 
+        #La clé de Zobrist du damier couvre les pions et les murs posés
+        joueurs = self.état["joueurs"]
+        clé = (self.damier.clé, joueurs[0]["murs"], joueurs[1]["murs"],
+               joueurs[0]["nom"], joueurs[1]["nom"])
+        affichage = _AFFICHAGES.get(clé)
+        if affichage is not None:
+            return affichage
+
         lgd = self.formater_légende()
         brd = self.formater_damier()
 
+        if len(_AFFICHAGES) >= _AFFICHAGES_CONSERVÉS:
+            _AFFICHAGES.clear()
+        _AFFICHAGES[clé] = lgd + brd
         return lgd + brd
 
     def état_courant(self):#DONT TOUCH
@@ -291,6 +335,19 @@ class Quoridor():
         """
         return deepcopy(self.état)
 
+    def état_compact(self):
+        """Produire l'état actuel du jeu sous forme compacte.
+
+        Returns:
+            État: l'état compact, convertible en dictionnaire par `État.to_dict`.
+        """
+        joueurs = self.état["joueurs"]
+        return État.depuis_damier(
+            self.damier,
+            (joueurs[0]["nom"], joueurs[1]["nom"]),
+            (joueurs[0]["murs"], joueurs[1]["murs"])
+        )
+
     def est_terminée(self):
         """Déterminer si la partie est terminée.
 
@@ -373,19 +430,15 @@ class Quoridor():
             QuoridorError.out_of_game_position()
 
         state = self.état
+        damier = self.damier
 
-        graphe = construire_graphe(
-            [joueur['pos'] for joueur in state['joueurs']],
-            state['murs']['horizontaux'],
-            state['murs']['verticaux']
-        )
-
-        valid = list(graphe.successors(tuple(state["joueurs"][joueur - 1]['pos'])))
+        valid = damier.successeurs(damier.pions[joueur - 1])
 
-        if tuple(position) not in valid:
+        if not valid >> case(position) & 1:
             QuoridorError.invalid_pos_current_game()
 
         state["joueurs"][joueur - 1]['pos'] = position
+        damier.déplacer_pion(joueur, case(position))
 
         return state
 
@@ -415,92 +468,150 @@ class Quoridor():
 
         if joueur not in (1, 2):
             QuoridorError.incorrect_p_number_assigned()
-        if position in state["murs"][orientation]:
+
+        #Error 3(1) If the given position is outside the limitation of the board
+        #for this orientation:
+        mur = indice_mur("MH" if orientation == "horizontaux" else "MV", position)
+        if mur is None:
+            QuoridorError.incorrect_wall_orientation()
+
+        #Error when the wall overlaps or crosses a wall already placed
+        damier = self.damier
+        if damier.en_conflit(mur):
             QuoridorError.wall_already_here()
 
-        #Error when placing overlapping walls
-        if orientation == "horizontaux":
-            for i in state['murs']['horizontaux']:
-                if i[1] == position[1]:
-                    if i[0] == (position[0] + 1) or\
-                        i[0] == (position[0] - 1):
-                        QuoridorError.wall_already_here()
+        if state["joueurs"][joueur - 1]["murs"] < 1:
+            QuoridorError.no_more_walls()
 
+        damier.ajouter_mur(mur)
 
-        if orientation == "verticaux":
-            for i in state['murs']['verticaux']:
-                if i[0] == position[0]:
-                    if i[1] == (position[1] + 1) or\
-                        i[1] == (position[1] - 1) or\
-                        i[1] == position[1]:
-                        QuoridorError.wall_already_here()
+        #Error if a player is blocked in, the wall is taken back out
+        if not damier.chemin_existe(joueur) or not damier.chemin_existe(3 - joueur):
+            damier.retirer_mur(mur)
+            QuoridorError.incorrect_wall_orientation()
 
+        state["murs"][orientation].append(position)
 
-        # Error when placing overlapping horizontal and vertical walls
-        if orientation == "verticaux":
-            for i in state['murs']['horizontaux']:
-                if i[0] == (position[0] - 1) and\
-                    i[1] == (position[1] + 1):
-                    QuoridorError.wall_already_here()
+        state["joueurs"][joueur - 1]["murs"] -= 1
 
+        return state
 
-        if orientation == "horizontaux":
-            for i in state['murs']['verticaux']:
-                if i[0] == (position[0] - 1) and\
-                    i[1] == (position[1] + 1):
-                    QuoridorError.wall_already_here()
+    def jouer(self, joueur, coup):
+        """Jouer un coup en modifiant l'état sur place.
 
+        Le coup est validé comme par `déplacer_jeton` ou `placer_un_mur`, puis un
+        enregistrement compact est empilé dans `historique` pour `annuler`.
 
-        #Error 3(1) If the given position is outside the limitation of the board:
-        x, y = position[0], position[1]
-        if 1 > x or x > 9 or 1 > y or y > 9:
-            QuoridorError.incorrect_wall_orientation()
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+            coup (Tuple[str, List[int, int]]): le type ('D', 'MH' ou 'MV') et la
+                position du coup, tel que retourné par `jouer_le_coup`, ou son code
+                tel que généré par `coups_légaux`.
 
+        Raises:
+            QuoridorError: Le type de coup est invalide.
+            QuoridorError: Les erreurs de `déplacer_jeton` et de `placer_un_mur`.
 
-        if state["joueurs"][joueur - 1]["murs"] < 1:
-            QuoridorError.no_more_walls()
+        Returns:
+            Dict: l'état du jeu, modifié sur place.
+        """
+        if isinstance(coup, int):
+            coup = décoder_coup(coup)
+        type_coup, position = coup
+        position = [position[0], position[1]]
+        if type_coup == "D":
+            départ = self.état["joueurs"][joueur - 1]["pos"] if joueur in (1, 2) else None
+            self.déplacer_jeton(joueur, position)
+            self.historique.append((joueur, départ))
+        elif type_coup in ("MH", "MV"):
+            self.placer_un_mur(joueur, position, type_coup)
+            self.historique.append((joueur, type_coup))
+        else:
+            QuoridorError.wrong_type_move()
+        return self.état
 
-        state["murs"][orientation].append(position)
+    def annuler(self):
+        """Annuler le dernier coup joué par `jouer`.
 
-        graphe = construire_graphe(
-            [joueur['pos'] for joueur in state['joueurs']],
-            state['murs']['horizontaux'],
-            state['murs']['verticaux']
-        )
+        Raises:
+            IndexError: Aucun coup n'a été joué.
 
-        #Error if the player block themselves in
-        if not nx.has_path(graphe, tuple(state["joueurs"][joueur - 1]["pos"]), 'B' + str(joueur)):
-            state["murs"][orientation].remove(position)
-            QuoridorError.incorrect_wall_orientation()
+        Returns:
+            Dict: l'état du jeu, modifié sur place.
+        """
+        joueur, annulation = self.historique.pop()
+        joueurs = self.état["joueurs"]
+        if annulation == "MH" or annulation == "MV":
+            orientation = "horizontaux" if annulation == "MH" else "verticaux"
+            position = self.état["murs"][orientation].pop()
+            joueurs[joueur - 1]["murs"] += 1
+            self.damier.retirer_mur(indice_mur(annulation, position))
+        else:
+            joueurs[joueur - 1]["pos"] = annulation
+            self.damier.annuler_déplacement(joueur, case(annulation))
+        return self.état
 
-        # Error if the player blocks the other player in
-        if joueur == 1:
-            if not nx.has_path(graphe, tuple(state["joueurs"][1]["pos"]), 'B2'):
-                state["murs"][orientation].remove(position)
-                QuoridorError.incorrect_wall_orientation()
-        if joueur == 2:
-            if not nx.has_path(graphe, tuple(state["joueurs"][0]["pos"]), 'B1'):
-                state["murs"][orientation].remove(position)
-                QuoridorError.incorrect_wall_orientation()
+    def coups_légaux(self, joueur, trier=False, premiers=()):
+        """Générer tous les coups légaux d'un joueur.
 
-        state["joueurs"][joueur - 1]["murs"] -= 1
+        Les coups sont générés sous forme de codes entiers: l'indice de la case
+        d'arrivée (0 à 80) pour un déplacement, 81 + l'indice de l'emplacement pour
+        un mur. `décoder_coup` les convertit en ('D', [x, y]), ('MH', [x, y]) ou
+        ('MV', [x, y]) et `jouer` les accepte tels quels. Le générateur doit être
+        repris dans le même état de jeu que celui où il a été créé.
 
-        return state
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+            trier (bool, optionnel): True pour générer d'abord les déplacements qui
+                rapprochent le plus du but, puis les murs qui coupent le chemin de
+                l'adversaire.
+            premiers (Iterable[int], optionnel): des codes à générer en premier
+                s'ils sont légaux.
+
+        Raises:
+            QuoridorError: Le numéro du joueur est autre que 1 ou 2.
+
+        Returns:
+            Iterator[int]: les codes des coups légaux; aucun si la partie est terminée.
+        """
+        if joueur not in (1, 2):
+            QuoridorError.incorrect_p_number_assigned()
+        if self.est_terminée():
+            return iter(())
+        murs = self.état["joueurs"][joueur - 1]["murs"] > 0
+        return self.damier.coups_légaux(joueur, murs, trier, premiers)
 
+    #Moteur utilisé par `jouer_le_coup` lorsqu'aucun n'est précisé
+    moteur = "alphabeta"
+    #True pour le livre d'ouvertures par défaut, un LivreOuvertures, ou None
+    livre = True
 
-    def jouer_le_coup(self, joueur):
+    def jouer_le_coup(self, joueur, moteur=None, **réglages):
         """Jouer un coup automatique pour un joueur.
 
         Pour le joueur spécifié, jouer automatiquement son meilleur coup pour l'état actuel
         de la partie. Ce coup est soit le déplacement de son jeton, soit le placement d'un
         mur horizontal ou vertical.
 
+        Si la position est dans le livre d'ouvertures (attribut `livre`), le coup du
+        livre est joué sans recherche. Si le joueur n'a plus de murs et que ceux de
+        l'adversaire ne peuvent rien changer, le coup parfait est lu dans la table
+        de finales. Le rapport du moteur (profondeur, nœuds,
+        durée, ...) est conservé dans l'attribut `rapport`.
+
         Args:
             joueur (int): Un entier spécifiant le numéro du joueur (1 ou 2).
+            moteur (str, optionnel): 'alphabeta' pour la recherche alpha-bêta, 'mcts'
+                pour la recherche Monte-Carlo ou 'heuristique' pour l'heuristique à un
+                demi-coup; par défaut `self.moteur`.
+            **réglages: Les options du moteur, par exemple `temps` (en secondes)
+                et `profondeur` pour 'alphabeta', `simulations` et `processus`
+                pour 'mcts', ou `arrêt` (threading.Event) pour les deux.
 
         Raises:
             QuoridorError: Le numéro du joueur est autre que 1 ou 2.
             QuoridorError: La partie est déjà terminée.
+            QuoridorError: Le joueur n'a aucun coup légal.
 
         Returns:
             Tuple[str, List[int, int]]: Un tuple composé du type et de la position du coup joué.
@@ -508,15 +619,59 @@ class Quoridor():
 
         if joueur not in (1, 2):
             QuoridorError.incorrect_p_number_assigned()
+        if self.est_terminée():
+            QuoridorError.end_of_the_game()
+
+        moteur = moteur or self.moteur
+        if moteur == "heuristique":
+            self.rapport = {"moteur": "heuristique"}
+            return self._jouer_heuristique(joueur)
+
+        murs = [joueur['murs'] for joueur in self.état['joueurs']]
+        livre = livre_partagé() if self.livre is True else self.livre
+        if livre:
+            entrée = livre.chercher(clé_position(self.damier, murs, joueur))
+            if profilage.ACTIF:
+                profilage.compter("livre.échecs" if entrée is None else "livre.succès")
+            #le coup n'est joué que s'il est légal, au cas où deux clés se confondraient
+            if entrée is not None and next(self.damier.coups_légaux(
+                    joueur, murs[joueur - 1] > 0, premiers=(entrée[0],)), None) == entrée[0]:
+                coup, score, profondeur = entrée
+                self.rapport = {"moteur": "livre", "score": score, "profondeur": profondeur}
+                return décoder_coup(coup)
+
+        #course de pions sans murs utiles: jeu parfait par la table de finales
+        finale = coup_final(self.damier, joueur, murs)
+        if finale is not None:
+            coup, self.rapport = finale
+            return décoder_coup(coup)
+
+        if moteur == "mcts":
+            coup, self.rapport = mcts.meilleur_coup(self.damier, joueur, murs, **réglages)
+            if profilage.ACTIF:
+                profilage.compter("mcts.simulations", self.rapport["simulations"])
+        else:
+            coup, self.rapport = meilleur_coup(self.damier, joueur, murs, **réglages)
+            if profilage.ACTIF:
+                profilage.compter("recherche.nœuds", self.rapport["nœuds"])
+        return décoder_coup(coup)
+
+    def _jouer_heuristique(self, joueur):
+        """Coup de l'heuristique à un demi-coup.
+
+        Avancer si notre chemin est le plus court, sinon poser le mur qui allonge
+        le plus le chemin de l'adversaire.
+
+        Args:
+            joueur (int): Un entier spécifiant le numéro du joueur (1 ou 2).
+
+        Returns:
+            Tuple[str, List[int, int]]: Un tuple composé du type et de la position du coup joué.
+        """
 
         state = self.état
 
-        #Build the board
-        graphe = construire_graphe(
-            [joueur['pos'] for joueur in state['joueurs']],
-            state['murs']['horizontaux'],
-            state['murs']['verticaux']
-        )
+        damier = self.damier
 
         '''
         1. Check the length of the shortest path for each player
@@ -529,123 +684,136 @@ class Quoridor():
 
         #Check the length of the path
 
-        shortest_p1 = nx.shortest_path(graphe, tuple(state["joueurs"][0]["pos"]), 'B1')
-        shortest_p2 = nx.shortest_path(graphe, tuple(state["joueurs"][1]["pos"]), 'B2')
+        opponent = 3 - joueur
+        shortest_own = damier.chemin(joueur)
+        shortest_opp = damier.chemin(opponent)
 
-        #If our path is shorter or we have no more walls left, move forward
+        #If our pawn is boxed in and we have no more walls left, there is no move
 
-        if len(shortest_p1) <= len(shortest_p2) or state['joueurs'][0]['murs'] == 0:
-            next_step_p1 = shortest_p1[1]
-            return("D", next_step_p1)
+        if shortest_own is None and state['joueurs'][joueur - 1]['murs'] == 0:
+            QuoridorError.no_legal_move()
+
+        #If our path is shorter, their pawn is boxed in or we have no more walls left,
+        #move forward
+
+        if shortest_own is not None and (shortest_opp is None
+                                         or len(shortest_own) <= len(shortest_opp)
+                                         or state['joueurs'][joueur - 1]['murs'] == 0):
+            next_step_own = shortest_own[1]
+            return("D", next_step_own)
 
         else:
 
             def temp_wall(x, y, orientation):
                 """
-                Function to temporarily place a wall
+                Function to temporarily place a wall, returns True if it was placed
                 """
                 if x >= 1 and x <= 9 and y >=1 and y <= 9:
                     try:
-                        self.placer_un_mur(1, (x, y), orientation)
-                    except:
-                        return
+                        self.placer_un_mur(joueur, [x, y], orientation)
+                    except QuoridorError:
+                        return False
+                    return True
+                return False
 
 
-            def remove_temp_wall(x, y, orientation):
+            def remove_temp_wall(orientation):
                 """
                 Function to take out the wall previously put
                 """
                 if orientation == "MH":
-                    if (x, y) in state['murs']['horizontaux']:
-                        state['murs']['horizontaux'].remove((x, y))
-                        state["joueurs"][joueur - 1]["murs"] += 1
+                    position = state['murs']['horizontaux'].pop()
                 if orientation == "MV":
-                    if (x,y) in state['murs']['verticaux']:
-                        state['murs']['verticaux'].remove((x, y))
-                        state["joueurs"][joueur - 1]["murs"] += 1
+                    position = state['murs']['verticaux'].pop()
+                state["joueurs"][joueur - 1]["murs"] += 1
+                damier.retirer_mur(indice_mur(orientation, position))
 
 
+            #The distance fields are repaired locally for each trial wall instead of
+            #searching new paths from scratch. They ignore the pawns, which only matter
+            #when they face each other (jumps): then the pawn-aware search is kept
+            distances_own = CarteDistances(damier, joueur)
+            distances_opp = CarteDistances(damier, opponent)
+            pawn_own = damier.pions[joueur - 1]
+            pawn_opp = damier.pions[opponent - 1]
+            facing = damier.voisins(1 << pawn_opp) >> pawn_own & 1
+
+            def trial_length(mur):
+                """
+                Function to score a wall with the opponent's path length and our own
+                number of steps, None if a player is cut off
+                """
+                if facing:
+                    damier.ajouter_mur(mur)
+                    steps_own, steps_opp = damier.distance(joueur), damier.distance(opponent)
+                    damier.retirer_mur(mur)
+                    if steps_own is None or steps_opp is None:
+                        return None
+                    return steps_opp + 2, steps_own
+                steps_own = distances_own.essayer(mur, pawn_own)
+                steps_opp = distances_opp.essayer(mur, pawn_opp)
+                if steps_own == INATTEIGNABLE or steps_opp == INATTEIGNABLE:
+                    return None
+                return steps_opp + 2, steps_own
+
+
+            #Check where on the paths it would be best to put a wall: every free wall
+            #that cuts an arc of any of the opponent's shortest paths, not only of the
+            #one path the search happens to return
+
+            arcs_n, arcs_e = distances_opp.arcs_plus_courts(pawn_opp)
+            if facing and shortest_opp is not None:
+                #the jump over our pawn is not in the field
+                jump_n, jump_e = damier.arcs_du_chemin(damier.chemin_indices(opponent))
+                arcs_n |= jump_n
+                arcs_e |= jump_e
+
             path_length = []
-            shortest_p2 = shortest_p2[:-1]
-
-            #Check where on the path it would be best to put a wall
-
-            #V wall check
-
-            for i, y in enumerate(shortest_p2):
-                if shortest_p2[i][0] > 1 and shortest_p2[i][0] < 9 and shortest_p2[i][1] > 1 and\
-                    shortest_p2[i][1] < 9:
-                    if [shortest_p2[i][0], shortest_p2[i][1]] in state['murs']['verticaux'] or\
-                        [shortest_p2[i][0], shortest_p2[i][1] + 1] in state['murs']['verticaux'] or\
-                        [shortest_p2[i][0] + 1, shortest_p2[i][1] + 1]\
-                        in state['murs']['verticaux'] or\
-                        [shortest_p2[i][0] + 1, shortest_p2[i][1]] in state['murs']['verticaux']:
-                        continue
-                    elif [shortest_p2[i][0], shortest_p2[i][1]] in state['murs']['horizontaux'] or\
-                        [shortest_p2[i][0] + 1, shortest_p2[i][1]]\
-                        in state['murs']['horizontaux'] or\
-                        [shortest_p2[i][0] + 1, shortest_p2[i][1] + 1]\
-                        in state['murs']['horizontaux'] or\
-                        [shortest_p2[i][0], shortest_p2[i][1] + 1] in state['murs']['horizontaux']:
-                        continue
-                    else:
-                        temp_wall(shortest_p2[i][0], shortest_p2[i][1], "MV")
-                        graphe_n = construire_graphe(
-                        [joueur['pos'] for joueur in state['joueurs']],
-                        state['murs']['horizontaux'],
-                        state['murs']['verticaux'])
-                        new_shortest_p2 = nx.shortest_path(graphe_n\
-                        , tuple(state["joueurs"][1]["pos"]), 'B2')
-                        path_length.append(("MV", (shortest_p2[i][0], shortest_p2[i][1])\
-                            , len(new_shortest_p2)))
-                        remove_temp_wall(shortest_p2[i][0], shortest_p2[i][1], "MV")
-
-            #H wall check
-
-            for i, y in enumerate(shortest_p2):
-
-                if shortest_p2[i][0] >= 1 and shortest_p2[i][0] < 9 and\
-                    shortest_p2[i][1] <= 9 and shortest_p2[i][1] > 1:
-                    if [shortest_p2[i][0], shortest_p2[i][1]] in state['murs']['horizontaux'] or\
-                        [shortest_p2[i][0] - 1, shortest_p2[i][1]]\
-                        in state['murs']['horizontaux'] or\
-                        [shortest_p2[i][0] + 1, shortest_p2[i][1]] in state['murs']['horizontaux']:
-                        continue
-                    elif [shortest_p2[i][0], shortest_p2[i][1]] in state['murs']['verticaux'] or\
-                        [shortest_p2[i][0] + 1, shortest_p2[i][1]] in state['murs']['verticaux'] or\
-                        [shortest_p2[i][0] + 1, shortest_p2[i][1] - 1]\
-                        in state['murs']['verticaux']:
-                        continue
-                    else:
-                        temp_wall(shortest_p2[i][0], shortest_p2[i][1], "MH")
-                        graphe_n = construire_graphe(
-                        [joueur['pos'] for joueur in state['joueurs']],
-                        state['murs']['horizontaux'],
-                        state['murs']['verticaux'])
-                        new_shortest_p2 = nx.shortest_path(graphe_n\
-                            , tuple(state["joueurs"][1]["pos"]), 'B2')
-                        path_length.append(("MH", (shortest_p2[i][0], shortest_p2[i][1])\
-                            , len(new_shortest_p2)))
-                        remove_temp_wall(shortest_p2[i][0], shortest_p2[i][1], "MH")
-
-            #If P2 is on the 9th column, still better to place a wall,
-            #but it won't be on the direct path
-
-            for i, y in enumerate(shortest_p2):
-                if shortest_p2[i][0] == 9 and shortest_p2[i][1] < 9 and shortest_p2[i][1] > 1:
-                    temp_wall(shortest_p2[i][0] - 1, shortest_p2[i][1], "MH")
-                    path_length.append(("MH", (shortest_p2[i][0] - 1, shortest_p2[i][1])\
-                        , len(shortest_p2)))
-                    remove_temp_wall(shortest_p2[i][0] - 1, shortest_p2[i][1], "MH")
-
-            #This line returns the element of the list that adds the largest number of steps for p2.
+            free = damier.murs_libres()
+
+            #V walls first, then H walls
+
+            for mur in chain(range(64, 128), range(64)):
+                if free >> mur & 1 and (BLOQUE_NORD[mur] & arcs_n or BLOQUE_EST[mur] & arcs_e):
+                    trial = trial_length(mur)
+                    if trial is not None:
+                        orientation, (x, y) = position_mur(mur)
+                        path_length.append((orientation, (x, y)) + trial)
+
+            #This returns the element of the list that adds the largest number of steps for the
+            #opponent, and among those the one that lengthens our own path the least.
+            #Only that wall is actually tried: if it is illegal, the next best one is.
             #If there is no good wall placement, it moves the player
-            #If there are multiple options, it still only returns 1 which is fine
 
-            if path_length == []:
-                best_move = ("D", shortest_p1[1])
-            else:
-                best_move = max(path_length, key=lambda x:x[2])
+            best_move = ("D", shortest_own[1]) if shortest_own is not None else None
+            tried = 0
+            for move in sorted(path_length, key=lambda x:(x[2], -x[3]), reverse=True):
+                tried += 1
+                if temp_wall(move[1][0], move[1][1], move[0]):
+                    remove_temp_wall(move[0])
+                    best_move = move
+                    break
+
+            if best_move is None:
+                #our pawn is boxed in and no wall can be placed on their paths
+                QuoridorError.no_legal_move()
+
+            if profilage.ACTIF:
+                profilage.compter("heuristique.murs_candidats", len(path_length))
+                profilage.compter("heuristique.murs_essayés", tried)
+                profilage.compter("heuristique.murs_refusés", tried - (best_move[0] != "D"))
 
             #This will return something like ("MH", (2, 2))
             return(best_move[0], (best_move[1][0], best_move[1][1]))
+
+
+#Phases chronométrées pendant `profilage.profiler`
+for _phase in ("vérification", "déplacer_jeton", "placer_un_mur", "jouer",
+               "jouer_le_coup", "_jouer_heuristique", "formater_damier"):
+    profilage.instrumenter(Quoridor, _phase, "quoridor." + _phase.strip("_"))
+for _phase in ("distance", "chemin_existe", "chemin_indices", "murs_légaux"):
+    profilage.instrumenter(Damier, _phase, "chemins." + _phase)
+profilage.instrumenter(CarteDistances, "réparer", "chemins.réparation")
+profilage.instrumenter(sys.modules[__name__], "meilleur_coup", "moteur.alphabeta")
+profilage.instrumenter(mcts, "meilleur_coup", "moteur.mcts")
+profilage.instrumenter(sys.modules[__name__], "coup_final", "moteur.finales")
@@ -128,3 +128,10 @@ class QuoridorError(Exception):
         QuoridorError: La position est invalide pour cette orientation.
             """
         raise QuoridorError("La partie est déjà terminée.")
+
+    def no_legal_move(self=None):
+        """Aucun coup légal pour le joueur.
+        Raise:
+        QuoridorError: Le joueur n'a aucun coup légal.
+            """
+        raise QuoridorError("Le joueur n'a aucun coup légal.")
@@ -12,7 +12,22 @@ class QuoridorX(Quoridor):
     """
     def __init__(self, joueurs, murs=None):
         super().__init__(joueurs, murs)
+        self.préparer_tortue()
 
+    @classmethod
+    def depuis_serveur(cls, état):
+        """
+        Same as Quoridor.depuis_serveur, with the turtle ready to draw
+        """
+        partie = super().depuis_serveur(état)
+        if not cls.vérifier_serveur:
+            partie.préparer_tortue()
+        return partie
+
+    def préparer_tortue(self):
+        """
+        Set the colours, the turtle and the starting coords used by gui
+        """
         #Setting colour names for quick reference
         self.bg = "gainsboro"
         self.line = "black"
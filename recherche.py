@@ -0,0 +1,424 @@
+"""Module de recherche alpha-bêta
+
+Moteur de recherche negamax avec élagage alpha-bêta et approfondissement
+itératif, borné par un budget de temps. L'évaluation est la différence des
+longueurs des plus courts chemins des deux joueurs.
+
+Les coups sont codés par des entiers: 0 à 80 pour un déplacement vers la case
+de cet indice, `PREMIER_MUR` + indice de l'emplacement pour un mur.
+
+Attributes:
+    PREMIER_MUR (int): Code du premier coup de mur.
+    GAGNE (int): Score d'une partie gagnée, diminué du nombre de demi-coups joués.
+    TAILLE_TABLE_MO (float): Taille en Mo de la table de transposition partagée.
+
+Classes:
+    * Recherche - Recherche alpha-bêta sur une copie du damier.
+
+Functions:
+    * table_partagée - Table de transposition conservée d'un coup à l'autre.
+    * décoder_coup - Convertir un code de coup en type et position.
+    * meilleur_coup - Chercher le meilleur coup d'un joueur dans le temps imparti.
+"""
+
+import time
+
+from damier import BLOQUE_EST, BLOQUE_NORD, BUTS, PREMIER_MUR, position, position_mur
+
+from quoridor_error import QuoridorError
+
+from transposition import (EXACTE, INFÉRIEURE, SUPÉRIEURE, ZOBRIST_RESTANTS,
+                           ZOBRIST_TRAIT, TableTransposition)
+
+GAGNE = 10000
+TAILLE_TABLE_MO = 16
+
+#Au-delà de ce score, il s'agit d'une partie gagnée à un nombre de demi-coups près
+_SEUIL_GAGNE = GAGNE - 1000
+
+_TABLE = None
+
+
+def table_partagée():
+    """Table de transposition conservée d'un coup à l'autre.
+
+    Elle est créée au premier appel avec une taille de `TAILLE_TABLE_MO` Mo.
+
+    Returns:
+        TableTransposition: la table utilisée par défaut par `meilleur_coup`.
+    """
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = TableTransposition(TAILLE_TABLE_MO)
+    return _TABLE
+
+
+def décoder_coup(coup):
+    """Convertir un code de coup en type et position.
+
+    Args:
+        coup (int): le code du coup.
+
+    Returns:
+        Tuple[str, List[int, int]]: le type ('D', 'MH' ou 'MV') et la position [x, y].
+    """
+    if coup < PREMIER_MUR:
+        return "D", position(coup)
+    return position_mur(coup - PREMIER_MUR)
+
+
+class TempsÉcoulé(Exception):
+    """Le budget de temps de la recherche est épuisé."""
+
+
+class Recherche():
+    """Recherche alpha-bêta sur une copie du damier.
+
+    Attributes:
+        damier (Damier): la copie du damier modifiée pendant la recherche.
+        murs (List[int, int]): les murs restants des joueurs 1 et 2.
+        échéance (float): l'instant `time.perf_counter` où la recherche doit s'arrêter.
+        table (TableTransposition): la table de transposition consultée.
+        arrêt (threading.Event): l'événement qui interrompt la recherche, ou None.
+        nœuds (int): le nombre de positions visitées.
+    """
+
+    def __init__(self, damier, murs, échéance, table, arrêt=None):
+        """Constructeur de la classe Recherche.
+
+        Args:
+            damier (Damier): le damier de la position à chercher; il n'est pas modifié.
+            murs (List[int, int]): les murs restants des joueurs 1 et 2.
+            échéance (float): l'instant `time.perf_counter` où s'arrêter.
+            table (TableTransposition): la table de transposition à utiliser.
+            arrêt (threading.Event, optionnel): un événement qui, une fois levé,
+                interrompt la recherche comme l'échéance.
+        """
+        self.damier = damier.copie()
+        self.murs = list(murs)
+        self.échéance = échéance
+        self.table = table
+        self.arrêt = arrêt
+        self.nœuds = 0
+
+    def clé(self, joueur):
+        """Clé de Zobrist de la position courante.
+
+        Args:
+            joueur (int): le numéro du joueur au trait.
+
+        Returns:
+            int: la clé de 64 bits.
+        """
+        clé = (self.damier.clé ^ ZOBRIST_RESTANTS[0][self.murs[0]]
+               ^ ZOBRIST_RESTANTS[1][self.murs[1]])
+        return clé ^ ZOBRIST_TRAIT if joueur == 2 else clé
+
+    def évaluer(self, joueur):
+        """Évaluer la position du point de vue d'un joueur.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Returns:
+            int: dix fois l'avance en nombre de pas, plus l'avance en murs.
+        """
+        damier = self.damier
+        #un pion enfermé est considéré comme le plus loin de son but
+        distances = [81 if distance is None else distance
+                     for distance in (damier.distance(joueur), damier.distance(3 - joueur))]
+        avance = distances[1] - distances[0]
+        return 10 * avance + self.murs[joueur - 1] - self.murs[2 - joueur]
+
+    def coups(self, joueur):
+        """Coups à essayer pour un joueur, du plus prometteur au moins prometteur.
+
+        Les murs retenus sont ceux qui allongent le plus court chemin de
+        l'adversaire; un mur qui ne coupe pas ce chemin ne peut pas l'allonger.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Returns:
+            List[int]: les codes des coups.
+        """
+        damier = self.damier
+        adversaire = 3 - joueur
+        candidats = []
+
+        #déplacements, triés selon le gain de distance
+        départ = damier.pions[joueur - 1]
+        destinations = damier.successeurs(départ)
+        while destinations:
+            bit = destinations & -destinations
+            destinations ^= bit
+            arrivée = bit.bit_length() - 1
+            damier.pions[joueur - 1] = arrivée
+            candidats.append((damier.distance(joueur), arrivée))
+            damier.pions[joueur - 1] = départ
+
+        #murs qui allongent le chemin de l'adversaire, s'il en a encore un
+        chemin = damier.chemin_indices(adversaire) if self.murs[joueur - 1] else None
+        if chemin is not None:
+            longueur = len(chemin) - 1
+            arcs_n, arcs_e = damier.arcs_du_chemin(chemin)
+            libres = damier.murs_libres()
+            while libres:
+                bit = libres & -libres
+                libres ^= bit
+                mur = bit.bit_length() - 1
+                if not (BLOQUE_NORD[mur] & arcs_n or BLOQUE_EST[mur] & arcs_e):
+                    continue
+                damier.ajouter_mur(mur)
+                nouvelle = damier.distance(adversaire)
+                if nouvelle is not None and nouvelle > longueur \
+                        and damier.chemin_existe(joueur):
+                    candidats.append((longueur - nouvelle, PREMIER_MUR + mur))
+                damier.retirer_mur(mur)
+
+        candidats.sort()
+        return [coup for _, coup in candidats]
+
+    def coups_racine(self, joueur):
+        """Coups à essayer à la racine, jamais vide.
+
+        Un pion qui ne peut pas bouger n'a plus de chemin jusqu'à son but: aucun
+        mur n'est alors légal non plus.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+
+        Raises:
+            QuoridorError: Le joueur n'a aucun coup légal.
+
+        Returns:
+            List[int]: les codes des coups.
+        """
+        coups = self.coups(joueur)
+        if not coups:
+            QuoridorError.no_legal_move()
+        return coups
+
+    def jouer(self, joueur, coup):
+        """Appliquer un coup sur le damier de la recherche.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+            coup (int): le code du coup.
+
+        Returns:
+            int: l'information à passer à `annuler`.
+        """
+        if coup < PREMIER_MUR:
+            return self.damier.déplacer_pion(joueur, coup)
+        self.damier.ajouter_mur(coup - PREMIER_MUR)
+        self.murs[joueur - 1] -= 1
+        return None
+
+    def annuler(self, joueur, coup, annulation):
+        """Défaire un coup appliqué par `jouer`.
+
+        Args:
+            joueur (int): le numéro du joueur (1 ou 2).
+            coup (int): le code du coup.
+            annulation (int): la valeur retournée par `jouer`.
+        """
+        if coup < PREMIER_MUR:
+            self.damier.annuler_déplacement(joueur, annulation)
+        else:
+            self.damier.retirer_mur(coup - PREMIER_MUR)
+            self.murs[joueur - 1] += 1
+
+    def negamax(self, joueur, profondeur, alpha, bêta, ply):
+        """Valeur negamax de la position pour le joueur au trait.
+
+        Args:
+            joueur (int): le numéro du joueur au trait.
+            profondeur (int): le nombre de demi-coups restant à explorer.
+            alpha (int): la borne inférieure de la fenêtre.
+            bêta (int): la borne supérieure de la fenêtre.
+            ply (int): le nombre de demi-coups depuis la racine.
+
+        Raises:
+            TempsÉcoulé: Le budget de temps est épuisé ou l'arrêt est demandé.
+
+        Returns:
+            int: le score de la position pour le joueur au trait.
+        """
+        self.nœuds += 1
+        if time.perf_counter() > self.échéance \
+                or self.arrêt is not None and self.arrêt.is_set():
+            raise TempsÉcoulé()
+
+        adversaire = 3 - joueur
+        if BUTS[adversaire - 1] >> self.damier.pions[adversaire - 1] & 1:
+            return ply - GAGNE
+        if profondeur == 0:
+            return self.évaluer(joueur)
+
+        clé = self.clé(joueur)
+        entrée = self.table.sonder(clé)
+        premier = -1
+        if entrée is not None:
+            profondeur_table, borne, score, premier = entrée
+            if profondeur_table >= profondeur:
+                score = _score_lu(score, ply)
+                if borne == EXACTE \
+                        or (borne == INFÉRIEURE and score >= bêta) \
+                        or (borne == SUPÉRIEURE and score <= alpha):
+                    return score
+
+        coups = self.coups(joueur)
+        if not coups:
+            #pion enfermé et aucun mur utile: le joueur passe son tour
+            return -self.negamax(adversaire, profondeur - 1, -bêta, -alpha, ply + 1)
+        if premier in coups:
+            coups.remove(premier)
+            coups.insert(0, premier)
+
+        alpha_initial = alpha
+        meilleur = -GAGNE - 1
+        meilleur_coup = -1
+        for coup in coups:
+            annulation = self.jouer(joueur, coup)
+            score = -self.negamax(adversaire, profondeur - 1, -bêta, -alpha, ply + 1)
+            self.annuler(joueur, coup, annulation)
+            if score > meilleur:
+                meilleur = score
+                meilleur_coup = coup
+                if score > alpha:
+                    alpha = score
+                    if alpha >= bêta:
+                        break
+
+        if meilleur <= alpha_initial:
+            borne = SUPÉRIEURE
+        elif meilleur >= bêta:
+            borne = INFÉRIEURE
+        else:
+            borne = EXACTE
+        self.table.enregistrer(clé, profondeur, borne, _score_écrit(meilleur, ply), meilleur_coup)
+        return meilleur
+
+    def racine(self, joueur, profondeur, premier):
+        """Chercher le meilleur coup à une profondeur donnée.
+
+        Args:
+            joueur (int): le numéro du joueur au trait.
+            profondeur (int): le nombre de demi-coups à explorer.
+            premier (int): le meilleur coup de l'itération précédente, essayé en premier.
+
+        Raises:
+            TempsÉcoulé: Le budget de temps est épuisé.
+            QuoridorError: Le joueur n'a aucun coup légal.
+
+        Returns:
+            Tuple[int, int]: le code du meilleur coup et son score.
+        """
+        coups = self.coups_racine(joueur)
+        if premier in coups:
+            coups.remove(premier)
+            coups.insert(0, premier)
+
+        alpha = -GAGNE - 1
+        meilleur = coups[0]
+        for coup in coups:
+            annulation = self.jouer(joueur, coup)
+            score = -self.negamax(3 - joueur, profondeur - 1, -GAGNE - 1, -alpha, 1)
+            self.annuler(joueur, coup, annulation)
+            if score > alpha:
+                alpha = score
+                meilleur = coup
+        return meilleur, alpha
+
+
+def _score_écrit(score, ply):
+    """Rendre un score de partie gagnée relatif à la position avant de l'enregistrer.
+
+    Args:
+        score (int): le score relatif à la racine.
+        ply (int): le nombre de demi-coups depuis la racine.
+
+    Returns:
+        int: le score relatif à la position.
+    """
+    if score > _SEUIL_GAGNE:
+        return score + ply
+    if score < -_SEUIL_GAGNE:
+        return score - ply
+    return score
+
+
+def _score_lu(score, ply):
+    """Rendre un score lu dans la table relatif à la racine.
+
+    Args:
+        score (int): le score relatif à la position.
+        ply (int): le nombre de demi-coups depuis la racine.
+
+    Returns:
+        int: le score relatif à la racine.
+    """
+    if score > _SEUIL_GAGNE:
+        return score - ply
+    if score < -_SEUIL_GAGNE:
+        return score + ply
+    return score
+
+
+def meilleur_coup(damier, joueur, murs, temps=1.0, profondeur=8, table=None, arrêt=None):
+    """Chercher le meilleur coup d'un joueur dans le temps imparti.
+
+    Les profondeurs 1, 2, 3, ... sont cherchées l'une après l'autre; le coup
+    retenu est celui de la dernière profondeur terminée. Une itération n'est pas
+    commencée si elle a peu de chances de se terminer avant l'échéance.
+
+    Args:
+        damier (Damier): le damier de la position; il n'est pas modifié.
+        joueur (int): le numéro du joueur au trait (1 ou 2).
+        murs (List[int, int]): les murs restants des joueurs 1 et 2.
+        temps (float, optionnel): le budget de temps en secondes.
+        profondeur (int, optionnel): la profondeur maximale en demi-coups.
+        table (TableTransposition, optionnel): la table de transposition à utiliser;
+            par défaut celle de `table_partagée`.
+        arrêt (threading.Event, optionnel): un événement qui, une fois levé, arrête
+            la recherche avant l'échéance avec le coup de la dernière profondeur terminée.
+
+    Raises:
+        QuoridorError: Le joueur n'a aucun coup légal.
+
+    Returns:
+        Tuple[int, dict]: le code du coup et un rapport contenant la profondeur
+            atteinte, le score, le nombre de nœuds, la durée et les compteurs
+            de la table de transposition.
+    """
+    début = time.perf_counter()
+    if table is None:
+        table = table_partagée()
+    table.nouvelle_recherche()
+    recherche = Recherche(damier, murs, début + temps, table, arrêt)
+    coup, score, atteinte = None, 0, 0
+    for courante in range(1, profondeur + 1):
+        try:
+            coup, score = recherche.racine(joueur, courante, coup)
+        except TempsÉcoulé:
+            break
+        atteinte = courante
+        écoulé = time.perf_counter() - début
+        if abs(score) > GAGNE - 100 or 2 * écoulé > temps:
+            break
+
+    if coup is None:
+        #même la profondeur 1 n'a pas pu être terminée
+        coup = recherche.coups_racine(joueur)[0]
+
+    durée = time.perf_counter() - début
+    return coup, {
+        "moteur": "alphabeta",
+        "profondeur": atteinte,
+        "score": score,
+        "nœuds": recherche.nœuds,
+        "durée": durée,
+        "nœuds_par_seconde": recherche.nœuds / durée if durée else 0.0,
+        "table": table.statistiques(),
+    }
@@ -0,0 +1,395 @@
+"""Module du serveur local
+
+Serveur HTTP qui imite l'API v2 de PAX (`api.URL`) pour essayer le client sans
+le vrai service: tests automatisés, essais de charge et mesures de latence de
+bout en bout. Il répond aux mêmes chemins avec les mêmes formes de JSON et les
+mêmes codes (200, 401, 406), applique les règles de `Quoridor` et fait jouer
+un adversaire intégré au joueur 2. Si l'adversaire ne peut pas jouer, le coup
+du joueur est annulé et le serveur répond 500.
+
+Le serveur tourne dans une boucle asyncio et garde les connexions ouvertes
+(HTTP/1.1). Les réponses des lectures sont encodées une seule fois par état de
+partie, ce qui lui permet de servir des milliers de requêtes par seconde.
+
+    python serveur.py --port 8000 --compte idul:secret --adversaire '{"temps": 0.2}'
+
+puis, côté client, ``ClientPax(url="http://127.0.0.1:8000/quoridor/api/v2/")``.
+
+Attributes:
+    PRÉFIXE (str): Chemin sous lequel l'API est servie, comme sur PAX.
+    TAILLE_TABLE_MO (float): Taille en Mo de la table de transposition de l'adversaire,
+        par partie.
+
+Classes:
+    * ServeurPax - Serveur local de l'API Quoridor.
+
+Functions:
+    * adversaire_rapide - Avancer sur un plus court chemin, sans jamais poser de mur.
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import json
+import threading
+import time
+import uuid
+
+from damier import PREMIER_MUR
+
+from quoridor import Quoridor
+
+from quoridor_error import QuoridorError
+
+from recherche import décoder_coup
+
+from transposition import TableTransposition
+
+PRÉFIXE = "/quoridor/api/v2/"
+TAILLE_TABLE_MO = 1
+
+_RAISONS = {200: "OK", 401: "Unauthorized", 404: "Not Found", 406: "Not Acceptable",
+            500: "Internal Server Error"}
+
+
+def adversaire_rapide(partie, joueur):
+    """Avancer sur un plus court chemin, sans jamais poser de mur.
+
+    Args:
+        partie (Quoridor): la partie en cours.
+        joueur (int): le joueur au trait.
+
+    Returns:
+        Tuple[str, List[int, int]]: le déplacement qui rapproche le plus du but.
+    """
+    for coup in partie.coups_légaux(joueur, trier=True):
+        if coup < PREMIER_MUR:
+            return décoder_coup(coup)
+    return None
+
+
+class _Partie():
+    """Partie tenue par le serveur.
+
+    Attributes:
+        id (str): l'identifiant de la partie.
+        idul (str): l'idul du joueur qui l'a créée.
+        date (str): la date de création.
+        jeu (Quoridor): la partie en cours.
+        verrou (asyncio.Lock): sérialise les coups joués dans la partie.
+        table (TableTransposition): la table des recherches de l'adversaire, ou None.
+    """
+
+    __slots__ = ("id", "idul", "date", "jeu", "verrou", "table", "_réponse")
+
+    def __init__(self, idul):
+        self.id = str(uuid.uuid4())
+        self.idul = idul
+        self.date = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.jeu = Quoridor([idul, "robot"])
+        self.verrou = asyncio.Lock()
+        self.table = None
+        self._réponse = None
+
+    def réponse(self):
+        """Corps JSON encodé de l'état de la partie, gardé jusqu'au prochain coup."""
+        if self._réponse is None:
+            self._réponse = json.dumps({
+                "id": self.id,
+                "état": self.jeu.état,
+                "gagnant": self.jeu.est_terminée() or None,
+            }).encode()
+        return self._réponse
+
+    def modifiée(self):
+        """Oublier la réponse encodée après un coup."""
+        self._réponse = None
+
+
+class ServeurPax():
+    """Serveur local de l'API Quoridor.
+
+    Attributes:
+        adversaire (dict | Callable): les réglages de `Quoridor.jouer_le_coup` de
+            l'adversaire, ou une fonction ``f(partie, joueur)`` qui retourne son coup.
+        comptes (dict): le secret de chaque idul accepté, ou None pour accepter
+            n'importe quel idul et secret non vides.
+        préfixe (str): le chemin sous lequel l'API est servie.
+        requêtes (int): le nombre de requêtes servies.
+    """
+
+    def __init__(self, adversaire=None, comptes=None, préfixe=PRÉFIXE):
+        """Constructeur de la classe ServeurPax.
+
+        Args:
+            adversaire (dict | Callable, optionnel): l'adversaire intégré; par défaut
+                `adversaire_rapide`. Un moteur de recherche est exécuté hors de la
+                boucle d'événements pour ne pas bloquer les autres requêtes.
+            comptes (dict, optionnel): le secret de chaque idul accepté.
+            préfixe (str, optionnel): le chemin sous lequel l'API est servie.
+        """
+        self.adversaire = adversaire or adversaire_rapide
+        self.comptes = comptes
+        self.préfixe = préfixe
+        self.requêtes = 0
+        self._parties = {}
+        self._listes = {}
+        self._serveur = None
+        self._boucle = None
+        self._fil = None
+        self._connexions = {}
+
+    def _identifier(self, entêtes):
+        """Idul authentifié d'une requête, ou None."""
+        autorisation = entêtes.get("authorization", "")
+        if not autorisation.startswith("Basic "):
+            return None
+        try:
+            idul, _, secret = base64.b64decode(autorisation[6:]).decode().partition(":")
+        except (binascii.Error, UnicodeDecodeError):
+            return None
+        if not idul or not secret:
+            return None
+        if self.comptes is not None and self.comptes.get(idul) != secret:
+            return None
+        return idul
+
+    async def _traiter(self, méthode, chemin, entêtes, corps):
+        """Répondre à une requête.
+
+        Args:
+            méthode (str): la méthode HTTP.
+            chemin (str): le chemin de la requête, sans la chaîne de requête.
+            entêtes (dict): les en-têtes, aux noms en minuscules.
+            corps (bytes): le corps de la requête.
+
+        Returns:
+            Tuple[int, bytes]: le code et le corps JSON de la réponse.
+        """
+        if not chemin.startswith(self.préfixe):
+            return 404, _message("Chemin inconnu.")
+        chemin = chemin[len(self.préfixe):]
+        idul = self._identifier(entêtes)
+        if idul is None:
+            return 401, _message("Idul ou secret invalide.")
+
+        if méthode == "GET" and chemin == "parties":
+            return 200, self._liste(idul)
+        if méthode == "POST" and chemin == "partie":
+            partie = _Partie(idul)
+            self._parties[partie.id] = partie
+            self._listes.pop(idul, None)
+            return 200, json.dumps({"id": partie.id, "état": partie.jeu.état}).encode()
+        if méthode == "GET" and chemin.startswith("partie/"):
+            partie = self._parties.get(chemin[7:])
+            if partie is None or partie.idul != idul:
+                return 406, _message("Partie inconnue.")
+            return 200, partie.réponse()
+        if méthode == "PUT" and chemin == "jouer":
+            return await self._jouer(idul, corps)
+        return 404, _message("Chemin inconnu.")
+
+    def _liste(self, idul):
+        """Corps JSON de la liste des parties d'un joueur, de la plus récente à la plus ancienne."""
+        liste = self._listes.get(idul)
+        if liste is None:
+            liste = self._listes[idul] = json.dumps({"parties": [
+                {"id": partie.id, "date": partie.date,
+                 "joueurs": [joueur["nom"] for joueur in partie.jeu.état["joueurs"]],
+                 "gagnant": partie.jeu.est_terminée() or None}
+                for partie in reversed(self._parties.values()) if partie.idul == idul
+            ]}).encode()
+        return liste
+
+    async def _jouer(self, idul, corps):
+        """Jouer le coup du joueur, puis la réponse de l'adversaire.
+
+        Args:
+            idul (str): l'idul authentifié.
+            corps (bytes): le JSON du coup: 'id', 'type' et 'pos'.
+
+        Returns:
+            Tuple[int, bytes]: le code et le corps JSON de la réponse.
+        """
+        try:
+            coup = json.loads(corps)
+            partie = self._parties.get(coup["id"])
+        except (ValueError, TypeError, KeyError):
+            return 406, _message("Requête invalide.")
+        if partie is None or partie.idul != idul:
+            return 406, _message("Partie inconnue.")
+
+        async with partie.verrou:
+            jeu = partie.jeu
+            if jeu.est_terminée():
+                return 406, _message("La partie est déjà terminée.")
+            try:
+                jeu.jouer(1, (coup["type"], list(coup["pos"])))
+            except (QuoridorError, TypeError, ValueError, KeyError, IndexError) as erreur:
+                return 406, _message(str(erreur) or "Coup invalide.")
+            partie.modifiée()
+            if not jeu.est_terminée():
+                #les lectures reçues pendant la recherche de l'adversaire servent l'état
+                #encodé avant qu'elle ne commence, sans toucher à la partie
+                partie.réponse()
+                try:
+                    if self.adversaire is adversaire_rapide:
+                        réponse = adversaire_rapide(jeu, 2)
+                    else:
+                        réponse = await asyncio.get_running_loop().run_in_executor(
+                            None, self._réponse_adversaire, partie)
+                    jeu.jouer(2, réponse)
+                except Exception as erreur:
+                    #l'adversaire n'a pas pu jouer: la partie revient à l'état d'avant le coup
+                    jeu.annuler()
+                    partie.modifiée()
+                    return 500, _message(f"L'adversaire n'a pas pu jouer: {erreur}")
+                partie.modifiée()
+            self._listes.pop(idul, None)
+            return 200, partie.réponse()
+
+    def _réponse_adversaire(self, partie):
+        """Coup de l'adversaire intégré, le joueur 2.
+
+        Les recherches de plusieurs parties tournent en même temps dans des fils
+        différents: chaque partie a sa propre table de transposition plutôt que
+        la table partagée du module `recherche`.
+        """
+        jeu = partie.jeu
+        if callable(self.adversaire):
+            return self.adversaire(jeu, 2)
+        réglages = self.adversaire
+        if réglages.get("moteur", jeu.moteur) == "alphabeta" and "table" not in réglages:
+            if partie.table is None:
+                partie.table = TableTransposition(TAILLE_TABLE_MO)
+            réglages = dict(réglages, table=partie.table)
+        return jeu.jouer_le_coup(2, **réglages)
+
+    async def _connexion(self, lecteur, écrivain):
+        """Servir les requêtes d'une connexion jusqu'à sa fermeture."""
+        tâche = asyncio.current_task()
+        self._connexions[tâche] = écrivain
+        try:
+            while True:
+                try:
+                    tête = await lecteur.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        ConnectionError):
+                    break
+                lignes = tête.decode("latin-1").split("\r\n")
+                try:
+                    méthode, cible, version = lignes[0].split(" ")
+                except ValueError:
+                    break
+                entêtes = {}
+                for ligne in lignes[1:]:
+                    nom, _, valeur = ligne.partition(":")
+                    if nom:
+                        entêtes[nom.strip().lower()] = valeur.strip()
+                longueur = int(entêtes.get("content-length") or 0)
+                corps = await lecteur.readexactly(longueur) if longueur else b""
+
+                self.requêtes += 1
+                try:
+                    code, réponse = await self._traiter(méthode, cible.partition("?")[0],
+                                                        entêtes, corps)
+                except Exception:
+                    #toute requête reçoit une réponse, même si elle fait échouer le serveur
+                    code, réponse = 500, _message("Erreur interne du serveur.")
+                fermer = entêtes.get("connection", "").lower() == "close" \
+                    or version == "HTTP/1.0"
+                écrivain.write(
+                    f"HTTP/1.1 {code} {_RAISONS[code]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(réponse)}\r\n"
+                    f"{'Connection: close' if fermer else 'Connection: keep-alive'}"
+                    f"\r\n\r\n".encode() + réponse)
+                await écrivain.drain()
+                if fermer:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connexions.pop(tâche, None)
+            écrivain.close()
+
+    async def servir(self, hôte="127.0.0.1", port=8000):
+        """Servir jusqu'à l'annulation de la tâche.
+
+        Args:
+            hôte (str, optionnel): l'adresse d'écoute.
+            port (int, optionnel): le port d'écoute; 0 pour un port libre.
+        """
+        self._serveur = await asyncio.start_server(self._connexion, hôte, port)
+        async with self._serveur:
+            await self._serveur.serve_forever()
+
+    def lancer(self, hôte="127.0.0.1", port=0):
+        """Démarrer le serveur dans un fil d'exécution en arrière-plan.
+
+        Args:
+            hôte (str, optionnel): l'adresse d'écoute.
+            port (int, optionnel): le port d'écoute; 0 pour un port libre.
+
+        Returns:
+            str: l'url de l'API, à passer à `ClientPax`.
+        """
+        prêt = threading.Event()
+
+        def exécuter():
+            self._boucle = asyncio.new_event_loop()
+            self._serveur = self._boucle.run_until_complete(
+                asyncio.start_server(self._connexion, hôte, port))
+            prêt.set()
+            self._boucle.run_forever()
+
+        self._fil = threading.Thread(target=exécuter, daemon=True)
+        self._fil.start()
+        prêt.wait()
+        port = self._serveur.sockets[0].getsockname()[1]
+        return f"http://{hôte}:{port}{self.préfixe}"
+
+    def arrêter(self):
+        """Arrêter le serveur démarré par `lancer`."""
+        if self._fil is None:
+            return
+
+        async def fermer():
+            self._serveur.close()
+            #les connexions gardées ouvertes ne sont pas fermées par le serveur
+            for écrivain in list(self._connexions.values()):
+                écrivain.close()
+            await asyncio.gather(*self._connexions, return_exceptions=True)
+            await self._serveur.wait_closed()
+            self._boucle.stop()
+
+        asyncio.run_coroutine_threadsafe(fermer(), self._boucle)
+        self._fil.join()
+        self._boucle.close()
+        self._fil = None
+
+
+def _message(texte):
+    """Corps JSON d'un message d'erreur."""
+    return json.dumps({"message": texte}).encode()
+
+
+if __name__ == "__main__":
+    ANALYSEUR = argparse.ArgumentParser(description="Serveur local de l'API Quoridor")
+    ANALYSEUR.add_argument("--hôte", default="127.0.0.1", help="Adresse d'écoute.")
+    ANALYSEUR.add_argument("--port", type=int, default=8000, help="Port d'écoute.")
+    ANALYSEUR.add_argument("--compte", action="append", default=[],
+                           help="idul:secret accepté (répétable); tous par défaut.")
+    ANALYSEUR.add_argument("--adversaire", type=json.loads, default=None,
+                           help="Réglages JSON de jouer_le_coup de l'adversaire; "
+                                "par défaut il avance sur un plus court chemin.")
+    ARGUMENTS = ANALYSEUR.parse_args()
+
+    COMPTES = dict(compte.split(":", 1) for compte in ARGUMENTS.compte) or None
+    SERVEUR = ServeurPax(ARGUMENTS.adversaire, COMPTES)
+    print(f"API servie sur http://{ARGUMENTS.hôte}:{ARGUMENTS.port}{PRÉFIXE}", flush=True)
+    try:
+        asyncio.run(SERVEUR.servir(ARGUMENTS.hôte, ARGUMENTS.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,48 @@
+"""Tests du module de l'arène"""
+
+import pytest
+
+from arene import jouer_partie, résumer
+
+from serveur import adversaire_rapide
+
+#Chaque moteur intégré de `Quoridor.jouer_le_coup`, avec un petit budget
+MOTEURS = {
+    "alphabeta": {"moteur": "alphabeta", "temps": 0.02, "profondeur": 2},
+    "mcts": {"moteur": "mcts", "simulations": 20, "temps": None, "processus": 1, "graine": 0},
+    "heuristique": {"moteur": "heuristique"},
+}
+
+
+@pytest.mark.parametrize("nom", sorted(MOTEURS))
+def test_moteur_intégré_en_joueur_2(nom):
+    """Chaque moteur intégré joue une partie entière en joueur 2 sans forfait."""
+    résultat = jouer_partie(adversaire_rapide, MOTEURS[nom], a_commence=True, graine=1)
+    assert résultat["forfait"] is None, résultat["erreur"]
+    assert résultat["B"]["coups"] > 0
+
+
+def test_coup_illégal_rapporté_à_part():
+    """Un coup illégal est un forfait rapporté avec son erreur, pas une victoire."""
+
+    def tricheur(partie, joueur):
+        return "D", [1, 1]
+
+    résultat = jouer_partie(adversaire_rapide, tricheur, a_commence=True, graine=1)
+    assert (résultat["gagnant"], résultat["forfait"]) == (None, "B")
+    assert "coup illégal" in résultat["erreur"]
+
+    bilan = résumer([résultat])
+    assert (bilan["victoires"], bilan["nulles"], bilan["défaites"]) == (0, 0, 0)
+    assert bilan["forfaits"] == {"A": 0, "B": 1}
+
+
+def test_moteur_qui_plante_rapporté_à_part():
+    """Un moteur qui lève une erreur perd par forfait et l'erreur est conservée."""
+
+    def en_panne(partie, joueur):
+        raise RuntimeError("panne")
+
+    résultat = jouer_partie(en_panne, adversaire_rapide, a_commence=False, graine=1)
+    assert (résultat["gagnant"], résultat["forfait"]) == (None, "A")
+    assert résultat["erreur"] == "RuntimeError: panne"
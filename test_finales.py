@@ -0,0 +1,41 @@
+"""Tests du module des tables de finales"""
+
+from damier import Damier, case
+
+from finales import GAGNÉE, NULLE, PERDUE, coup_final, table_finale
+
+
+def _damier_nul():
+    """Damier d'une course nulle, le joueur 1 en (8, 2) et le joueur 2 en (9, 2)."""
+    return Damier([[8, 2], [9, 2]], [[1, 3], [8, 2], [8, 8]], [[4, 1], [6, 5], [8, 2]])
+
+
+def test_course_nulle_jouée_sans_murs():
+    """Sans murs de part et d'autre, la table joue aussi les courses nulles."""
+    damier = _damier_nul()
+    résultat, _ = table_finale(damier).sonder(damier.pions[0], damier.pions[1], 1)
+    assert résultat == NULLE
+    coup, rapport = coup_final(damier, 1, [0, 0])
+    assert coup in (case([8, 3]), case([9, 3]))
+    assert rapport["résultat"] == NULLE
+
+
+def test_course_nulle_laissée_à_la_recherche_si_l_adversaire_a_des_murs():
+    """Le coup nul de la table n'est pas prouvé contre un adversaire qui a des murs."""
+    assert coup_final(_damier_nul(), 1, [0, 4]) is None
+
+
+def test_course_perdue_jouée_malgré_les_murs_adverses():
+    """Des murs de plus pour l'adversaire ne changent rien à une course perdue."""
+    damier = Damier([[5, 1], [5, 2]], [], [])
+    coup, rapport = coup_final(damier, 1, [0, 5])
+    assert rapport["résultat"] == PERDUE
+    assert coup in (case([4, 1]), case([6, 1]), case([5, 3]))
+
+
+def test_course_gagnée_jouée_seulement_au_dernier_coup():
+    """Une course gagnée n'est jouée malgré les murs adverses que si elle l'est dès ce coup."""
+    damier = Damier([[5, 8], [1, 5]], [], [])
+    coup, rapport = coup_final(damier, 1, [0, 5])
+    assert (coup, rapport["résultat"], rapport["distance"]) == (case([5, 9]), GAGNÉE, 1)
+    assert coup_final(Damier([[5, 7], [1, 5]], [], []), 1, [0, 5]) is None
@@ -0,0 +1,40 @@
+"""Tests du module du serveur local"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api import ClientPax
+
+from serveur import ServeurPax, adversaire_rapide
+
+
+def test_lecture_pendant_la_recherche_de_l_adversaire():
+    """Une lecture pendant la recherche de l'adversaire ne fige pas la réponse du coup."""
+    commencée = threading.Event()
+    reprendre = threading.Event()
+
+    def adversaire_lent(partie, joueur):
+        commencée.set()
+        reprendre.wait(5)
+        return adversaire_rapide(partie, joueur)
+
+    serveur = ServeurPax(adversaire_lent)
+    client = ClientPax(url=serveur.lancer())
+    try:
+        id_partie, _ = client.débuter_partie("idul", "secret")
+        with ThreadPoolExecutor(max_workers=1) as fil:
+            coup = fil.submit(client.jouer_coup, id_partie, "D", [5, 2], "idul", "secret")
+            assert commencée.wait(5)
+            _, pendant = client.récupérer_partie(id_partie, "idul", "secret")
+            reprendre.set()
+            _, réponse = coup.result(5)
+        _, après = client.récupérer_partie(id_partie, "idul", "secret")
+    finally:
+        reprendre.set()
+        client.session.close()
+        serveur.arrêter()
+
+    #pendant la recherche: notre coup est joué, pas encore celui de l'adversaire
+    assert [joueur["pos"] for joueur in pendant["joueurs"]] == [[5, 2], [5, 9]]
+    assert [joueur["pos"] for joueur in après["joueurs"]] == [[5, 2], [5, 8]]
+    assert réponse["état"] == après
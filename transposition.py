@@ -0,0 +1,185 @@
+"""Module de la table de transposition
+
+Table de taille fixe, indexée par le hachage de Zobrist des positions, qui
+conserve pour chaque position cherchée sa profondeur, le type de borne de son
+score et son meilleur coup.
+
+Chaque case de la table contient deux entrées: la première n'est remplacée
+que par une recherche au moins aussi profonde ou plus récente, la seconde est
+toujours remplacée.
+
+Attributes:
+    EXACTE (int): Le score enregistré est exact.
+    INFÉRIEURE (int): Le score enregistré est une borne inférieure (coupure bêta).
+    SUPÉRIEURE (int): Le score enregistré est une borne supérieure (aucun coup n'a
+        dépassé alpha).
+    ZOBRIST_RESTANTS (List): Clés de Zobrist du nombre de murs restants, par joueur.
+    ZOBRIST_TRAIT (int): Clé de Zobrist ajoutée lorsque le joueur 2 a le trait.
+
+Classes:
+    * TableTransposition - Table de transposition de taille fixe.
+
+Functions:
+    * clé_position - Hachage de Zobrist complet d'une position de recherche.
+"""
+
+import random
+from array import array
+
+EXACTE = 0
+INFÉRIEURE = 1
+SUPÉRIEURE = 2
+
+#Octets occupés par une entrée: clé, score, coup, profondeur, borne et génération
+_OCTETS_PAR_ENTRÉE = 8 + 2 + 2 + 1 + 1 + 1
+
+
+def _construire_zobrist():
+    """Tirer les clés de Zobrist des murs restants et du trait.
+
+    Returns:
+        Tuple[List, int]: les clés des murs restants par joueur, puis celle du trait.
+    """
+    générateur = random.Random(20200416)
+    restants = [[générateur.getrandbits(64) for _ in range(11)] for _ in range(2)]
+    return restants, générateur.getrandbits(64)
+
+
+ZOBRIST_RESTANTS, ZOBRIST_TRAIT = _construire_zobrist()
+
+
+def clé_position(damier, murs, joueur):
+    """Hachage de Zobrist complet d'une position de recherche.
+
+    Args:
+        damier (Damier): le damier de la position.
+        murs (List[int, int]): les murs restants des joueurs 1 et 2.
+        joueur (int): le numéro du joueur au trait.
+
+    Returns:
+        int: la clé de 64 bits de la position.
+    """
+    clé = damier.clé ^ ZOBRIST_RESTANTS[0][murs[0]] ^ ZOBRIST_RESTANTS[1][murs[1]]
+    if joueur == 2:
+        clé ^= ZOBRIST_TRAIT
+    return clé
+
+
+class TableTransposition():
+    """Table de transposition de taille fixe.
+
+    Attributes:
+        taille (int): le nombre d'entrées de la table.
+        génération (int): le numéro de la recherche en cours, de 0 à 255.
+        succès (int): le nombre de sondes qui ont trouvé la position.
+        échecs (int): le nombre de sondes qui ne l'ont pas trouvée.
+        collisions (int): le nombre d'échecs où la case était occupée par d'autres positions.
+        enregistrements (int): le nombre d'entrées écrites.
+        remplacements (int): le nombre d'entrées écrites par-dessus une autre position.
+    """
+
+    def __init__(self, taille_mo=16):
+        """Constructeur de la classe TableTransposition.
+
+        Args:
+            taille_mo (float, optionnel): la mémoire allouée à la table, en Mo.
+        """
+        cases = max(1, int(taille_mo * 2 ** 20) // (2 * _OCTETS_PAR_ENTRÉE))
+        #nombre de cases arrondi à la puissance de deux inférieure
+        cases = 1 << (cases.bit_length() - 1)
+        self._masque = cases - 1
+        self.taille = 2 * cases
+        self._clés = array("Q", bytes(8 * self.taille))
+        self._scores = array("h", bytes(2 * self.taille))
+        self._coups = array("h", bytes(2 * self.taille))
+        self._profondeurs = array("b", bytes(self.taille))
+        self._bornes = array("b", bytes(self.taille))
+        self._générations = array("B", bytes(self.taille))
+        self.génération = 0
+        self.succès = 0
+        self.échecs = 0
+        self.collisions = 0
+        self.enregistrements = 0
+        self.remplacements = 0
+
+    def nouvelle_recherche(self):
+        """Signaler le début d'une nouvelle recherche.
+
+        Les entrées des recherches précédentes peuvent alors être remplacées
+        même par une recherche moins profonde.
+        """
+        self.génération = (self.génération + 1) & 0xFF
+
+    def sonder(self, clé):
+        """Chercher une position dans la table.
+
+        Args:
+            clé (int): la clé de Zobrist de la position.
+
+        Returns:
+            Tuple[int, int, int, int]: la profondeur, la borne, le score et le
+                meilleur coup enregistrés, ou None si la position est absente.
+        """
+        indice = (clé & self._masque) << 1
+        clés = self._clés
+        if clés[indice] != clé:
+            indice += 1
+            if clés[indice] != clé:
+                self.échecs += 1
+                if clés[indice] or clés[indice - 1]:
+                    self.collisions += 1
+                return None
+        self.succès += 1
+        return (self._profondeurs[indice], self._bornes[indice],
+                self._scores[indice], self._coups[indice])
+
+    def enregistrer(self, clé, profondeur, borne, score, coup):
+        """Enregistrer le résultat de la recherche d'une position.
+
+        Args:
+            clé (int): la clé de Zobrist de la position.
+            profondeur (int): la profondeur de la recherche.
+            borne (int): EXACTE, INFÉRIEURE ou SUPÉRIEURE.
+            score (int): le score de la position.
+            coup (int): le code du meilleur coup, ou -1.
+        """
+        indice = (clé & self._masque) << 1
+        clés = self._clés
+        if clés[indice + 1] == clé:
+            indice += 1
+        elif clés[indice] != clé and profondeur < self._profondeurs[indice] \
+                and self._générations[indice] == self.génération:
+            #l'entrée plus profonde de la recherche en cours est conservée
+            indice += 1
+
+        if clés[indice] and clés[indice] != clé:
+            self.remplacements += 1
+        self.enregistrements += 1
+        clés[indice] = clé
+        self._profondeurs[indice] = profondeur
+        self._bornes[indice] = borne
+        self._scores[indice] = score
+        self._coups[indice] = coup
+        self._générations[indice] = self.génération
+
+    def vider(self):
+        """Effacer toutes les entrées et remettre les compteurs à zéro."""
+        self.__init__(self.taille * _OCTETS_PAR_ENTRÉE / 2 ** 20)
+
+    def statistiques(self):
+        """Compteurs d'utilisation de la table.
+
+        Returns:
+            dict: la taille, les succès, échecs, collisions, enregistrements et
+                remplacements, ainsi que le taux de succès.
+        """
+        sondes = self.succès + self.échecs
+        return {
+            "taille": self.taille,
+            "succès": self.succès,
+            "échecs": self.échecs,
+            "collisions": self.collisions,
+            "enregistrements": self.enregistrements,
+            "remplacements": self.remplacements,
+            "taux_succès": self.succès / sondes if sondes else 0.0,
+        }
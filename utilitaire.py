@@ -12,9 +12,9 @@ def analyser_commande():
 
     Returns:
         Namespace: Un objet Namespace tel que retourné par `parser.parse_args()`.
-                    Cet objet a trois attributs: « idul » représentant l'idul
-                    du joueur, « parties » qui est un booléen `True`/`False`
-                    et « local » qui est un booléen `True`/`False`.
+                    Cet objet a quatre attributs: « idul » représentant l'idul
+                    du joueur, « automatique », « graphique » et « anticipation »
+                    qui sont des booléens `True`/`False`.
     """
 
     parser = argparse.ArgumentParser(description="Jeu Quoridor - phase 3")
@@ -24,6 +24,8 @@ def analyser_commande():
         , action='store_true', default=False)
     parser.add_argument('-x', "--graphique", help="Activer le mode graphique."\
         , action='store_true', default=False)
+    parser.add_argument('-p', "--anticipation", help="Réfléchir pendant le tour de "\
+        "l'adversaire en mode automatique.", action='store_true', default=False)
 
     return parser.parse_args()
 